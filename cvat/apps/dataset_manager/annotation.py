@@ -6,10 +6,12 @@
 from copy import copy, deepcopy
 
 import math
-from typing import Optional, Sequence
+from typing import Callable, Iterator, Optional, Sequence, Tuple
 import numpy as np
-from itertools import chain
+from itertools import chain, count
 from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from shapely import geometry
 
 from cvat.apps.engine.models import ShapeType, DimensionType
@@ -193,6 +195,187 @@ class AnnotationManager:
 
         return tracks + shapes.to_tracks()
 
+class AnnotationStream:
+    """
+    Provides the task annotations segment by segment, without loading all of them at once.
+    The segments are merged in the same way as AnnotationManager.merge() does for the whole task.
+    The annotations are released as soon as they can't be affected by the following segments,
+    so only the annotations of the last two merged segments and the unfinished tracks
+    are kept in memory.
+    """
+
+    def __init__(self,
+        dimension,
+        segments: Sequence[Tuple[int, Callable[[], AnnotationIR]]],
+        overlap: int,
+    ):
+        # segments are (start frame, annotation loader) pairs, sorted by the start frame
+        self.dimension = dimension
+        self._segments = segments
+        self._overlap = overlap
+
+    def iter_frame_ranges(self, end_frame: int, *,
+        included_frames: Optional[Sequence[int]] = None,
+        use_server_track_ids: bool = False
+    ) -> Iterator[Tuple[range, list, list]]:
+        """
+        Yields (frame range, shapes, tags) in the frame order. The shapes are returned
+        in the AnnotationManager.to_shapes() format, outside track shapes are not included.
+        """
+
+        ir_data = AnnotationIR(self.dimension)
+        track_indices = {}
+        track_counter = count()
+        range_start = 0
+        for start_frame, load_segment in self._segments:
+            AnnotationManager(ir_data).merge(load_segment(), start_frame,
+                self._overlap, self.dimension)
+
+            # Keep the track numbers consistent with the fully merged annotations
+            for track in ir_data.tracks:
+                if id(track) not in track_indices:
+                    track_indices[id(track)] = next(track_counter)
+
+            # The merge can add keyframes in the overlap to the open tracks,
+            # which changes the interpolation on the previous frames,
+            # so the frames are only released after the next segment is merged
+            if range_start < start_frame:
+                yield self._release(ir_data, track_indices, range(range_start, start_frame),
+                    included_frames=included_frames, use_server_track_ids=use_server_track_ids)
+                range_start = start_frame
+
+        if range_start < end_frame:
+            yield self._release(ir_data, track_indices, range(range_start, end_frame),
+                included_frames=included_frames, use_server_track_ids=use_server_track_ids,
+                is_last=True)
+
+    def iter_merged_objects(self) -> Iterator[AnnotationIR]:
+        """
+        Yields parts of the merged annotations, as soon as they can't be changed
+        by the following segments. Concatenated, the parts have the objects
+        in the same order as the fully merged annotations.
+        """
+
+        ir_data = AnnotationIR(self.dimension)
+        track_indices = {}
+        track_counter = count()
+        finished_tracks = {}
+        next_track_index = 0
+        for i, (start_frame, load_segment) in enumerate(self._segments):
+            released_shape_count = len(ir_data.shapes)
+            released_tag_count = len(ir_data.tags)
+
+            AnnotationManager(ir_data).merge(load_segment(), start_frame,
+                self._overlap, self.dimension)
+
+            for track in ir_data.tracks:
+                if id(track) not in track_indices:
+                    track_indices[id(track)] = next(track_counter)
+
+            # The merge only appends new shapes and tags, so they can be released at once.
+            # The next segment merge only needs the ones on its frames.
+            shapes = ir_data.shapes[released_shape_count:]
+            tags = ir_data.tags[released_tag_count:]
+            if i + 1 < len(self._segments):
+                next_start_frame = self._segments[i + 1][0]
+                ir_data.shapes = [s for s in ir_data.shapes if next_start_frame <= s["frame"]]
+                ir_data.tags = [t for t in ir_data.tags if next_start_frame <= t["frame"]]
+                open_tracks = TrackManager._get_objects_by_frame(
+                    ir_data.tracks, next_start_frame).get(0, [])
+            else:
+                open_tracks = []
+
+            # The tracks, which are not taken by the next segment merge, are finished.
+            # They are released in the merged track order, so a track can wait
+            # for the previous tracks to be finished.
+            open_track_ids = set(id(track) for track in open_tracks)
+            for track in ir_data.tracks:
+                if id(track) not in open_track_ids:
+                    finished_tracks[track_indices.pop(id(track))] = track
+            ir_data.tracks = open_tracks
+
+            released = AnnotationIR(self.dimension)
+            released.shapes = shapes
+            released.tags = tags
+            while next_track_index in finished_tracks:
+                released.tracks.append(finished_tracks.pop(next_track_index))
+                next_track_index += 1
+
+            yield released
+
+    def _release(self, ir_data, track_indices, frame_range: range, *,
+        included_frames: Optional[Sequence[int]] = None,
+        use_server_track_ids: bool = False,
+        is_last: bool = False,
+    ) -> Tuple[range, list, list]:
+        range_frames = set(
+            frame for frame in frame_range
+            if included_frames is None or frame in included_frames
+        )
+
+        shapes = [s for s in ir_data.shapes if s["frame"] < frame_range.stop]
+        ir_data.shapes = [s for s in ir_data.shapes if frame_range.stop <= s["frame"]]
+        shapes = [s for s in shapes if s["frame"] in range_frames]
+
+        tags = [t for t in ir_data.tags if t["frame"] < frame_range.stop]
+        ir_data.tags = [t for t in ir_data.tags if frame_range.stop <= t["frame"]]
+
+        track_manager = TrackManager(ir_data.tracks, self.dimension)
+        for track in ir_data.tracks:
+            shapes.extend(track_manager._get_track_shapes(
+                self._get_track_window(track, frame_range.start, frame_range.stop),
+                track_indices[id(track)], frame_range.stop,
+                included_frames=range_frames,
+                use_server_track_ids=use_server_track_ids,
+            ))
+
+        # The tracks, which are not taken by the next segment merge, are finished
+        if is_last:
+            open_tracks = []
+        else:
+            open_tracks = TrackManager._get_objects_by_frame(
+                ir_data.tracks, frame_range.stop).get(0, [])
+        open_track_ids = set(id(track) for track in open_tracks)
+        for track in ir_data.tracks:
+            if id(track) not in open_track_ids:
+                track_indices.pop(id(track))
+        ir_data.tracks = open_tracks
+
+        return frame_range, shapes, tags
+
+    @classmethod
+    def _get_track_window(cls, track, start_frame: int, end_frame: int):
+        # Only the closest keyframes around the frame range affect the interpolated shapes.
+        # The attributes are propagated to the finished keyframes in place,
+        # like it's done on the full track interpolation, and the keyframes
+        # in the range are copied, because the interpolation results are modified by callers.
+        shapes = sorted(track["shapes"], key=lambda shape: shape["frame"])
+
+        first, last = 0, len(shapes)
+        for i, shape in enumerate(shapes):
+            if shape["frame"] < end_frame:
+                if 0 < i:
+                    TrackManager._propagate_attributes(shapes[i - 1], shape)
+
+                if shape["frame"] < start_frame:
+                    first = i
+            else:
+                last = i + 1
+                break
+
+        window = track.copy()
+        window["shapes"] = [
+            dict(shape, attributes=list(shape["attributes"]))
+            for shape in shapes[first:last]
+        ]
+        if track.get("elements"):
+            window["elements"] = [
+                cls._get_track_window(element, start_frame, end_frame)
+                for element in track["elements"]
+            ]
+
+        return window
+
 class ObjectManager:
     def __init__(self, objects):
         self.objects = objects
@@ -224,6 +407,40 @@ class ObjectManager:
     def _modify_unmatched_object(self, obj, end_frame):
         raise NotImplementedError()
 
+    def _calc_cost_matrix(self, int_objects, old_objects, start_frame, overlap, dimension):
+        cost_matrix = np.empty(shape=(len(int_objects), len(old_objects)), dtype=float)
+        for i, int_obj in enumerate(int_objects):
+            for j, old_obj in enumerate(old_objects):
+                cost_matrix[i][j] = 1 - self._calc_objects_similarity(
+                    int_obj, old_obj, start_frame, overlap, dimension)
+
+        return cost_matrix
+
+    @staticmethod
+    def _match_objects(cost_matrix):
+        # The pairs with the maximum cost don't change the total cost of a matching,
+        # so the groups of objects connected by the other pairs can be matched separately.
+        # It's much faster than matching all the objects at once in crowded frames.
+        int_count = cost_matrix.shape[0]
+        edge_rows, edge_cols = np.nonzero(cost_matrix < 1)
+        graph = coo_matrix(
+            (np.ones(len(edge_rows)), (edge_rows, edge_cols + int_count)),
+            shape=(sum(cost_matrix.shape), sum(cost_matrix.shape))
+        )
+        _, components = connected_components(graph, directed=False)
+
+        row_ind = []
+        col_ind = []
+        for component in np.unique(components[edge_rows]):
+            rows = np.flatnonzero(components[:int_count] == component)
+            cols = np.flatnonzero(components[int_count:] == component)
+            component_row_ind, component_col_ind = linear_sum_assignment(
+                cost_matrix[np.ix_(rows, cols)])
+            row_ind.extend(rows[component_row_ind])
+            col_ind.extend(cols[component_col_ind])
+
+        return row_ind, col_ind
+
     def merge(self, objects, start_frame, overlap, dimension):
         # 1. Split objects on two parts: new and which can be intersected
         # with existing objects.
@@ -257,16 +474,12 @@ class ObjectManager:
             if frame in old_objects_by_frame:
                 int_objects = int_objects_by_frame[frame]
                 old_objects = old_objects_by_frame[frame]
-                cost_matrix = np.empty(shape=(len(int_objects), len(old_objects)),
-                    dtype=float)
                 # 5.1 Construct cost matrix for the frame.
-                for i, int_obj in enumerate(int_objects):
-                    for j, old_obj in enumerate(old_objects):
-                        cost_matrix[i][j] = 1 - self._calc_objects_similarity(
-                            int_obj, old_obj, start_frame, overlap, dimension)
+                cost_matrix = self._calc_cost_matrix(int_objects, old_objects,
+                    start_frame, overlap, dimension)
 
                 # 6. Find optimal solution using Hungarian algorithm.
-                row_ind, col_ind = linear_sum_assignment(cost_matrix)
+                row_ind, col_ind = self._match_objects(cost_matrix)
                 old_objects_indexes = list(range(0, len(old_objects)))
                 int_objects_indexes = list(range(0, len(int_objects)))
                 for i, j in zip(row_ind, col_ind):
@@ -314,6 +527,30 @@ def pairwise(iterable):
     a = iter(iterable)
     return zip(a, a)
 
+def _calc_boxes_iou(boxes0: np.ndarray, boxes1: np.ndarray) -> np.ndarray:
+    """
+    Computes IoU for each pair of the axis-aligned boxes, given as [x0, y0, x1, y1] rows.
+    Returns a matrix with a row for each box of the first array.
+    """
+
+    min0 = np.minimum(boxes0[:, :2], boxes0[:, 2:])
+    max0 = np.maximum(boxes0[:, :2], boxes0[:, 2:])
+    min1 = np.minimum(boxes1[:, :2], boxes1[:, 2:])
+    max1 = np.maximum(boxes1[:, :2], boxes1[:, 2:])
+
+    area0 = np.prod(max0 - min0, axis=1)[:, np.newaxis]
+    area1 = np.prod(max1 - min1, axis=1)[np.newaxis, :]
+
+    intersection_size = np.minimum(max0[:, np.newaxis], max1[np.newaxis]) - \
+        np.maximum(min0[:, np.newaxis], min1[np.newaxis])
+    intersection = np.prod(np.maximum(intersection_size, 0), axis=2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = intersection / (area0 + area1 - intersection)
+
+    # Lines and points are not similar to anything
+    return np.where((area0 > 0) & (area1 > 0), iou, 0)
+
 class ShapeManager(ObjectManager):
     def to_tracks(self):
         tracks = []
@@ -344,17 +581,18 @@ class ShapeManager(ObjectManager):
         return 0.25
 
     @staticmethod
-    def _calc_objects_similarity(obj0, obj1, start_frame, overlap, dimension):
-        def _calc_polygons_similarity(p0, p1):
-            if p0.is_valid and p1.is_valid: # check validity of polygons
-                overlap_area = p0.intersection(p1).area
-                if p0.area == 0 or p1.area == 0: # a line with many points
-                    return 0
-                else:
-                    return overlap_area / (p0.area + p1.area - overlap_area)
+    def _calc_polygons_similarity(p0, p1):
+        if p0.is_valid and p1.is_valid: # check validity of polygons
+            overlap_area = p0.intersection(p1).area
+            if p0.area == 0 or p1.area == 0: # a line with many points
+                return 0
             else:
-                return 0 # if there's invalid polygon, assume similarity is 0
+                return overlap_area / (p0.area + p1.area - overlap_area)
+        else:
+            return 0 # if there's invalid polygon, assume similarity is 0
 
+    @staticmethod
+    def _calc_objects_similarity(obj0, obj1, start_frame, overlap, dimension):
         has_same_type = obj0["type"] == obj1["type"]
         has_same_label = obj0.get("label_id") == obj1.get("label_id")
         if has_same_type and has_same_label:
@@ -363,7 +601,7 @@ class ShapeManager(ObjectManager):
                 p0 = geometry.box(*obj0["points"])
                 p1 = geometry.box(*obj1["points"])
 
-                return _calc_polygons_similarity(p0, p1)
+                return ShapeManager._calc_polygons_similarity(p0, p1)
             elif obj0["type"] == ShapeType.CUBOID and dimension == DimensionType.DIM_3D:
                 [x_c0, y_c0, z_c0] = obj0["points"][0:3]
                 [x_c1, y_c1, z_c1] = obj1["points"][0:3]
@@ -387,7 +625,7 @@ class ShapeManager(ObjectManager):
 
                 p_top0 = geometry.box(*top_view_0)
                 p_top1 = geometry.box(*top_view_1)
-                top_similarity = _calc_polygons_similarity(p_top0, p_top1)
+                top_similarity = ShapeManager._calc_polygons_similarity(p_top0, p_top1)
 
                 side_view_0 = [
                     x_c0 - x_len0 / 2,
@@ -404,18 +642,107 @@ class ShapeManager(ObjectManager):
                 ]
                 p_side0 = geometry.box(*side_view_0)
                 p_side1 = geometry.box(*side_view_1)
-                side_similarity = _calc_polygons_similarity(p_side0, p_side1)
+                side_similarity = ShapeManager._calc_polygons_similarity(p_side0, p_side1)
 
                 return top_similarity * side_similarity
             elif obj0["type"] == ShapeType.POLYGON:
                 p0 = geometry.Polygon(pairwise(obj0["points"]))
                 p1 = geometry.Polygon(pairwise(obj1["points"]))
 
-                return _calc_polygons_similarity(p0, p1)
+                return ShapeManager._calc_polygons_similarity(p0, p1)
             else:
                 return 0 # FIXME: need some similarity for points, polylines, ellipses and 2D cuboids
         return 0
 
+    @staticmethod
+    def _calc_cuboids_3d_similarity_matrix(objects0, objects1):
+        def _get_views(objects):
+            points = np.array([obj["points"][:9] for obj in objects], dtype=float)
+            centers = points[:, 0:3]
+            sizes = points[:, 6:9]
+            top_view = np.hstack([
+                centers[:, [0, 1]] - sizes[:, [0, 1]] / 2,
+                centers[:, [0, 1]] + sizes[:, [0, 1]] / 2,
+            ])
+            side_view = np.hstack([
+                centers[:, [0, 2]] - sizes[:, [0, 2]] / 2,
+                centers[:, [0, 2]] + sizes[:, [0, 2]] / 2,
+            ])
+            return top_view, side_view
+
+        top_view0, side_view0 = _get_views(objects0)
+        top_view1, side_view1 = _get_views(objects1)
+        return _calc_boxes_iou(top_view0, top_view1) * _calc_boxes_iou(side_view0, side_view1)
+
+    @classmethod
+    def _calc_polygons_similarity_matrix(cls, objects0, objects1):
+        def _get_bboxes(objects):
+            bboxes = np.empty((len(objects), 4), dtype=float)
+            for i, obj in enumerate(objects):
+                xs = obj["points"][0::2]
+                ys = obj["points"][1::2]
+                bboxes[i] = [min(xs), min(ys), max(xs), max(ys)]
+            return bboxes
+
+        # Only the polygons with overlapping bounding boxes can be similar,
+        # the polygon intersections are only computed for them
+        bboxes0 = _get_bboxes(objects0)
+        bboxes1 = _get_bboxes(objects1)
+        candidates = np.all(
+            np.maximum(bboxes0[:, np.newaxis, :2], bboxes1[np.newaxis, :, :2]) <
+            np.minimum(bboxes0[:, np.newaxis, 2:], bboxes1[np.newaxis, :, 2:]),
+            axis=2
+        )
+
+        polygons0 = {}
+        polygons1 = {}
+        similarity = np.zeros((len(objects0), len(objects1)), dtype=float)
+        for i, j in zip(*np.nonzero(candidates)):
+            if i not in polygons0:
+                polygons0[i] = geometry.Polygon(pairwise(objects0[i]["points"]))
+            if j not in polygons1:
+                polygons1[j] = geometry.Polygon(pairwise(objects1[j]["points"]))
+
+            similarity[i, j] = cls._calc_polygons_similarity(polygons0[i], polygons1[j])
+
+        return similarity
+
+    def _calc_cost_matrix(self, int_objects, old_objects, start_frame, overlap, dimension):
+        # Only the shapes of the same type and label can be similar,
+        # so the similarity is computed for such groups of shapes at once
+        def _group_objects(objects):
+            groups = {}
+            for i, obj in enumerate(objects):
+                groups.setdefault((str(obj["type"]), obj.get("label_id")), []).append(i)
+            return groups
+
+        cost_matrix = np.ones(shape=(len(int_objects), len(old_objects)), dtype=float)
+
+        old_groups = _group_objects(old_objects)
+        for (shape_type, label_id), rows in _group_objects(int_objects).items():
+            cols = old_groups.get((shape_type, label_id))
+            if not cols:
+                continue
+
+            int_group = [int_objects[i] for i in rows]
+            old_group = [old_objects[j] for j in cols]
+            if shape_type == ShapeType.RECTANGLE:
+                # FIXME: need to consider rotated boxes
+                similarity = _calc_boxes_iou(
+                    np.array([obj["points"] for obj in int_group], dtype=float),
+                    np.array([obj["points"] for obj in old_group], dtype=float),
+                )
+            elif shape_type == ShapeType.CUBOID and dimension == DimensionType.DIM_3D:
+                similarity = self._calc_cuboids_3d_similarity_matrix(int_group, old_group)
+            elif shape_type == ShapeType.POLYGON:
+                similarity = self._calc_polygons_similarity_matrix(int_group, old_group)
+            else:
+                continue # FIXME: need some similarity for points, polylines, ellipses and 2D cuboids
+
+            cost_matrix[np.ix_(rows, cols)] = 1 - similarity
+
+        return cost_matrix
+
     @staticmethod
     def _unite_objects(obj0, obj1):
         # TODO: improve the trivial implementation
@@ -436,52 +763,62 @@ class TrackManager(ObjectManager):
     ) -> list:
         shapes = []
         for idx, track in enumerate(self.objects):
-            track_id = track["id"] if use_server_track_ids else idx
-            track_shapes = {}
-
-            for shape in TrackManager.get_interpolated_shapes(
-                track,
-                0,
-                end_frame,
-                self._dimension,
-                include_outside=include_outside,
-                included_frames=included_frames,
-            ):
-                shape["label_id"] = track["label_id"]
-                shape["group"] = track["group"]
-                shape["track_id"] = track_id
-                shape["source"] = track["source"]
-                shape["attributes"] += track["attributes"]
-                shape["elements"] = []
-
-                track_shapes[shape["frame"]] = shape
-
-            if not track_shapes:
-                # This track has no elements on the included frames
-                continue
+            shapes.extend(self._get_track_shapes(track, idx, end_frame,
+                included_frames=included_frames, include_outside=include_outside,
+                use_server_track_ids=use_server_track_ids
+            ))
+        return shapes
 
-            if track.get("elements"):
-                track_elements = TrackManager(track["elements"], self._dimension)
-                element_shapes = track_elements.to_shapes(end_frame,
-                    included_frames=set(track_shapes.keys()).intersection(included_frames or []),
-                    include_outside=True, # elements are controlled by the parent shape
-                    use_server_track_ids=use_server_track_ids
-                )
+    def _get_track_shapes(self, track, idx: int, end_frame: int, *,
+        included_frames: Optional[Sequence[int]] = None,
+        include_outside: bool = False,
+        use_server_track_ids: bool = False
+    ) -> list:
+        track_id = track["id"] if use_server_track_ids else idx
+        track_shapes = {}
+
+        for shape in TrackManager.get_interpolated_shapes(
+            track,
+            0,
+            end_frame,
+            self._dimension,
+            include_outside=include_outside,
+            included_frames=included_frames,
+        ):
+            shape["label_id"] = track["label_id"]
+            shape["group"] = track["group"]
+            shape["track_id"] = track_id
+            shape["source"] = track["source"]
+            shape["attributes"] += track["attributes"]
+            shape["elements"] = []
+
+            track_shapes[shape["frame"]] = shape
+
+        if not track_shapes:
+            # This track has no elements on the included frames
+            return []
+
+        if track.get("elements"):
+            track_elements = TrackManager(track["elements"], self._dimension)
+            element_shapes = track_elements.to_shapes(end_frame,
+                included_frames=set(track_shapes.keys()).intersection(included_frames or []),
+                include_outside=True, # elements are controlled by the parent shape
+                use_server_track_ids=use_server_track_ids
+            )
 
-                for shape in element_shapes:
-                    track_shapes[shape["frame"]]["elements"].append(shape)
+            for shape in element_shapes:
+                track_shapes[shape["frame"]]["elements"].append(shape)
 
-                # The whole shape can be filtered out, if all its elements are outside,
-                # and outside shapes are not requested.
-                if not include_outside:
-                    track_shapes = {
-                        frame_number: shape for frame_number, shape in track_shapes.items()
-                        if not shape["elements"]
-                        or not all(elem["outside"] for elem in shape["elements"])
-                    }
+            # The whole shape can be filtered out, if all its elements are outside,
+            # and outside shapes are not requested.
+            if not include_outside:
+                track_shapes = {
+                    frame_number: shape for frame_number, shape in track_shapes.items()
+                    if not shape["elements"]
+                    or not all(elem["outside"] for elem in shape["elements"])
+                }
 
-            shapes.extend(track_shapes.values())
-        return shapes
+        return list(track_shapes.values())
 
     @staticmethod
     def _get_objects_by_frame(objects, start_frame):
@@ -548,6 +885,12 @@ class TrackManager(ObjectManager):
             for element in obj.get("elements", []):
                 self._modify_unmatched_object(element, end_frame)
 
+    @staticmethod
+    def _propagate_attributes(prev_shape, shape):
+        for attr in prev_shape["attributes"]:
+            if attr["spec_id"] not in map(lambda el: el["spec_id"], shape["attributes"]):
+                shape["attributes"].append(deepcopy_simple(attr))
+
     @staticmethod
     def get_interpolated_shapes(
         track, start_frame, end_frame, dimension, *,
@@ -586,37 +929,55 @@ class TrackManager(ObjectManager):
 
             return angle_diff
 
-        def simple_interpolation(shape0, shape1):
-            shapes = []
-            distance = shape1["frame"] - shape0["frame"]
-            diff = np.subtract(shape1["points"], shape0["points"])
+        def get_interpolated_frames(shape0, shape1):
+            # Returns the requested frames between the keyframes and their offsets
+            # from the left keyframe, as arrays for computing all the frames at once
+            frames = range(shape0["frame"] + 1, shape1["frame"])
+            if included_frames is not None:
+                frames = [frame for frame in frames if frame in included_frames]
+
+            frames = np.asarray(frames, dtype=int)
+            offsets = (frames - shape0["frame"]) / (shape1["frame"] - shape0["frame"])
+            return frames, offsets
 
-            for frame in range(shape0["frame"] + 1, shape1["frame"]):
-                offset = (frame - shape0["frame"]) / distance
-                rotation = (shape0["rotation"] + find_angle_diff(
-                    shape1["rotation"], shape0["rotation"],
-                ) * offset + 360) % 360
-                points = shape0["points"] + diff * offset
+        def simple_interpolation(shape0, shape1):
+            frames, offsets = get_interpolated_frames(shape0, shape1)
+            if not len(frames):
+                return []
 
-                if included_frames is None or frame in included_frames:
-                    shapes.append(copy_shape(shape0, frame, points, rotation))
+            diff = np.subtract(shape1["points"], shape0["points"])
+            rotations = (shape0["rotation"] + find_angle_diff(
+                shape1["rotation"], shape0["rotation"],
+            ) * offsets + 360) % 360
+            points = np.asarray(shape0["points"]) + diff * offsets[:, np.newaxis]
 
-            return shapes
+            return [
+                copy_shape(shape0, frame, frame_points, rotation)
+                for frame, frame_points, rotation in zip(
+                    frames.tolist(), points, rotations.tolist()
+                )
+            ]
 
         def simple_3d_interpolation(shape0, shape1):
             result = simple_interpolation(shape0, shape1)
+            if not result:
+                return result
+
             angles = (shape0["points"][3:6] + shape1["points"][3:6])
-            distance = shape1["frame"] - shape0["frame"]
-
-            for shape in result:
-                offset = (shape["frame"] - shape0["frame"]) / distance
-                for i, angle0 in enumerate(angles):
-                    if i < 3:
-                        angle1 = angles[i + 3]
-                        angle0 = (angle0 if angle0 >= 0 else angle0 + math.pi * 2) * 180 / math.pi
-                        angle1 = (angle1 if angle1 >= 0 else angle1 + math.pi * 2) * 180 / math.pi
-                        angle = angle0 + find_angle_diff(angle1, angle0) * offset * math.pi / 180
-                        shape["points"][i + 3] = angle if angle <= math.pi else angle - math.pi * 2
+            _, offsets = get_interpolated_frames(shape0, shape1)
+
+            interpolated_angles = []
+            for i, angle0 in enumerate(angles[:3]):
+                angle1 = angles[i + 3]
+                angle0 = (angle0 if angle0 >= 0 else angle0 + math.pi * 2) * 180 / math.pi
+                angle1 = (angle1 if angle1 >= 0 else angle1 + math.pi * 2) * 180 / math.pi
+                angle = angle0 + find_angle_diff(angle1, angle0) * offsets * math.pi / 180
+                interpolated_angles.append(
+                    np.where(angle <= math.pi, angle, angle - math.pi * 2).tolist()
+                )
+
+            for shape, shape_angles in zip(result, zip(*interpolated_angles)):
+                shape["points"][3:3 + len(shape_angles)] = shape_angles
 
             return result
 
@@ -624,14 +985,10 @@ class TrackManager(ObjectManager):
             if len(shape0["points"]) == 2 and len(shape1["points"]) == 2:
                 return simple_interpolation(shape0, shape1)
             else:
-                shapes = []
-                for frame in range(shape0["frame"] + 1, shape1["frame"]):
-                    if included_frames is None or frame in included_frames:
-                        shapes.append(copy_shape(shape0, frame))
-
-            return shapes
+                frames, _ = get_interpolated_frames(shape0, shape1)
+                return [copy_shape(shape0, frame) for frame in frames.tolist()]
 
-        def interpolate_position(left_position, right_position, offset):
+        def interpolate_positions(left_position, right_position, offsets):
             def to_array(points):
                 return np.asarray(
                     list(map(lambda point: [point["x"], point["y"]], points))
@@ -809,23 +1166,32 @@ class TrackManager(ObjectManager):
                 left_offset_vec, right_offset_vec, matching
             )
 
-            interpolated_points = []
-            for left_point_index, left_point in enumerate(left_points):
+            # The point matching doesn't depend on the offset,
+            # so the matched points are interpolated for all the offsets at once
+            left_indices = []
+            right_indices = []
+            for left_point_index in range(len(left_points)):
                 for right_point_index in completed_matching[left_point_index]:
-                    right_point = right_points[right_point_index]
-                    interpolated_points.append({
-                        "x": left_point["x"] + (right_point["x"] - left_point["x"]) * offset,
-                        "y": left_point["y"] + (right_point["y"] - left_point["y"]) * offset
-                    })
-
-            reducedPoints = reduce_interpolation(
-                interpolated_points,
-                completed_matching,
-                left_points,
-                right_points
-            )
+                    left_indices.append(left_point_index)
+                    right_indices.append(right_point_index)
+
+            matched_left = np.asarray(left_position["points"]).reshape(-1, 2)[left_indices]
+            matched_right = np.asarray(right_position["points"]).reshape(-1, 2)[right_indices]
+            interpolated = matched_left + \
+                (matched_right - matched_left) * offsets[:, np.newaxis, np.newaxis]
+
+            positions = []
+            for frame_points in interpolated:
+                reducedPoints = reduce_interpolation(
+                    [{"x": x, "y": y} for x, y in frame_points],
+                    completed_matching,
+                    left_points,
+                    right_points
+                )
 
-            return to_array(reducedPoints).tolist()
+                positions.append(to_array(reducedPoints).tolist())
+
+            return positions
 
         def polyshape_interpolation(shape0, shape1):
             shapes = []
@@ -837,12 +1203,11 @@ class TrackManager(ObjectManager):
                 shape0["points"] = shape0["points"] + shape0["points"][:2]
                 shape1["points"] = shape1["points"] + shape1["points"][:2]
 
-            distance = shape1["frame"] - shape0["frame"]
-            for frame in range(shape0["frame"] + 1, shape1["frame"]):
-                offset = (frame - shape0["frame"]) / distance
-                points = interpolate_position(shape0, shape1, offset)
-
-                if included_frames is None or frame in included_frames:
+            frames, offsets = get_interpolated_frames(shape0, shape1)
+            if len(frames):
+                for frame, points in zip(
+                    frames.tolist(), interpolate_positions(shape0, shape1, offsets)
+                ):
                     shapes.append(copy_shape(shape0, frame, points))
 
             if is_polygon:
@@ -917,10 +1282,7 @@ class TrackManager(ObjectManager):
             if prev_shape:
                 assert curr_frame > prev_shape["frame"], f"{curr_frame} > {prev_shape['frame']}. Track id: {track['id']}" # Catch invalid tracks
 
-                # Propagate attributes
-                for attr in prev_shape["attributes"]:
-                    if attr["spec_id"] not in map(lambda el: el["spec_id"], shape["attributes"]):
-                        shape["attributes"].append(deepcopy_simple(attr))
+                TrackManager._propagate_attributes(prev_shape, shape)
 
                 if not prev_shape["outside"] or include_outside:
                     shapes.extend(interpolate(prev_shape, shape))
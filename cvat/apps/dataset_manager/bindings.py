@@ -37,7 +37,7 @@ from cvat.apps.engine.models import (AttributeSpec, AttributeType, Data, Dimensi
                                      Task)
 from cvat.apps.engine.rq_job_handler import RQJobMetaField
 
-from .annotation import AnnotationIR, AnnotationManager, TrackManager
+from .annotation import AnnotationIR, AnnotationManager, AnnotationStream, TrackManager
 from .formats.transformations import MaskConverter, EllipsesToMasks
 
 CVAT_INTERNAL_ATTRIBUTES = {'occluded', 'outside', 'keyframe', 'track_id', 'rotation'}
@@ -403,43 +403,38 @@ class CommonData(InstanceLabelData):
             type=label.type
         )
 
-    def group_by_frame(self, include_empty: bool = False):
-        frames = {}
+    def _make_frame(self, idx: int) -> CommonData.Frame:
+        frame_info = self._frame_info[idx]
+        return CommonData.Frame(
+            idx=idx,
+            id=frame_info.get("id", 0),
+            subset=frame_info["subset"],
+            frame=self.abs_frame_id(idx),
+            name=frame_info["path"],
+            height=frame_info["height"],
+            width=frame_info["width"],
+            labeled_shapes=[],
+            tags=[],
+            shapes=[],
+            labels={}
+        )
+
+    def _export_labels(self) -> Dict[int, CommonData.Label]:
+        return {
+            label.id: label
+            for label in map(self._export_label, self._label_mapping.values())
+        }
+
+    def _add_frame_annotations(self, frames: dict, shapes, tags, included_frames, *,
+        labels: Dict[int, CommonData.Label]
+    ):
         def get_frame(idx):
-            frame_info = self._frame_info[idx]
             frame = self.abs_frame_id(idx)
             if frame not in frames:
-                frames[frame] = CommonData.Frame(
-                    idx=idx,
-                    id=frame_info.get("id", 0),
-                    subset=frame_info["subset"],
-                    frame=frame,
-                    name=frame_info["path"],
-                    height=frame_info["height"],
-                    width=frame_info["width"],
-                    labeled_shapes=[],
-                    tags=[],
-                    shapes=[],
-                    labels={}
-                )
+                frames[frame] = self._make_frame(idx)
             return frames[frame]
 
-        included_frames = self.get_included_frames()
-
-        if include_empty:
-            for idx in sorted(set(self._frame_info) & included_frames):
-                get_frame(idx)
-
-        anno_manager = AnnotationManager(self._annotation_ir)
-        for shape in sorted(
-            anno_manager.to_shapes(self.stop, self._annotation_ir.dimension,
-                # Skip outside, deleted and excluded frames
-                included_frames=included_frames,
-                include_outside=False,
-                use_server_track_ids=self._use_server_track_ids
-            ),
-            key=lambda shape: shape.get("z_order", 0)
-        ):
+        for shape in sorted(shapes, key=lambda shape: shape.get("z_order", 0)):
             shape_data = ''
 
             if 'track_id' in shape:
@@ -453,21 +448,71 @@ class CommonData(InstanceLabelData):
             get_frame(shape['frame']).labeled_shapes.append(exported_shape)
 
             if shape_data:
-                get_frame(shape['frame']).shapes.append(shape_data)
-                for label in self._label_mapping.values():
-                    label = self._export_label(label)
-                    get_frame(shape['frame']).labels.update({label.id: label})
+                frame_data = get_frame(shape['frame'])
+                frame_data.shapes.append(shape_data)
+                if frame_data.labels is not labels:
+                    # The label descriptors are the same for all the frames
+                    frames[frame_data.frame] = frame_data._replace(labels=labels)
 
-        for tag in self._annotation_ir.tags:
+        for tag in tags:
             if tag['frame'] not in included_frames:
                 continue
             get_frame(tag['frame']).tags.append(self._export_tag(tag))
 
+    def group_by_frame(self, include_empty: bool = False):
+        included_frames = self.get_included_frames()
+
+        if isinstance(self._annotation_ir, AnnotationStream):
+            return self._group_stream_by_frame(included_frames, include_empty=include_empty)
+
+        frames = {}
+        if include_empty:
+            for idx in sorted(set(self._frame_info) & included_frames):
+                frames[self.abs_frame_id(idx)] = self._make_frame(idx)
+
+        anno_manager = AnnotationManager(self._annotation_ir)
+        self._add_frame_annotations(frames,
+            anno_manager.to_shapes(self.stop, self._annotation_ir.dimension,
+                # Skip outside, deleted and excluded frames
+                included_frames=included_frames,
+                include_outside=False,
+                use_server_track_ids=self._use_server_track_ids
+            ),
+            self._annotation_ir.tags,
+            included_frames,
+            labels=self._export_labels(),
+        )
+
         return iter(frames.values())
 
+    def _group_stream_by_frame(self, included_frames, *, include_empty: bool = False):
+        # The frames are produced in order, only the current frame range is kept in memory
+        labels = self._export_labels()
+        for frame_range, shapes, tags in self._annotation_ir.iter_frame_ranges(self.stop,
+            included_frames=included_frames,
+            use_server_track_ids=self._use_server_track_ids
+        ):
+            frames = {}
+            if include_empty:
+                for idx in frame_range:
+                    if idx in self._frame_info and idx in included_frames:
+                        frames[self.abs_frame_id(idx)] = self._make_frame(idx)
+
+            self._add_frame_annotations(frames, shapes, tags, included_frames, labels=labels)
+
+            for frame in sorted(frames):
+                yield frames[frame]
+
+    def _iter_merged_objects(self, field: str) -> Iterable[dict]:
+        if isinstance(self._annotation_ir, AnnotationStream):
+            for released in self._annotation_ir.iter_merged_objects():
+                yield from released[field]
+        else:
+            yield from self._annotation_ir[field]
+
     @property
     def shapes(self):
-        for shape in self._annotation_ir.shapes:
+        for shape in self._iter_merged_objects("shapes"):
             if not self._is_frame_deleted(shape["frame"]):
                 yield self._export_labeled_shape(shape)
 
@@ -490,12 +535,12 @@ class CommonData(InstanceLabelData):
 
     @property
     def tracks(self):
-        for idx, track in enumerate(self._annotation_ir.tracks):
+        for idx, track in enumerate(self._iter_merged_objects("tracks")):
             yield self._export_track(track, idx)
 
     @property
     def tags(self):
-        for tag in self._annotation_ir.tags:
+        for tag in self._iter_merged_objects("tags"):
             if tag["frame"] not in self._deleted_frames:
                 yield self._export_tag(tag)
 
@@ -1138,63 +1183,109 @@ class ProjectData(InstanceLabelData):
                 for i, element in enumerate(track.get("elements", []))]
         )
 
-    def group_by_frame(self, include_empty=False):
-        frames: Dict[Tuple[str, int], ProjectData.Frame] = {}
+    def _make_frame(self, task_id: int, idx: int) -> ProjectData.Frame:
+        frame_info = self._frame_info[(task_id, idx)]
+        return ProjectData.Frame(
+            task_id=task_id,
+            subset=frame_info["subset"],
+            idx=idx,
+            id=frame_info.get('id',0),
+            frame=self.abs_frame_id(task_id, idx),
+            name=frame_info["path"],
+            height=frame_info["height"],
+            width=frame_info["width"],
+            labeled_shapes=[],
+            tags=[],
+        )
+
+    def _add_frame_annotations(self, frames: dict, task: Task, shapes, tags):
         def get_frame(task_id: int, idx: int) -> ProjectData.Frame:
             frame_info = self._frame_info[(task_id, idx)]
             abs_frame = self.abs_frame_id(task_id, idx)
             if (frame_info["subset"], abs_frame) not in frames:
-                frames[(frame_info["subset"], abs_frame)] = ProjectData.Frame(
-                    task_id=task_id,
-                    subset=frame_info["subset"],
-                    idx=idx,
-                    id=frame_info.get('id',0),
-                    frame=abs_frame,
-                    name=frame_info["path"],
-                    height=frame_info["height"],
-                    width=frame_info["width"],
-                    labeled_shapes=[],
-                    tags=[],
-                )
+                frames[(frame_info["subset"], abs_frame)] = self._make_frame(task_id, idx)
             return frames[(frame_info["subset"], abs_frame)]
 
+        for shape in sorted(shapes, key=lambda shape: shape.get("z_order", 0)):
+            if (task.id, shape['frame']) not in self._frame_info or (task.id, shape['frame']) in self._deleted_frames:
+                continue
+
+            if 'track_id' in shape:
+                if shape['outside']:
+                    continue
+                exported_shape = self._export_tracked_shape(shape, task.id)
+            else:
+                exported_shape = self._export_labeled_shape(shape, task.id)
+            get_frame(task.id, shape['frame']).labeled_shapes.append(exported_shape)
+
+        for tag in tags:
+            if (task.id, tag['frame']) not in self._frame_info:
+                continue
+            get_frame(task.id, tag['frame']).tags.append(self._export_tag(tag, task.id))
+
+    def group_by_frame(self, include_empty=False):
+        if any(isinstance(annotation_ir, AnnotationStream)
+            for annotation_ir in self._annotation_irs.values()
+        ):
+            return self._group_stream_by_frame(include_empty=include_empty)
+
+        frames: Dict[Tuple[str, int], ProjectData.Frame] = {}
+
         if include_empty:
             for ident in sorted(self._frame_info):
                 if ident not in self._deleted_frames:
-                    get_frame(*ident)
+                    frame_info = self._frame_info[ident]
+                    frames[(frame_info["subset"], self.abs_frame_id(*ident))] = \
+                        self._make_frame(*ident)
 
         for task in self._db_tasks.values():
             anno_manager = AnnotationManager(self._annotation_irs[task.id])
-            for shape in sorted(
+            self._add_frame_annotations(frames, task,
                 anno_manager.to_shapes(
                     task.data.size, self._annotation_irs[task.id].dimension,
                     include_outside=False,
                     use_server_track_ids=self._use_server_track_ids
                 ),
-                key=lambda shape: shape.get("z_order", 0)
-            ):
-                if (task.id, shape['frame']) not in self._frame_info or (task.id, shape['frame']) in self._deleted_frames:
-                    continue
-
-                if 'track_id' in shape:
-                    if shape['outside']:
-                        continue
-                    exported_shape = self._export_tracked_shape(shape, task.id)
-                else:
-                    exported_shape = self._export_labeled_shape(shape, task.id)
-                get_frame(task.id, shape['frame']).labeled_shapes.append(exported_shape)
-
-            for tag in self._annotation_irs[task.id].tags:
-                if (task.id, tag['frame']) not in self._frame_info:
-                    continue
-                get_frame(task.id, tag['frame']).tags.append(self._export_tag(tag, task.id))
+                self._annotation_irs[task.id].tags
+            )
 
         return iter(frames.values())
 
+    def _group_stream_by_frame(self, include_empty: bool = False):
+        # The frames are produced task by task in the same order as the empty frames
+        # are added in the non-streaming mode, only the current frame range is kept in memory
+        for task_id in sorted(self._db_tasks):
+            task = self._db_tasks[task_id]
+            annotation_stream = self._annotation_irs[task_id]
+            for frame_range, shapes, tags in annotation_stream.iter_frame_ranges(task.data.size,
+                use_server_track_ids=self._use_server_track_ids
+            ):
+                frames: Dict[Tuple[str, int], ProjectData.Frame] = {}
+                if include_empty:
+                    for idx in frame_range:
+                        ident = (task_id, idx)
+                        if ident in self._frame_info and ident not in self._deleted_frames:
+                            frame_info = self._frame_info[ident]
+                            frames[(frame_info["subset"], self.abs_frame_id(*ident))] = \
+                                self._make_frame(*ident)
+
+                self._add_frame_annotations(frames, task, shapes, tags)
+
+                for key in sorted(frames, key=lambda key: key[1]):
+                    yield frames[key]
+
+    def _iter_merged_objects(self, task_id: int, field: str) -> Iterable[dict]:
+        annotation_ir = self._annotation_irs[task_id]
+        if isinstance(annotation_ir, AnnotationStream):
+            for released in annotation_ir.iter_merged_objects():
+                yield from released[field]
+        else:
+            yield from annotation_ir[field]
+
     @property
     def shapes(self):
         for task in self._db_tasks.values():
-            for shape in self._annotation_irs[task.id].shapes:
+            for shape in self._iter_merged_objects(task.id, "shapes"):
                 if (task.id, shape['frame']) not in self._deleted_frames:
                     yield self._export_labeled_shape(shape, task.id)
 
@@ -1202,13 +1293,13 @@ class ProjectData(InstanceLabelData):
     def tracks(self):
         idx = 0
         for task in self._db_tasks.values():
-            for track in self._annotation_irs[task.id].tracks:
+            for track in self._iter_merged_objects(task.id, "tracks"):
                 yield self._export_track(track, task.id, task.data.size, idx)
 
     @property
     def tags(self):
         for task in self._db_tasks.values():
-            for tag in self._annotation_irs[task.id].tags:
+            for tag in self._iter_merged_objects(task.id, "tags"):
                 if (task.id, tag['frame']) not in self._deleted_frames:
                     yield self._export_tag(tag, task.id)
 
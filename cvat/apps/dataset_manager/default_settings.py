@@ -4,6 +4,8 @@
 
 import os
 
+from attr.converters import to_bool
+
 DATASET_CACHE_TTL = int(os.getenv("CVAT_DATASET_CACHE_TTL", 60 * 60 * 24))
 "Base lifetime for cached exported datasets, in seconds"
 
@@ -12,3 +14,32 @@ DATASET_CACHE_LOCK_TIMEOUT = int(os.getenv("CVAT_DATASET_CACHE_LOCK_TIMEOUT", 10
 
 DATASET_EXPORT_LOCKED_RETRY_INTERVAL = int(os.getenv("CVAT_DATASET_EXPORT_LOCKED_RETRY_INTERVAL", 60))
 "Retry interval for cases the export cache lock was unavailable, in seconds"
+
+DATASET_EXPORT_STREAMING = to_bool(os.getenv("CVAT_DATASET_EXPORT_STREAMING", True))
+"""
+Read the task annotations job by job during the export for the formats supporting this,
+instead of loading all the task annotations before the export
+"""
+
+DATASET_ANNOTATION_LOADING_THREADS = int(os.getenv("CVAT_DATASET_ANNOTATION_LOADING_THREADS", 1))
+"""
+The number of threads loading the job annotations of a task concurrently
+for the task annotation reads and exports. 0 or 1 disables the concurrent loading.
+Each thread uses its own DB connection, so each server and worker process can open
+up to this number of extra DB connections, which must fit in the DB connection limit
+"""
+
+DATASET_ANNOTATION_CACHE = to_bool(os.getenv("CVAT_DATASET_ANNOTATION_CACHE", True))
+"""
+Keep the serialized job annotations in the media cache and serve the repeated
+job annotation reads from it, while the job is not changed
+"""
+
+DATASET_ANNOTATION_CACHE_TTL = int(os.getenv("CVAT_DATASET_ANNOTATION_CACHE_TTL", 60 * 60 * 24))
+"Lifetime for cached job annotations, in seconds"
+
+DATASET_ANNOTATION_CHANGES_RETENTION = int(os.getenv("CVAT_DATASET_ANNOTATION_CHANGES_RETENTION", 1000))
+"""
+The number of the latest job annotation versions, for which the annotation changes are kept.
+Older changes are removed, and the changes since an older version can't be requested
+"""
@@ -15,7 +15,7 @@ from cvat.apps.dataset_manager.util import make_zip_archive
 
 from .registry import dm_env, exporter, importer
 
-@exporter(name='COCO', ext='ZIP', version='1.0')
+@exporter(name='COCO', ext='ZIP', version='1.0', streaming=True)
 def _export(dst_file, temp_dir, instance_data, save_images=False):
     with GetCVATDataExtractor(instance_data, include_images=save_images) as extractor:
         dataset = Dataset.from_extractors(extractor, env=dm_env)
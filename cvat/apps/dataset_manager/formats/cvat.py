@@ -3,13 +3,13 @@
 #
 # SPDX-License-Identifier: MIT
 
-import os
 import os.path as osp
 import zipfile
 from collections import OrderedDict
+from contextlib import contextmanager
 from glob import glob
 from io import BufferedWriter
-from typing import Callable
+from typing import Callable, Iterator, Optional, Set
 
 from datumaro.components.annotation import (AnnotationType, Bbox, Label,
                                             LabelCategories, Points, Polygon,
@@ -26,7 +26,6 @@ from cvat.apps.dataset_manager.bindings import (ProjectData, CommonData, detect_
                                                 get_defaulted_subset,
                                                 import_dm_annotations,
                                                 match_dm_item)
-from cvat.apps.dataset_manager.util import make_zip_archive
 from cvat.apps.engine.frame_provider import FrameProvider
 
 from .registry import dm_env, exporter, importer
@@ -1370,7 +1369,9 @@ def dump_project_anno(dst_file: BufferedWriter, project_data: ProjectData, callb
     callback(dumper, project_data)
     dumper.close_document()
 
-def dump_media_files(instance_data: CommonData, img_dir: str, project_data: ProjectData = None):
+def dump_media_files(instance_data: CommonData, archive: zipfile.ZipFile, img_dir: str,
+    project_data: ProjectData = None, saved_paths: Optional[Set[str]] = None
+):
     ext = ''
     if instance_data.meta[instance_data.META_FIELD]['mode'] == 'interpolation':
         ext = FrameProvider.VIDEO_FRAME_EXT
@@ -1386,36 +1387,45 @@ def dump_media_files(instance_data: CommonData, img_dir: str, project_data: Proj
             continue
         frame_name = instance_data.frame_info[frame_id]['path'] if project_data is None \
             else project_data.frame_info[(instance_data.db_instance.id, frame_id)]['path']
-        img_path = osp.join(img_dir, frame_name + ext)
-        os.makedirs(osp.dirname(img_path), exist_ok=True)
-        with open(img_path, 'wb') as f:
-            f.write(frame_data.getvalue())
+        frame_path = osp.join(img_dir, frame_name + ext)
+        if saved_paths is not None:
+            if frame_path in saved_paths:
+                continue
+            saved_paths.add(frame_path)
 
-def _export_task_or_job(dst_file, temp_dir, instance_data, anno_callback, save_images=False):
-    with open(osp.join(temp_dir, 'annotations.xml'), 'wb') as f:
-        dump_task_or_job_anno(f, instance_data, anno_callback)
+        archive.writestr(frame_path, frame_data.getvalue())
 
-    if save_images:
-        dump_media_files(instance_data, osp.join(temp_dir, 'images'))
+@contextmanager
+def _open_archive_file(archive: zipfile.ZipFile, path: str) -> Iterator[BufferedWriter]:
+    # The file is written directly into the archive, its final size is not known in advance
+    with BufferedWriter(archive.open(path, 'w', force_zip64=True)) as f:
+        yield f
+
+def _export_task_or_job(dst_file, temp_dir, instance_data, anno_callback, save_images=False):
+    with zipfile.ZipFile(dst_file, 'w') as archive:
+        with _open_archive_file(archive, 'annotations.xml') as f:
+            dump_task_or_job_anno(f, instance_data, anno_callback)
 
-    make_zip_archive(temp_dir, dst_file)
+        if save_images:
+            dump_media_files(instance_data, archive, 'images')
 
 def _export_project(dst_file: str, temp_dir: str, project_data: ProjectData,
     anno_callback: Callable, save_images: bool=False
 ):
-    with open(osp.join(temp_dir, 'annotations.xml'), 'wb') as f:
-        dump_project_anno(f, project_data, anno_callback)
-
-    if save_images:
-        for task_data in project_data.task_data:
-            subset = get_defaulted_subset(task_data.db_instance.subset, project_data.subsets)
-            subset_dir = osp.join(temp_dir, 'images', subset)
-            os.makedirs(subset_dir, exist_ok=True)
-            dump_media_files(task_data, subset_dir, project_data)
-
-    make_zip_archive(temp_dir, dst_file)
-
-@exporter(name='CVAT for video', ext='ZIP', version='1.1')
+    with zipfile.ZipFile(dst_file, 'w') as archive:
+        with _open_archive_file(archive, 'annotations.xml') as f:
+            dump_project_anno(f, project_data, anno_callback)
+
+        if save_images:
+            # Tasks can have images with the same names, and the archive entries
+            # must be unique, so only the first of such images is saved
+            saved_paths = set()
+            for task_data in project_data.task_data:
+                subset = get_defaulted_subset(task_data.db_instance.subset, project_data.subsets)
+                dump_media_files(task_data, archive, osp.join('images', subset), project_data,
+                    saved_paths=saved_paths)
+
+@exporter(name='CVAT for video', ext='ZIP', version='1.1', streaming=True)
 def _export_video(dst_file, temp_dir, instance_data, save_images=False):
     if isinstance(instance_data, ProjectData):
         _export_project(dst_file, temp_dir, instance_data,
@@ -1424,7 +1434,7 @@ def _export_video(dst_file, temp_dir, instance_data, save_images=False):
         _export_task_or_job(dst_file, temp_dir, instance_data,
             anno_callback=dump_as_cvat_interpolation, save_images=save_images)
 
-@exporter(name='CVAT for images', ext='ZIP', version='1.1')
+@exporter(name='CVAT for images', ext='ZIP', version='1.1', streaming=True)
 def _export_images(dst_file, temp_dir, instance_data, save_images=False):
     if isinstance(instance_data, ProjectData):
         _export_project(dst_file, temp_dir, instance_data,
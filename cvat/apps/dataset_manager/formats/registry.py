@@ -16,6 +16,10 @@ class _Format:
     ENABLED = True
 
 class Exporter(_Format):
+    # The exporter only uses the frame-grouped annotations,
+    # which can be read from the DB part by part during the export
+    STREAMING = False
+
     def __call__(self, dst_file, temp_dir, instance_data, **options):
         raise NotImplementedError()
 
@@ -64,12 +68,14 @@ def format_for(export_format, mode):
     return format_name
 
 
-def exporter(name, version, ext, display_name=None, enabled=True, dimension=DimensionType.DIM_2D):
+def exporter(name, version, ext, display_name=None, enabled=True, dimension=DimensionType.DIM_2D,
+        streaming=False):
     assert name not in EXPORT_FORMATS, "Export format '%s' already registered" % name
     def wrap_with_params(f_or_cls):
         t = _wrap_format(f_or_cls, Exporter,
             name=name, ext=ext, version=version, display_name=display_name,
             enabled=enabled, dimension=dimension)
+        t.STREAMING = streaming
         key = t.DISPLAY_NAME
         assert key not in EXPORT_FORMATS, "Export format '%s' already registered" % name
         EXPORT_FORMATS[key] = t
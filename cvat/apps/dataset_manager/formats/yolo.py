@@ -18,7 +18,7 @@ from datumaro.plugins.yolo_format.extractor import YoloExtractor
 from .registry import dm_env, exporter, importer
 
 
-@exporter(name='YOLO', ext='ZIP', version='1.1')
+@exporter(name='YOLO', ext='ZIP', version='1.1', streaming=True)
 def _export(dst_file, temp_dir, instance_data, save_images=False):
     with GetCVATDataExtractor(instance_data, include_images=save_images) as extractor:
         dataset = Dataset.from_extractors(extractor, env=dm_env)
@@ -32,11 +32,17 @@ def export_project(project_id, dst_file, format_name,
     # But there is the bug with corrupted dump file in case 2 or
     # more dump request received at the same time:
     # https://github.com/cvat-ai/cvat/issues/217
+    exporter = make_exporter(format_name)
+    streaming = exporter.STREAMING and settings.DATASET_EXPORT_STREAMING
+
     with transaction.atomic():
         project = ProjectAnnotationAndData(project_id)
-        project.init_from_db()
+        if streaming:
+            # The annotations are read job by job during the export
+            project.init_streams()
+        else:
+            project.init_from_db(concurrent=True)
 
-    exporter = make_exporter(format_name)
     with open(dst_file, 'wb') as f:
         project.export(f, exporter, host=server_url, save_images=save_images)
 
@@ -121,15 +127,21 @@ class ProjectAnnotationAndData:
         if attributes:
             models.AttributeSpec.objects.bulk_create([a[1] for a in attributes])
 
-    def init_from_db(self):
+    def init_from_db(self, *, concurrent: bool = False):
         self.reset()
 
         for task in self.db_tasks:
             annotation = TaskAnnotation(pk=task.id)
-            annotation.init_from_db()
+            annotation.init_from_db(concurrent=concurrent)
             self.task_annotations[task.id] = annotation
             self.annotation_irs[task.id] = annotation.ir_data
 
+    def init_streams(self):
+        for task in self.db_tasks:
+            annotation = TaskAnnotation(pk=task.id)
+            self.task_annotations[task.id] = annotation
+            self.annotation_irs[task.id] = annotation.init_stream()
+
     def export(self, dst_file: str, exporter: Callable, host: str='', **options):
         project_data = ProjectData(
             annotation_irs=self.annotation_irs,
@@ -0,0 +1,22 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from django.db.models.query import QuerySet
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from cvat.apps.dataset_manager.task import save_label_deletion_changes
+from cvat.apps.engine.models import Label
+
+
+@receiver(pre_delete, sender=Label, dispatch_uid=__name__ + ".delete_label-save_annotation_changes")
+def __delete_label__save_annotation_changes(instance, origin, **kwargs):
+    # The jobs are removed together with their labels when a task or a project is deleted,
+    # the changes are only needed when the labels are deleted by themselves
+    if not (
+        isinstance(origin, Label) or isinstance(origin, QuerySet) and origin.model is Label
+    ):
+        return
+
+    save_label_deletion_changes(instance)
@@ -3,30 +3,40 @@
 #
 # SPDX-License-Identifier: MIT
 
+import json
 import os
+import zlib
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from enum import Enum
+from functools import partial
 from tempfile import TemporaryDirectory
+from typing import Iterable, Optional, Tuple
+
+import redis
 from datumaro.components.errors import DatasetError, DatasetImportError, DatasetNotFoundError
 
-from django.db import transaction
+from django.db import connection, connections, transaction
+from django.db.models import Max
 from django.db.models.query import Prefetch
 from django.conf import settings
 from rest_framework.exceptions import ValidationError
 
 from cvat.apps.engine import models, serializers
+from cvat.apps.engine.cache_tiers import get_media_redis_connection
 from cvat.apps.engine.plugins import plugin_decorator
-from cvat.apps.engine.log import DatasetLogManager
+from cvat.apps.engine.log import DatasetLogManager, ServerLogManager
 from cvat.apps.events.handlers import handle_annotations_change
 from cvat.apps.profiler import silk_profile
 
-from cvat.apps.dataset_manager.annotation import AnnotationIR, AnnotationManager
+from cvat.apps.dataset_manager.annotation import AnnotationIR, AnnotationManager, AnnotationStream
 from cvat.apps.dataset_manager.bindings import TaskData, JobData, CvatImportError, CvatDatasetNotFoundError
 from cvat.apps.dataset_manager.formats.registry import make_exporter, make_importer
 from cvat.apps.dataset_manager.util import add_prefetch_fields, bulk_create, get_cached
 
 dlogger = DatasetLogManager()
+slogger = ServerLogManager(__name__)
 
 class dotdict(OrderedDict):
     """dot.notation access to dictionary attributes"""
@@ -76,6 +86,171 @@ def merge_table_rows(rows, keys_for_merge, field_id):
 
     return list(merged_rows.values())
 
+class AnnotationChangesExpiredError(Exception):
+    pass
+
+def _save_annotation_changes(
+    job_id: int,
+    changes: Iterable[Tuple[models.AnnotationChangeAction, models.AnnotationObjectType, int]],
+) -> int:
+    """
+    Records the job annotation changes as a new annotation version. Returns the version.
+    """
+
+    # The job row lock makes the concurrent requests increment the version one by one
+    models.Job.objects.select_for_update().filter(id=job_id).values_list('id').get()
+
+    job_changes = models.AnnotationChange.objects.filter(job_id=job_id)
+    version = 1 + (job_changes.aggregate(version=Max('version'))['version'] or 0)
+
+    models.AnnotationChange.objects.bulk_create(
+        models.AnnotationChange(
+            job_id=job_id,
+            version=version,
+            object_type=str(object_type),
+            object_id=object_id,
+            action=str(action),
+        )
+        for action, object_type, object_id in changes
+    )
+
+    # Only the changes of the latest versions are kept
+    job_changes.filter(
+        version__lte=version - settings.DATASET_ANNOTATION_CHANGES_RETENTION
+    ).delete()
+
+    return version
+
+def save_label_deletion_changes(db_label: models.Label):
+    """
+    Records the deletion of the job annotations, which are removed together with the label.
+    The removed skeleton elements are recorded as the updates of their skeletons.
+    """
+
+    job_changes = {}
+    for object_type, model in (
+        (models.AnnotationObjectType.TAG, models.LabeledImage),
+        (models.AnnotationObjectType.SHAPE, models.LabeledShape),
+        (models.AnnotationObjectType.TRACK, models.LabeledTrack),
+    ):
+        fields = ['job_id', 'id']
+        if model is not models.LabeledImage:
+            fields.append('parent_id')
+
+        for row in model.objects.filter(label_id=db_label.id).values(*fields):
+            if row.get('parent_id') is None:
+                change = (models.AnnotationChangeAction.DELETE, object_type, row['id'])
+            else:
+                change = (models.AnnotationChangeAction.UPDATE, object_type, row['parent_id'])
+
+            job_changes.setdefault(row['job_id'], set()).add(change)
+
+    for job_id, changes in job_changes.items():
+        _save_annotation_changes(job_id, changes)
+
+class _RowChanges:
+    """
+    Collects changes of the model rows to apply them with a few bulk queries
+    """
+
+    def __init__(self, db_model):
+        self.db_model = db_model
+        self.created = []
+        self.deleted_ids = []
+        self._updated = {}
+
+    def update(self, db_obj, values):
+        changed_fields = set()
+        for field, value in values.items():
+            if getattr(db_obj, field) != value:
+                setattr(db_obj, field, value)
+                changed_fields.add(field)
+
+        if changed_fields:
+            _, updated_fields = self._updated.setdefault(db_obj.id, (db_obj, set()))
+            updated_fields.update(changed_fields)
+
+    def apply(self):
+        if self.deleted_ids:
+            self.db_model.objects.filter(id__in=self.deleted_ids).delete()
+
+        # Rows with the same changed fields are updated with a single query
+        updated_groups = {}
+        for db_obj, updated_fields in self._updated.values():
+            updated_groups.setdefault(frozenset(updated_fields), []).append(db_obj)
+
+        for updated_fields, db_objects in updated_groups.items():
+            self.db_model.objects.bulk_update(db_objects, fields=sorted(updated_fields))
+
+        if self.created:
+            self.db_model.objects.bulk_create(self.created)
+
+class _JobAnnotationSnapshotCache:
+    """
+    Keeps the serialized job annotations in the media cache, so that the repeated reads
+    of unchanged annotations don't need to load them from the DB and serialize again.
+    The job updated date is used as the annotation version, as it's updated
+    on any annotation and label changes.
+    """
+
+    _KEY_PREFIX = 'job_annotations:'
+    _FORMAT_VERSION = 1
+
+    @classmethod
+    def _make_key(cls, job_id: int) -> str:
+        return f'{cls._KEY_PREFIX}{job_id}'
+
+    @classmethod
+    def get_version(cls, job_id: int) -> Optional[str]:
+        updated_date = models.Job.objects.filter(id=job_id).values_list(
+            'updated_date', flat=True
+        ).first()
+        if updated_date is None:
+            return None
+
+        return f'{cls._FORMAT_VERSION}:{updated_date.isoformat()}'
+
+    @classmethod
+    def get(cls, job_id: int, version: str) -> Optional[dict]:
+        try:
+            cached_version, data = get_media_redis_connection().hmget(
+                cls._make_key(job_id), ['version', 'data']
+            )
+        except redis.RedisError:
+            slogger.glob.warning(
+                f'Failed to read cached annotations of the job #{job_id}', exc_info=True
+            )
+            return None
+
+        if cached_version is None or cached_version.decode() != version or data is None:
+            return None
+
+        return json.loads(zlib.decompress(data))
+
+    @classmethod
+    def set(cls, job_id: int, version: str, data: dict) -> None:
+        key = cls._make_key(job_id)
+        encoded_data = zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+
+        try:
+            with get_media_redis_connection().pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={'version': version, 'data': encoded_data})
+                pipe.expire(key, settings.DATASET_ANNOTATION_CACHE_TTL)
+                pipe.execute()
+        except redis.RedisError:
+            slogger.glob.warning(
+                f'Failed to cache annotations of the job #{job_id}', exc_info=True
+            )
+
+    @classmethod
+    def invalidate(cls, job_id: int) -> None:
+        try:
+            get_media_redis_connection().delete(cls._make_key(job_id))
+        except redis.RedisError:
+            slogger.glob.warning(
+                f'Failed to remove cached annotations of the job #{job_id}', exc_info=True
+            )
+
 class JobAnnotation:
     @classmethod
     def add_prefetch_info(cls, queryset):
@@ -211,143 +386,142 @@ class JobAnnotation:
 
                     self._correct_frame_of_tracked_shapes(track)
 
-    def _save_tracks_to_db(self, tracks):
+    def _create_tracks_in_db(self, tracks, parent_track=None):
+        db_tracks = []
+        db_track_attr_vals = []
+        db_shapes = []
+        db_shape_attr_vals = []
 
-        def create_tracks(tracks, parent_track=None):
-            db_tracks = []
-            db_track_attr_vals = []
-            db_shapes = []
-            db_shape_attr_vals = []
+        self._sync_frames(tracks, parent_track)
 
-            self._sync_frames(tracks, parent_track)
-
-            for track in tracks:
-                track_attributes = track.pop("attributes", [])
-                shapes = track.pop("shapes")
-                elements = track.pop("elements", [])
-                db_track = models.LabeledTrack(job=self.db_job, parent=parent_track, **track)
+        for track in tracks:
+            track_attributes = track.pop("attributes", [])
+            shapes = track.pop("shapes")
+            elements = track.pop("elements", [])
+            db_track = models.LabeledTrack(job=self.db_job, parent=parent_track, **track)
 
-                self._validate_label_for_existence(db_track.label_id)
+            self._validate_label_for_existence(db_track.label_id)
 
-                for attr in track_attributes:
-                    db_attr_val = models.LabeledTrackAttributeVal(**attr, track_id=len(db_tracks))
+            for attr in track_attributes:
+                db_attr_val = models.LabeledTrackAttributeVal(**attr, track_id=len(db_tracks))
 
-                    self._validate_attribute_for_existence(db_attr_val, db_track.label_id, "immutable")
+                self._validate_attribute_for_existence(db_attr_val, db_track.label_id, "immutable")
 
-                    db_track_attr_vals.append(db_attr_val)
+                db_track_attr_vals.append(db_attr_val)
 
-                for shape_idx, shape in enumerate(shapes):
-                    shape_attributes = shape.pop("attributes", [])
-                    db_shape = models.TrackedShape(**shape, track_id=len(db_tracks))
+            for shape_idx, shape in enumerate(shapes):
+                shape_attributes = shape.pop("attributes", [])
+                db_shape = models.TrackedShape(**shape, track_id=len(db_tracks))
 
-                    for attr in shape_attributes:
-                        db_attr_val = models.TrackedShapeAttributeVal(**attr, shape_id=len(db_shapes))
+                for attr in shape_attributes:
+                    db_attr_val = models.TrackedShapeAttributeVal(**attr, shape_id=len(db_shapes))
 
-                        self._validate_attribute_for_existence(db_attr_val, db_track.label_id, "mutable")
+                    self._validate_attribute_for_existence(db_attr_val, db_track.label_id, "mutable")
 
-                        db_shape_attr_vals.append(db_attr_val)
+                    db_shape_attr_vals.append(db_attr_val)
 
-                    db_shapes.append(db_shape)
-                    shape["attributes"] = shape_attributes
+                db_shapes.append(db_shape)
+                shape["attributes"] = shape_attributes
 
-                db_tracks.append(db_track)
+            db_tracks.append(db_track)
 
-                track["attributes"] = track_attributes
-                track["shapes"] = shapes
-                if elements or parent_track is None:
-                    track["elements"] = elements
+            track["attributes"] = track_attributes
+            track["shapes"] = shapes
+            if elements or parent_track is None:
+                track["elements"] = elements
 
-            db_tracks = bulk_create(
-                db_model=models.LabeledTrack,
-                objects=db_tracks,
-                flt_param={"job_id": self.db_job.id}
-            )
+        db_tracks = bulk_create(
+            db_model=models.LabeledTrack,
+            objects=db_tracks,
+            flt_param={"job_id": self.db_job.id}
+        )
 
-            for db_attr_val in db_track_attr_vals:
-                db_attr_val.track_id = db_tracks[db_attr_val.track_id].id
+        for db_attr_val in db_track_attr_vals:
+            db_attr_val.track_id = db_tracks[db_attr_val.track_id].id
 
-            bulk_create(
-                db_model=models.LabeledTrackAttributeVal,
-                objects=db_track_attr_vals,
-                flt_param={}
-            )
+        bulk_create(
+            db_model=models.LabeledTrackAttributeVal,
+            objects=db_track_attr_vals,
+            flt_param={}
+        )
 
-            for db_shape in db_shapes:
-                db_shape.track_id = db_tracks[db_shape.track_id].id
+        for db_shape in db_shapes:
+            db_shape.track_id = db_tracks[db_shape.track_id].id
 
-            db_shapes = bulk_create(
-                db_model=models.TrackedShape,
-                objects=db_shapes,
-                flt_param={"track__job_id": self.db_job.id}
-            )
+        db_shapes = bulk_create(
+            db_model=models.TrackedShape,
+            objects=db_shapes,
+            flt_param={"track__job_id": self.db_job.id}
+        )
 
-            for db_attr_val in db_shape_attr_vals:
-                db_attr_val.shape_id = db_shapes[db_attr_val.shape_id].id
+        for db_attr_val in db_shape_attr_vals:
+            db_attr_val.shape_id = db_shapes[db_attr_val.shape_id].id
 
-            bulk_create(
-                db_model=models.TrackedShapeAttributeVal,
-                objects=db_shape_attr_vals,
-                flt_param={}
-            )
+        bulk_create(
+            db_model=models.TrackedShapeAttributeVal,
+            objects=db_shape_attr_vals,
+            flt_param={}
+        )
 
-            shape_idx = 0
-            for track, db_track in zip(tracks, db_tracks):
-                track["id"] = db_track.id
-                for shape in track["shapes"]:
-                    shape["id"] = db_shapes[shape_idx].id
-                    shape_idx += 1
-                create_tracks(track.get("elements", []), db_track)
+        shape_idx = 0
+        for track, db_track in zip(tracks, db_tracks):
+            track["id"] = db_track.id
+            for shape in track["shapes"]:
+                shape["id"] = db_shapes[shape_idx].id
+                shape_idx += 1
+            self._create_tracks_in_db(track.get("elements", []), db_track)
 
-        create_tracks(tracks)
+    def _save_tracks_to_db(self, tracks):
+        self._create_tracks_in_db(tracks)
 
         self.ir_data.tracks = tracks
 
-    def _save_shapes_to_db(self, shapes):
-        def create_shapes(shapes, parent_shape=None):
-            db_shapes = []
-            db_attr_vals = []
+    def _create_shapes_in_db(self, shapes, parent_shape=None):
+        db_shapes = []
+        db_attr_vals = []
 
-            for shape in shapes:
-                attributes = shape.pop("attributes", [])
-                shape_elements = shape.pop("elements", [])
-                # FIXME: need to clamp points (be sure that all of them inside the image)
-                # Should we check here or implement a validator?
-                db_shape = models.LabeledShape(job=self.db_job, parent=parent_shape, **shape)
+        for shape in shapes:
+            attributes = shape.pop("attributes", [])
+            shape_elements = shape.pop("elements", [])
+            # FIXME: need to clamp points (be sure that all of them inside the image)
+            # Should we check here or implement a validator?
+            db_shape = models.LabeledShape(job=self.db_job, parent=parent_shape, **shape)
 
-                self._validate_label_for_existence(db_shape.label_id)
+            self._validate_label_for_existence(db_shape.label_id)
 
-                for attr in attributes:
-                    db_attr_val = models.LabeledShapeAttributeVal(**attr, shape_id=len(db_shapes))
+            for attr in attributes:
+                db_attr_val = models.LabeledShapeAttributeVal(**attr, shape_id=len(db_shapes))
 
-                    self._validate_attribute_for_existence(db_attr_val, db_shape.label_id, "all")
+                self._validate_attribute_for_existence(db_attr_val, db_shape.label_id, "all")
 
-                    db_attr_vals.append(db_attr_val)
+                db_attr_vals.append(db_attr_val)
 
-                db_shapes.append(db_shape)
-                shape["attributes"] = attributes
-                if shape_elements or parent_shape is None:
-                    shape["elements"] = shape_elements
-
-            db_shapes = bulk_create(
-                db_model=models.LabeledShape,
-                objects=db_shapes,
-                flt_param={"job_id": self.db_job.id}
-            )
+            db_shapes.append(db_shape)
+            shape["attributes"] = attributes
+            if shape_elements or parent_shape is None:
+                shape["elements"] = shape_elements
 
-            for db_attr_val in db_attr_vals:
-                db_attr_val.shape_id = db_shapes[db_attr_val.shape_id].id
+        db_shapes = bulk_create(
+            db_model=models.LabeledShape,
+            objects=db_shapes,
+            flt_param={"job_id": self.db_job.id}
+        )
 
-            bulk_create(
-                db_model=models.LabeledShapeAttributeVal,
-                objects=db_attr_vals,
-                flt_param={}
-            )
+        for db_attr_val in db_attr_vals:
+            db_attr_val.shape_id = db_shapes[db_attr_val.shape_id].id
+
+        bulk_create(
+            db_model=models.LabeledShapeAttributeVal,
+            objects=db_attr_vals,
+            flt_param={}
+        )
 
-            for shape, db_shape in zip(shapes, db_shapes):
-                shape["id"] = db_shape.id
-                create_shapes(shape.get("elements", []), db_shape)
+        for shape, db_shape in zip(shapes, db_shapes):
+            shape["id"] = db_shape.id
+            self._create_shapes_in_db(shape.get("elements", []), db_shape)
 
-        create_shapes(shapes)
+    def _save_shapes_to_db(self, shapes):
+        self._create_shapes_in_db(shapes)
 
         self.ir_data.shapes = shapes
 
@@ -392,6 +566,353 @@ class JobAnnotation:
 
         self.ir_data.tags = tags
 
+    @staticmethod
+    def _get_row_values(obj):
+        return {
+            k: v for k, v in obj.items()
+            if k not in ('id', 'attributes', 'elements', 'shapes')
+        }
+
+    def _update_attributes_in_db(self, db_attr_vals, attributes, *,
+        changes, make_db_attr_val, label_id, attr_type
+    ):
+        db_attr_vals_by_spec = {}
+        for db_attr_val in db_attr_vals:
+            db_attr_vals_by_spec.setdefault(db_attr_val.spec_id, []).append(db_attr_val)
+
+        for attr in attributes:
+            self._validate_attribute_for_existence(dotdict(attr), label_id, attr_type)
+
+            matching_db_attr_vals = db_attr_vals_by_spec.get(attr["spec_id"])
+            if matching_db_attr_vals:
+                changes.update(matching_db_attr_vals.pop(0), {"value": attr["value"]})
+            else:
+                changes.created.append(make_db_attr_val(attr))
+
+        changes.deleted_ids.extend(
+            db_attr_val.id
+            for spec_db_attr_vals in db_attr_vals_by_spec.values()
+            for db_attr_val in spec_db_attr_vals
+        )
+
+    def _take_existing_objects(self, db_queryset, objects):
+        """
+        Returns the existing DB rows for the objects.
+        The objects without rows are removed from the list.
+        """
+
+        db_objects = {
+            db_obj.id: db_obj
+            for db_obj in db_queryset.filter(
+                id__in=[obj["id"] for obj in objects if obj.get("id") is not None]
+            )
+        }
+
+        matched_objects = []
+        for obj in objects:
+            db_obj = db_objects.pop(obj.get("id"), None)
+            if db_obj is not None:
+                matched_objects.append((obj, db_obj))
+
+        return matched_objects
+
+    def _update_tags_in_db(self, tags):
+        matched_tags = self._take_existing_objects(
+            self.db_job.labeledimage_set.prefetch_related("attributes"), tags
+        )
+
+        tag_changes = _RowChanges(models.LabeledImage)
+        attr_changes = _RowChanges(models.LabeledImageAttributeVal)
+        for tag, db_tag in matched_tags:
+            attributes = tag.pop("attributes", [])
+
+            self._validate_label_for_existence(tag["label_id"])
+            tag_changes.update(db_tag, self._get_row_values(tag))
+            self._update_attributes_in_db(db_tag.attributes.all(), attributes,
+                changes=attr_changes,
+                make_db_attr_val=lambda attr: models.LabeledImageAttributeVal(
+                    **attr, image_id=db_tag.id
+                ),
+                label_id=tag["label_id"], attr_type="all",
+            )
+
+            tag["attributes"] = attributes
+
+        tag_changes.apply()
+        attr_changes.apply()
+
+        matched_tag_ids = set(id(tag) for tag, _ in matched_tags)
+        new_tags = [tag for tag in tags if id(tag) not in matched_tag_ids]
+        self._delete_objects_with_ids(self.db_job.labeledimage_set, new_tags)
+        self._save_tags_to_db(new_tags)
+
+        self.ir_data.tags = tags
+
+    def _update_shape_in_db(self, shape, db_shape, *, shape_changes, attr_changes):
+        attributes = shape.pop("attributes", [])
+        elements = shape.pop("elements", None)
+
+        self._validate_label_for_existence(shape["label_id"])
+        shape_changes.update(db_shape, self._get_row_values(shape))
+        self._update_attributes_in_db(db_shape.attributes.all(), attributes,
+            changes=attr_changes,
+            make_db_attr_val=lambda attr: models.LabeledShapeAttributeVal(
+                **attr, shape_id=db_shape.id
+            ),
+            label_id=shape["label_id"], attr_type="all",
+        )
+
+        shape["attributes"] = attributes
+        if elements is not None:
+            shape["elements"] = elements
+
+    def _update_shapes_in_db(self, shapes):
+        matched_shapes = self._take_existing_objects(
+            self.db_job.labeledshape_set.filter(parent=None).prefetch_related(
+                "attributes", "elements__attributes"
+            ),
+            shapes
+        )
+
+        shape_changes = _RowChanges(models.LabeledShape)
+        attr_changes = _RowChanges(models.LabeledShapeAttributeVal)
+        new_elements = []
+        for shape, db_shape in matched_shapes:
+            self._update_shape_in_db(shape, db_shape,
+                shape_changes=shape_changes, attr_changes=attr_changes)
+
+            elements = shape.setdefault("elements", [])
+            db_elements = {db_element.id: db_element for db_element in db_shape.elements.all()}
+            created_elements = []
+            for element in elements:
+                db_element = db_elements.pop(element.get("id"), None)
+                if db_element is None:
+                    element.pop("id", None)
+                    created_elements.append(element)
+                else:
+                    self._update_shape_in_db(element, db_element,
+                        shape_changes=shape_changes, attr_changes=attr_changes)
+
+            shape_changes.deleted_ids.extend(db_elements)
+            if created_elements:
+                new_elements.append((created_elements, db_shape))
+
+        shape_changes.apply()
+        attr_changes.apply()
+
+        for elements, db_shape in new_elements:
+            self._create_shapes_in_db(elements, db_shape)
+
+        matched_shape_ids = set(id(shape) for shape, _ in matched_shapes)
+        new_shapes = [shape for shape in shapes if id(shape) not in matched_shape_ids]
+        self._delete_objects_with_ids(self.db_job.labeledshape_set, new_shapes)
+        self._create_shapes_in_db(new_shapes)
+
+        self.ir_data.shapes = shapes
+
+    def _sync_frames_in_data(self, track):
+        # The same as _sync_frames(), but the parent track is not saved yet
+        self._correct_frame_of_tracked_shapes(track)
+
+        elements = track.get("elements")
+        if not elements:
+            return
+
+        for element in elements:
+            if track["frame"] < element["frame"]:
+                element["frame"] = track["frame"]
+
+            self._correct_frame_of_tracked_shapes(element)
+
+        min_frame = min(element["frame"] for element in elements)
+        if min_frame < track["frame"]:
+            # parent track cannot have a frame greater than the frame of the child track
+            track["frame"] = min_frame
+            if track["shapes"]:
+                min(track["shapes"], key=lambda shape: shape["frame"])["frame"] = min_frame
+
+            for element in elements:
+                if track["frame"] < element["frame"]:
+                    element["frame"] = track["frame"]
+
+                    self._correct_frame_of_tracked_shapes(element)
+
+    def _update_tracked_shapes_in_db(self, shapes, db_track, *, shape_changes, attr_changes):
+        db_shapes = {db_shape.id: db_shape for db_shape in db_track.shapes.all()}
+
+        # The shapes are matched by ids, then by frames
+        matched_shapes = []
+        unmatched_shapes = []
+        for shape in shapes:
+            db_shape = db_shapes.pop(shape.get("id"), None)
+            if db_shape is None:
+                unmatched_shapes.append(shape)
+            else:
+                matched_shapes.append((shape, db_shape))
+
+        db_shapes_by_frame = {db_shape.frame: db_shape for db_shape in db_shapes.values()}
+        created_shapes = []
+        for shape in unmatched_shapes:
+            db_shape = db_shapes_by_frame.pop(shape["frame"], None)
+            if db_shape is None:
+                shape.pop("id", None)
+                created_shapes.append(shape)
+            else:
+                db_shapes.pop(db_shape.id)
+                matched_shapes.append((shape, db_shape))
+
+        for shape, db_shape in matched_shapes:
+            attributes = shape.pop("attributes", [])
+
+            shape_changes.update(db_shape, self._get_row_values(shape))
+            self._update_attributes_in_db(db_shape.attributes.all(), attributes,
+                changes=attr_changes,
+                make_db_attr_val=lambda attr: models.TrackedShapeAttributeVal(
+                    **attr, shape_id=db_shape.id
+                ),
+                label_id=db_track.label_id, attr_type="mutable",
+            )
+
+            shape["attributes"] = attributes
+            shape["id"] = db_shape.id
+
+        shape_changes.deleted_ids.extend(db_shapes)
+
+        return created_shapes
+
+    def _create_tracked_shapes_in_db(self, shapes, db_track):
+        db_shapes = []
+        db_attr_vals = []
+
+        for shape in shapes:
+            attributes = shape.pop("attributes", [])
+            db_shape = models.TrackedShape(**shape, track_id=db_track.id)
+
+            for attr in attributes:
+                db_attr_val = models.TrackedShapeAttributeVal(**attr, shape_id=len(db_shapes))
+
+                self._validate_attribute_for_existence(db_attr_val, db_track.label_id, "mutable")
+
+                db_attr_vals.append(db_attr_val)
+
+            db_shapes.append(db_shape)
+            shape["attributes"] = attributes
+
+        db_shapes = bulk_create(
+            db_model=models.TrackedShape,
+            objects=db_shapes,
+            flt_param={"track_id": db_track.id}
+        )
+
+        for db_attr_val in db_attr_vals:
+            db_attr_val.shape_id = db_shapes[db_attr_val.shape_id].id
+
+        bulk_create(
+            db_model=models.TrackedShapeAttributeVal,
+            objects=db_attr_vals,
+            flt_param={}
+        )
+
+        for shape, db_shape in zip(shapes, db_shapes):
+            shape["id"] = db_shape.id
+
+    def _update_track_in_db(self, track, db_track, *, changes):
+        attributes = track.pop("attributes", [])
+        shapes = track.pop("shapes")
+        elements = track.pop("elements", None)
+
+        self._validate_label_for_existence(track["label_id"])
+        changes["tracks"].update(db_track, self._get_row_values(track))
+        self._update_attributes_in_db(db_track.attributes.all(), attributes,
+            changes=changes["track_attributes"],
+            make_db_attr_val=lambda attr: models.LabeledTrackAttributeVal(
+                **attr, track_id=db_track.id
+            ),
+            label_id=track["label_id"], attr_type="immutable",
+        )
+
+        created_shapes = self._update_tracked_shapes_in_db(shapes, db_track,
+            shape_changes=changes["shapes"], attr_changes=changes["shape_attributes"])
+
+        track["attributes"] = attributes
+        track["shapes"] = shapes
+        if elements is not None:
+            track["elements"] = elements
+
+        return created_shapes
+
+    def _update_tracks_in_db(self, tracks):
+        matched_tracks = self._take_existing_objects(
+            self.db_job.labeledtrack_set.filter(parent=None).prefetch_related(
+                "attributes", "shapes__attributes",
+                "elements__attributes", "elements__shapes__attributes",
+            ),
+            tracks
+        )
+
+        changes = {
+            "tracks": _RowChanges(models.LabeledTrack),
+            "track_attributes": _RowChanges(models.LabeledTrackAttributeVal),
+            "shapes": _RowChanges(models.TrackedShape),
+            "shape_attributes": _RowChanges(models.TrackedShapeAttributeVal),
+        }
+        new_shapes = []
+        new_elements = []
+        for track, db_track in matched_tracks:
+            self._sync_frames_in_data(track)
+
+            created_shapes = self._update_track_in_db(track, db_track, changes=changes)
+            if created_shapes:
+                new_shapes.append((created_shapes, db_track))
+
+            elements = track.setdefault("elements", [])
+            db_elements = {db_element.id: db_element for db_element in db_track.elements.all()}
+            created_elements = []
+            for element in elements:
+                db_element = db_elements.pop(element.get("id"), None)
+                if db_element is None:
+                    element.pop("id", None)
+                    for shape in element["shapes"]:
+                        shape.pop("id", None)
+                    created_elements.append(element)
+                else:
+                    created_shapes = self._update_track_in_db(element, db_element, changes=changes)
+                    if created_shapes:
+                        new_shapes.append((created_shapes, db_element))
+
+            changes["tracks"].deleted_ids.extend(db_elements)
+            if created_elements:
+                new_elements.append((created_elements, db_track))
+
+        for track_changes in changes.values():
+            track_changes.apply()
+
+        for shapes, db_track in new_shapes:
+            self._create_tracked_shapes_in_db(shapes, db_track)
+
+        for elements, db_track in new_elements:
+            self._create_tracks_in_db(elements, db_track)
+
+        matched_track_ids = set(id(track) for track, _ in matched_tracks)
+        new_tracks = [track for track in tracks if id(track) not in matched_track_ids]
+        self._delete_objects_with_ids(self.db_job.labeledtrack_set, new_tracks)
+        self._create_tracks_in_db(new_tracks)
+
+        self.ir_data.tracks = tracks
+
+    @staticmethod
+    def _delete_objects_with_ids(db_queryset, objects):
+        # The objects are recreated with the same ids
+        ids = [obj["id"] for obj in objects if obj.get("id") is not None]
+        if ids:
+            db_queryset.filter(pk__in=ids).delete()
+
+    def _update(self, data):
+        self.reset()
+        self._update_tags_in_db(data["tags"])
+        self._update_shapes_in_db(data["shapes"])
+        self._update_tracks_in_db(data["tracks"])
+
     def _set_updated_date(self):
         db_task = self.db_job.segment.task
         with transaction.atomic():
@@ -400,10 +921,30 @@ class JobAnnotation:
             if db_project := db_task.project:
                 db_project.touch()
 
+        if settings.DATASET_ANNOTATION_CACHE:
+            # The updated date also changes the cached annotation version,
+            # the removal just frees the cache earlier
+            transaction.on_commit(
+                partial(_JobAnnotationSnapshotCache.invalidate, self.db_job.id)
+            )
+
     @staticmethod
     def _data_is_empty(data):
         return not (data["tags"] or data["shapes"] or data["tracks"])
 
+    def _save_changes_to_db(self, *changes):
+        self.ir_data.version = _save_annotation_changes(self.db_job.id, (
+            (action, object_type, obj["id"])
+            for action, data in changes
+            for object_type, objects in (
+                (models.AnnotationObjectType.TAG, data["tags"]),
+                (models.AnnotationObjectType.SHAPE, data["shapes"]),
+                (models.AnnotationObjectType.TRACK, data["tracks"]),
+            )
+            for obj in objects
+            if obj.get("id") is not None
+        ))
+
     def _create(self, data):
         self.reset()
         self._save_tags_to_db(data["tags"])
@@ -415,6 +956,7 @@ class JobAnnotation:
         handle_annotations_change(self.db_job, self.data, "create")
 
         if not self._data_is_empty(self.data):
+            self._save_changes_to_db((models.AnnotationChangeAction.CREATE, self.data))
             self._set_updated_date()
 
     def put(self, data):
@@ -427,14 +969,18 @@ class JobAnnotation:
         handle_annotations_change(self.db_job, self.data, "create")
 
         if not deleted_data_is_empty or not self._data_is_empty(self.data):
+            self._save_changes_to_db(
+                (models.AnnotationChangeAction.DELETE, deleted_data),
+                (models.AnnotationChangeAction.CREATE, self.data),
+            )
             self._set_updated_date()
 
     def update(self, data):
-        self._delete(data)
-        self._create(data)
+        self._update(data)
         handle_annotations_change(self.db_job, self.data, "update")
 
         if not self._data_is_empty(self.data):
+            self._save_changes_to_db((models.AnnotationChangeAction.UPDATE, self.data))
             self._set_updated_date()
 
     def _delete(self, data=None):
@@ -480,6 +1026,7 @@ class JobAnnotation:
         handle_annotations_change(self.db_job, deleted_data, "delete")
 
         if not self._data_is_empty(deleted_data):
+            self._save_changes_to_db((models.AnnotationChangeAction.DELETE, deleted_data))
             self._set_updated_date()
 
     @staticmethod
@@ -677,13 +1224,17 @@ class JobAnnotation:
         self.ir_data.tracks = serializer.data
 
     def _init_version_from_db(self):
-        self.ir_data.version = 0 # FIXME: should be removed in the future
+        self.ir_data.version = self.db_job.annotation_changes.aggregate(
+            version=Max('version'))['version'] or 0
 
     def init_from_db(self):
+        # The version is read first. The changes committed while the annotations are read
+        # can be included in the data, but they are also returned for the version again.
+        # Applying a change twice gives the same result, unlike missing it
+        self._init_version_from_db()
         self._init_tags_from_db()
         self._init_shapes_from_db()
         self._init_tracks_from_db()
-        self._init_version_from_db()
 
     @property
     def data(self):
@@ -784,26 +1335,83 @@ class TaskAnnotation:
             for db_job in self.db_jobs:
                 delete_job_data(db_job.id)
 
-    def init_from_db(self):
+    def init_from_db(self, *, concurrent: bool = False):
+        """
+        concurrent: load the jobs in several threads, each using its own DB connection.
+            The changes of the current transaction are not visible to the other connections,
+            so it must only be used when the task annotations are not modified before.
+        """
+
         self.reset()
 
-        for db_job in self.db_jobs:
-            if db_job.type != models.JobType.ANNOTATION:
-                continue
-
-            annotation = JobAnnotation(db_job.id, is_prefetched=True)
-            annotation.init_from_db()
-            if annotation.ir_data.version > self.ir_data.version:
-                self.ir_data.version = annotation.ir_data.version
-            db_segment = db_job.segment
-            start_frame = db_segment.start_frame
-            overlap = self.db_task.overlap
-            dimension = self.db_task.dimension
-            self._merge_data(annotation.ir_data, start_frame, overlap, dimension)
+        db_jobs = [
+            db_job for db_job in self.db_jobs
+            if db_job.type == models.JobType.ANNOTATION
+        ]
+
+        max_workers = min(settings.DATASET_ANNOTATION_LOADING_THREADS, len(db_jobs))
+        # SQLite is only used in tests, where the test data is not committed
+        if concurrent and 1 < max_workers and connection.vendor == 'postgresql':
+            executor = ThreadPoolExecutor(max_workers=max_workers,
+                thread_name_prefix='annotation_loading')
+            # The results are returned in the job order, so the merge result is the same
+            job_annotations = executor.map(self._load_job_annotations_in_thread, db_jobs)
+        else:
+            executor = None
+            job_annotations = map(self._load_job_annotations, db_jobs)
 
-    def export(self, dst_file, exporter, host='', **options):
+        try:
+            for db_job, ir_data in zip(db_jobs, job_annotations):
+                if ir_data.version > self.ir_data.version:
+                    self.ir_data.version = ir_data.version
+                db_segment = db_job.segment
+                start_frame = db_segment.start_frame
+                overlap = self.db_task.overlap
+                dimension = self.db_task.dimension
+                self._merge_data(ir_data, start_frame, overlap, dimension)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _load_job_annotations(db_job: models.Job) -> AnnotationIR:
+        annotation = JobAnnotation(db_job.id, is_prefetched=True)
+        annotation.init_from_db()
+        return annotation.ir_data
+
+    @classmethod
+    def _load_job_annotations_in_transaction(cls, db_job: models.Job) -> AnnotationIR:
+        with transaction.atomic():
+            return cls._load_job_annotations(db_job)
+
+    @classmethod
+    def _load_job_annotations_in_thread(cls, db_job: models.Job) -> AnnotationIR:
+        try:
+            return cls._load_job_annotations_in_transaction(db_job)
+        finally:
+            # DB connections are thread-local, they must be closed explicitly
+            connections.close_all()
+
+    def init_stream(self) -> AnnotationStream:
+        """
+        Returns the task annotations, which are read from the DB job by job on iteration.
+        Each job is read in a separate transaction.
+        """
+
+        db_jobs = self.db_jobs.order_by('segment__start_frame', 'id')
+        return AnnotationStream(
+            self.db_task.dimension,
+            segments=[
+                (db_job.segment.start_frame,
+                    partial(self._load_job_annotations_in_transaction, db_job))
+                for db_job in db_jobs
+            ],
+            overlap=self.db_task.overlap,
+        )
+
+    def export(self, dst_file, exporter, host='', *, streaming=False, **options):
         task_data = TaskData(
-            annotation_ir=self.ir_data,
+            annotation_ir=self.init_stream() if streaming else self.ir_data,
             db_task=self.db_task,
             host=host,
         )
@@ -848,11 +1456,77 @@ class TaskAnnotation:
 @silk_profile(name="GET job data")
 @transaction.atomic
 def get_job_data(pk):
+    version = None
+    if settings.DATASET_ANNOTATION_CACHE:
+        # The version is read before the annotations, so that the annotations changed
+        # in between are never cached with the new version
+        version = _JobAnnotationSnapshotCache.get_version(pk)
+        if version is not None:
+            cached_data = _JobAnnotationSnapshotCache.get(pk, version)
+            if cached_data is not None:
+                return cached_data
+
     annotation = JobAnnotation(pk)
     annotation.init_from_db()
 
+    if version is not None:
+        _JobAnnotationSnapshotCache.set(pk, version, annotation.data)
+
     return annotation.data
 
+@silk_profile(name="GET job data changes")
+@transaction.atomic
+def get_job_data_changes(pk, since_version):
+    """
+    Returns the job annotations created or updated after the version
+    and the ids of the job annotations deleted after the version.
+    """
+
+    data = get_job_data(pk)
+    version = data["version"]
+    if version < since_version:
+        raise ValidationError(
+            f"The requested version {since_version} is newer than "
+            f"the current annotation version {version}"
+        )
+
+    fields = {
+        str(models.AnnotationObjectType.TAG): "tags",
+        str(models.AnnotationObjectType.SHAPE): "shapes",
+        str(models.AnnotationObjectType.TRACK): "tracks",
+    }
+
+    if since_version == 0:
+        # The annotations created before the change log was introduced are not logged
+        return {
+            **data,
+            "deleted": {field: [] for field in fields.values()},
+        }
+
+    changed_ids = {object_type: set() for object_type in fields}
+    # The changes made after the annotations were read are not included
+    for object_type, object_id in models.AnnotationChange.objects.filter(
+        job_id=pk, version__gt=since_version, version__lte=version,
+    ).values_list('object_type', 'object_id'):
+        changed_ids[object_type].add(object_id)
+
+    # The old changes are removed on the job updates, so the check uses the latest version
+    latest_version = models.AnnotationChange.objects.filter(job_id=pk).aggregate(
+        version=Max('version'))['version'] or 0
+    if since_version < max(version, latest_version) - settings.DATASET_ANNOTATION_CHANGES_RETENTION:
+        raise AnnotationChangesExpiredError(
+            f"The changes since the annotation version {since_version} are not available "
+            "anymore, the annotations must be requested without the version"
+        )
+
+    changes = {"version": version, "deleted": {}}
+    for object_type, field in fields.items():
+        ids = changed_ids[object_type]
+        changes[field] = [obj for obj in data[field] if obj["id"] in ids]
+        changes["deleted"][field] = sorted(ids.difference(obj["id"] for obj in changes[field]))
+
+    return changes
+
 @silk_profile(name="POST job data")
 @transaction.atomic
 def put_job_data(pk, data):
@@ -899,7 +1573,7 @@ def export_job(job_id, dst_file, format_name, server_url=None, save_images=False
 @transaction.atomic
 def get_task_data(pk):
     annotation = TaskAnnotation(pk)
-    annotation.init_from_db()
+    annotation.init_from_db(concurrent=True)
 
     return annotation.data
 
@@ -931,6 +1605,9 @@ def delete_task_data(pk):
     annotation.delete()
 
 def export_task(task_id, dst_file, format_name, server_url=None, save_images=False):
+    exporter = make_exporter(format_name)
+    streaming = exporter.STREAMING and settings.DATASET_EXPORT_STREAMING
+
     # For big tasks dump function may run for a long time and
     # we dont need to acquire lock after the task has been initialized from DB.
     # But there is the bug with corrupted dump file in case 2 or
@@ -938,11 +1615,12 @@ def export_task(task_id, dst_file, format_name, server_url=None, save_images=Fal
     # https://github.com/cvat-ai/cvat/issues/217
     with transaction.atomic():
         task = TaskAnnotation(task_id)
-        task.init_from_db()
+        if not streaming:
+            # In the streaming mode, the annotations are read job by job during the export
+            task.init_from_db(concurrent=True)
 
-    exporter = make_exporter(format_name)
     with open(dst_file, 'wb') as f:
-        task.export(f, exporter, host=server_url, save_images=save_images)
+        task.export(f, exporter, host=server_url, save_images=save_images, streaming=streaming)
 
 @transaction.atomic
 def import_task_annotations(src_file, task_id, format_name, conv_mask_to_poly):
@@ -2,7 +2,13 @@
 #
 # SPDX-License-Identifier: MIT
 
-from cvat.apps.dataset_manager.annotation import TrackManager
+from copy import deepcopy
+from functools import partial
+
+import numpy as np
+
+from cvat.apps.dataset_manager.annotation import (AnnotationIR, AnnotationManager,
+    AnnotationStream, ShapeManager, TrackManager)
 
 from unittest import TestCase
 
@@ -324,3 +330,323 @@ class TrackManagerTest(TestCase):
 
         interpolated_shapes = TrackManager.get_interpolated_shapes(track, 0, 3, '2d')
         self.assertEqual(expected_shapes, interpolated_shapes)
+
+    def test_bbox_interpolation_matches_per_frame_computation(self):
+        shape0 = {
+            "frame": 0,
+            "points": [1.5, 2.0, 3.25, 4.0],
+            "rotation": 350.0,
+            "type": "rectangle",
+            "occluded": False,
+            "outside": False,
+            "attributes": []
+        }
+        shape1 = dict(shape0, frame=7, points=[10.1, 3.3, 17.0, 9.7], rotation=20.0)
+        track = {
+            "frame": 0,
+            "label_id": 0,
+            "group": None,
+            "source": "manual",
+            "attributes": [],
+            "shapes": [shape0, shape1]
+        }
+
+        interpolated = TrackManager.get_interpolated_shapes(track, 0, 8, '2d')
+
+        diff = np.subtract(shape1["points"], shape0["points"])
+        for frame in range(1, 7):
+            offset = frame / 7
+            self.assertEqual(
+                (shape0["points"] + diff * offset).tolist(), interpolated[frame]["points"]
+            )
+            self.assertEqual((350.0 + 30.0 * offset + 360) % 360, interpolated[frame]["rotation"])
+
+    def test_included_frames_dont_affect_interpolated_shapes(self):
+        track = {
+            "frame": 0,
+            "label_id": 0,
+            "group": None,
+            "source": "manual",
+            "attributes": [],
+            "shapes": [
+                {
+                    "frame": 0,
+                    "points": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 1.0, 7.5],
+                    "type": "polygon",
+                    "occluded": False,
+                    "outside": False,
+                    "attributes": []
+                },
+                {
+                    "frame": 9,
+                    "points": [3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+                    "type": "polygon",
+                    "occluded": False,
+                    "outside": False,
+                    "attributes": []
+                },
+            ]
+        }
+        included_frames = {2, 3, 7}
+
+        all_shapes = TrackManager.get_interpolated_shapes(deepcopy(track), 0, 10, '2d')
+        included_shapes = TrackManager.get_interpolated_shapes(deepcopy(track), 0, 10, '2d',
+            included_frames=included_frames)
+
+        self.assertEqual(
+            [s for s in all_shapes if s["frame"] in included_frames], included_shapes
+        )
+
+
+class AnnotationStreamTest(TestCase):
+    DIMENSION = '2d'
+    OVERLAP = 2
+    END_FRAME = 26
+
+    @staticmethod
+    def _make_shape(frame, points, **kwargs):
+        return {
+            "id": None,
+            "type": "rectangle",
+            "frame": frame,
+            "label_id": 0,
+            "group": 0,
+            "source": "manual",
+            "points": points,
+            "rotation": 0,
+            "occluded": False,
+            "outside": False,
+            "z_order": 0,
+            "attributes": [],
+            **kwargs
+        }
+
+    def _make_segments(self):
+        segment0 = {
+            "tags": [],
+            "shapes": [
+                self._make_shape(3, [0, 0, 10, 10]),
+                self._make_shape(9, [5, 5, 15, 15]),
+            ],
+            "tracks": [{
+                "id": 1, "frame": 2, "label_id": 0, "group": 0, "source": "manual",
+                "attributes": [],
+                "shapes": [
+                    self._make_shape(2, [0, 0, 10, 10]),
+                    self._make_shape(9, [7, 7, 17, 17]),
+                ],
+            }],
+        }
+        segment1 = {
+            "tags": [
+                {"id": None, "frame": 12, "label_id": 0, "group": 0,
+                    "source": "manual", "attributes": []},
+            ],
+            "shapes": [
+                self._make_shape(9, [5, 5, 15, 15]),
+            ],
+            "tracks": [{
+                "id": 2, "frame": 8, "label_id": 0, "group": 0, "source": "manual",
+                "attributes": [],
+                "shapes": [
+                    self._make_shape(8, [6, 6, 16, 16]),
+                    self._make_shape(9, [7, 7, 17, 17]),
+                    self._make_shape(14, [12, 12, 22, 22], outside=True),
+                ],
+            }],
+        }
+        segment2 = {
+            "tags": [],
+            "shapes": [self._make_shape(20, [1, 1, 2, 2])],
+            "tracks": [],
+        }
+
+        return [(0, segment0), (8, segment1), (16, segment2)]
+
+    @staticmethod
+    def _get_shape_keys(shapes):
+        return sorted(
+            (s["frame"], s.get("track_id", -1), tuple(s["points"]), s["outside"])
+            for s in shapes
+        )
+
+    def test_can_produce_same_shapes_as_full_merge(self):
+        full_data = AnnotationIR(self.DIMENSION)
+        for start_frame, segment in self._make_segments():
+            AnnotationManager(full_data).merge(
+                AnnotationIR(self.DIMENSION, segment), start_frame, self.OVERLAP, self.DIMENSION
+            )
+        expected_shapes = AnnotationManager(full_data).to_shapes(self.END_FRAME, self.DIMENSION,
+            included_frames=set(range(self.END_FRAME)))
+
+        stream = AnnotationStream(self.DIMENSION, segments=[
+            (start_frame, lambda segment=segment: AnnotationIR(self.DIMENSION, segment))
+            for start_frame, segment in self._make_segments()
+        ], overlap=self.OVERLAP)
+        streamed_shapes = []
+        streamed_tags = []
+        for _, shapes, tags in stream.iter_frame_ranges(self.END_FRAME,
+            included_frames=set(range(self.END_FRAME))
+        ):
+            streamed_shapes.extend(shapes)
+            streamed_tags.extend(tags)
+
+        self.assertEqual(
+            self._get_shape_keys(expected_shapes), self._get_shape_keys(streamed_shapes)
+        )
+        self.assertEqual([t["frame"] for t in full_data.tags], [t["frame"] for t in streamed_tags])
+
+    def test_can_produce_same_objects_as_full_merge(self):
+        full_data = AnnotationIR(self.DIMENSION)
+        for start_frame, segment in self._make_segments():
+            AnnotationManager(full_data).merge(
+                AnnotationIR(self.DIMENSION, segment), start_frame, self.OVERLAP, self.DIMENSION
+            )
+
+        stream = AnnotationStream(self.DIMENSION, segments=[
+            (start_frame, lambda segment=segment: AnnotationIR(self.DIMENSION, segment))
+            for start_frame, segment in self._make_segments()
+        ], overlap=self.OVERLAP)
+        streamed_data = AnnotationIR(self.DIMENSION)
+        for released in stream.iter_merged_objects():
+            streamed_data.tracks.extend(released.tracks)
+            streamed_data.shapes.extend(released.shapes)
+            streamed_data.tags.extend(released.tags)
+
+        self.assertEqual(full_data.data, streamed_data.data)
+
+    def test_can_interpolate_tracks_with_keyframes_added_in_overlap(self):
+        overlap = 5
+        end_frame = 60
+        segments = [
+            (0, {
+                "tags": [], "shapes": [],
+                "tracks": [{
+                    "id": 1, "frame": 10, "label_id": 0, "group": 0, "source": "manual",
+                    "attributes": [],
+                    "shapes": [
+                        self._make_shape(10, [0, 0, 10, 10]),
+                        self._make_shape(48, [38, 38, 48, 48]),
+                    ],
+                }],
+            }),
+            (45, {
+                "tags": [], "shapes": [],
+                "tracks": [{
+                    "id": 2, "frame": 45, "label_id": 0, "group": 0, "source": "manual",
+                    "attributes": [],
+                    "shapes": [
+                        self._make_shape(45, [33, 33, 43, 43]),
+                        self._make_shape(48, [38, 38, 48, 48]),
+                    ],
+                }],
+            }),
+        ]
+
+        full_data = AnnotationIR(self.DIMENSION)
+        for start_frame, segment in deepcopy(segments):
+            AnnotationManager(full_data).merge(
+                AnnotationIR(self.DIMENSION, segment), start_frame, overlap, self.DIMENSION
+            )
+        expected_shapes = AnnotationManager(full_data).to_shapes(end_frame, self.DIMENSION,
+            included_frames=set(range(end_frame)))
+
+        stream = AnnotationStream(self.DIMENSION, segments=[
+            (start_frame, lambda segment=segment: AnnotationIR(self.DIMENSION, segment))
+            for start_frame, segment in deepcopy(segments)
+        ], overlap=overlap)
+        streamed_shapes = []
+        for _, shapes, _ in stream.iter_frame_ranges(end_frame,
+            included_frames=set(range(end_frame))
+        ):
+            streamed_shapes.extend(shapes)
+
+        self.assertEqual(1, len(full_data.tracks))
+        self.assertEqual(
+            self._get_shape_keys(expected_shapes), self._get_shape_keys(streamed_shapes)
+        )
+
+    def test_releases_frames_before_loading_later_segments(self):
+        loaded_segments = []
+
+        def load_segment(start_frame, segment):
+            loaded_segments.append(start_frame)
+            return AnnotationIR(self.DIMENSION, segment)
+
+        stream = AnnotationStream(self.DIMENSION, segments=[
+            (start_frame, partial(load_segment, start_frame, segment))
+            for start_frame, segment in self._make_segments()
+        ], overlap=self.OVERLAP)
+        frame_ranges = stream.iter_frame_ranges(self.END_FRAME)
+
+        frame_range, shapes, _ = next(frame_ranges)
+
+        self.assertEqual(range(0, 8), frame_range)
+        self.assertEqual([0, 8], loaded_segments)
+        self.assertEqual([2, 3, 3, 4, 5, 6, 7], sorted(s["frame"] for s in shapes))
+
+
+class ShapeManagerTest(TestCase):
+    @staticmethod
+    def _make_shape(frame, shape_type, points, label_id=0):
+        return {
+            "type": shape_type,
+            "frame": frame,
+            "label_id": label_id,
+            "points": points,
+        }
+
+    def _make_crowd(self, frame, count, *, offset=0):
+        rng = np.random.default_rng(42)
+        shapes = []
+        for i, (x, y) in enumerate(rng.uniform(0, 1000, size=(count, 2)).tolist()):
+            x += offset
+            if i % 2:
+                points = [x, y, x + 20, y + 30]
+                shape_type = "rectangle"
+            else:
+                points = [x, y, x + 20, y, x + 25, y + 30, x - 5, y + 20]
+                shape_type = "polygon"
+
+            shapes.append(self._make_shape(frame, shape_type, points, label_id=i % 3))
+
+        return shapes
+
+    def test_box_similarity_matches_polygon_similarity(self):
+        boxes0 = np.random.default_rng(0).uniform(0, 10, size=(20, 4))
+        boxes1 = np.random.default_rng(1).uniform(0, 10, size=(30, 4))
+
+        cost_matrix = ShapeManager([])._calc_cost_matrix(
+            [self._make_shape(0, "rectangle", box) for box in boxes0.tolist()],
+            [self._make_shape(0, "rectangle", box) for box in boxes1.tolist()],
+            0, 0, '2d'
+        )
+
+        for i, box0 in enumerate(boxes0.tolist()):
+            for j, box1 in enumerate(boxes1.tolist()):
+                self.assertAlmostEqual(
+                    1 - ShapeManager._calc_objects_similarity(
+                        self._make_shape(0, "rectangle", box0),
+                        self._make_shape(0, "rectangle", box1),
+                        0, 0, '2d'
+                    ),
+                    cost_matrix[i][j]
+                )
+
+    def test_can_merge_crowded_frames(self):
+        old_shapes = self._make_crowd(5, 300)
+        new_shapes = self._make_crowd(5, 300, offset=1) + [
+            self._make_shape(5, "rectangle", [2000, 2000, 2010, 2010]),
+        ]
+
+        manager = ShapeManager(deepcopy(old_shapes))
+        manager.merge(new_shapes, 5, 1, '2d')
+
+        self.assertEqual(len(old_shapes) + 1, len(manager.objects))
+        self.assertEqual(old_shapes, manager.objects[:len(old_shapes)])
+
+    def test_doesnt_merge_shapes_with_different_labels(self):
+        manager = ShapeManager([self._make_shape(5, "rectangle", [0, 0, 10, 10], label_id=0)])
+        manager.merge([self._make_shape(5, "rectangle", [0, 0, 10, 10], label_id=1)], 5, 1, '2d')
+
+        self.assertEqual([0, 1], [shape["label_id"] for shape in manager.objects])
@@ -6,18 +6,28 @@
 
 import numpy as np
 import os.path as osp
+import re
 import tempfile
 import zipfile
+from collections import Counter
+from contextlib import contextmanager
 from io import BytesIO
+from types import SimpleNamespace
+from unittest import mock
 
 import datumaro
+import fakeredis
 from datumaro.components.dataset import Dataset, DatasetItem
 from datumaro.components.annotation import Mask
 from django.contrib.auth.models import Group, User
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from PIL import Image
 
 from rest_framework import status
-from rest_framework.test import APIClient, APITestCase
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
 
 import cvat.apps.dataset_manager as dm
 from cvat.apps.dataset_manager.annotation import AnnotationIR
@@ -25,7 +35,10 @@ from cvat.apps.dataset_manager.bindings import (CvatTaskOrJobDataExtractor,
                                                 TaskData, find_dataset_root)
 from cvat.apps.dataset_manager.task import TaskAnnotation
 from cvat.apps.dataset_manager.util import make_zip_archive
-from cvat.apps.engine.models import Task
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.models import (AttributeSpec, Job, Label, LabeledShape,
+    LabeledShapeAttributeVal, LabeledTrack, LabeledTrackAttributeVal, Task, TrackedShape,
+    TrackedShapeAttributeVal)
 from cvat.apps.engine.tests.utils import get_paginated_collection
 
 
@@ -442,6 +455,49 @@ class TaskExportTest(_DbTestBase):
                     outside_count += 1
         self.assertEqual(0, outside_count)
 
+    def test_labels_are_exported_once_for_many_shapes(self):
+        label_count = 300
+        frame_count = 5
+        shapes_per_frame = 100
+
+        images = self._generate_task_images(frame_count)
+        task = self._generate_task(images,
+            labels=[{"name": f"label_{i}"} for i in range(label_count)])
+        self._put_api_v2_task_id_annotations(task["id"], {
+            "version": 0,
+            "tags": [],
+            "shapes": [
+                {
+                    "frame": frame,
+                    "label_id": task["labels"][i % label_count]["id"],
+                    "group": 0,
+                    "source": "manual",
+                    "attributes": [],
+                    "points": [0.0, 0.1, 1.0 + i, 2.0 + i],
+                    "type": "rectangle",
+                    "occluded": False,
+                }
+                for frame in range(frame_count)
+                for i in range(shapes_per_frame)
+            ],
+            "tracks": [],
+        })
+        task_ann = TaskAnnotation(task["id"])
+        task_ann.init_from_db()
+        task_data = TaskData(task_ann.ir_data, Task.objects.get(pk=task["id"]))
+
+        with mock.patch.object(TaskData, '_export_label',
+            side_effect=TaskData._export_label
+        ) as export_label:
+            frames = list(task_data.group_by_frame(include_empty=True))
+
+        self.assertEqual(label_count, export_label.call_count)
+        self.assertEqual(frame_count, len(frames))
+        for frame in frames:
+            self.assertEqual(shapes_per_frame, len(frame.labeled_shapes))
+            self.assertEqual(label_count, len(frame.labels))
+            self.assertIs(frames[0].labels, frame.labels)
+
     def test_cant_make_rel_frame_id_from_unknown(self):
         images = self._generate_task_images(3)
         images['frame_filter'] = 'step=2'
@@ -525,6 +581,500 @@ class TaskExportTest(_DbTestBase):
             self.assertTrue(frame.frame in range(6, 10))
         self.assertEqual(i + 1, 4)
 
+class JobAnnotationSnapshotCacheTest(_DbTestBase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = mock.patch('cvat.apps.dataset_manager.task.get_media_redis_connection',
+            return_value=fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _generate_job(self):
+        task = self._create_task({
+            "name": "my task #1",
+            "overlap": 0,
+            "segment_size": 100,
+            "labels": [{"name": "car"}],
+        }, {
+            "client_files[0]": generate_image_file("image_0.jpg"),
+            "image_quality": 75,
+        })
+        return task, Job.objects.get(segment__task_id=task["id"])
+
+    @staticmethod
+    def _generate_annotations(task, points):
+        return {
+            "version": 0,
+            "tags": [],
+            "shapes": [
+                {
+                    "frame": 0,
+                    "label_id": task["labels"][0]["id"],
+                    "group": 0,
+                    "source": "manual",
+                    "attributes": [],
+                    "points": points,
+                    "type": "rectangle",
+                    "occluded": False,
+                },
+            ],
+            "tracks": [],
+        }
+
+    def test_repeated_reads_are_served_from_cache(self):
+        task, db_job = self._generate_job()
+        self._put_api_v2_job_id_annotations(db_job.id,
+            self._generate_annotations(task, [1.0, 2.0, 3.5, 4.25]))
+
+        with mock.patch.object(dm.task.JobAnnotation, 'init_from_db',
+            side_effect=dm.task.JobAnnotation.init_from_db, autospec=True
+        ) as init_from_db:
+            data = dm.task.get_job_data(db_job.id)
+            cached_data = dm.task.get_job_data(db_job.id)
+
+        self.assertEqual(1, init_from_db.call_count)
+        self.assertEqual(data, cached_data)
+        self.assertEqual([1.0, 2.0, 3.5, 4.25], cached_data["shapes"][0]["points"])
+
+    def test_changed_annotations_are_not_read_from_cache(self):
+        task, db_job = self._generate_job()
+        self._put_api_v2_job_id_annotations(db_job.id,
+            self._generate_annotations(task, [1.0, 2.0, 3.0, 4.0]))
+        dm.task.get_job_data(db_job.id)
+
+        self._put_api_v2_job_id_annotations(db_job.id,
+            self._generate_annotations(task, [5.0, 6.0, 7.0, 8.0]))
+        data = dm.task.get_job_data(db_job.id)
+
+        self.assertEqual([5.0, 6.0, 7.0, 8.0], data["shapes"][0]["points"])
+
+class JobAnnotationUpdateTest(_DbTestBase):
+    def _generate_job(self):
+        task = self._create_task({
+            "name": "my task #1",
+            "overlap": 0,
+            "segment_size": 100,
+            "labels": [
+                {
+                    "name": "car",
+                    "attributes": [
+                        {
+                            "name": "model",
+                            "mutable": False,
+                            "input_type": "select",
+                            "default_value": "mazda",
+                            "values": ["bmw", "mazda", "renault"]
+                        },
+                        {
+                            "name": "parked",
+                            "mutable": True,
+                            "input_type": "checkbox",
+                            "default_value": "false",
+                            "values": [],
+                        },
+                    ]
+                },
+                {
+                    "name": "skeleton",
+                    "type": "skeleton",
+                    "sublabels": [
+                        {"name": "1", "type": "points"},
+                        {"name": "2", "type": "points"},
+                        {"name": "3", "type": "points"},
+                    ],
+                    "svg": "",
+                },
+            ],
+        }, {
+            **{
+                "client_files[%d]" % i: generate_image_file("image_%d.jpg" % i)
+                for i in range(3)
+            },
+            "image_quality": 75,
+        })
+
+        self.label_ids = {
+            db_label.name: db_label.id
+            for db_label in Label.objects.filter(task_id=task["id"])
+        }
+        self.spec_ids = {
+            db_spec.name: db_spec.id
+            for db_spec in AttributeSpec.objects.filter(label_id=self.label_ids["car"])
+        }
+
+        return Job.objects.get(segment__task_id=task["id"])
+
+    def _patch_api_v2_job_id_annotations(self, jid, data, action):
+        with ForceLogin(self.user, self.client):
+            response = self.client.patch("/api/jobs/%s/annotations?action=%s" % (jid, action),
+                data=data, format="json")
+
+        return response
+
+    def _save_annotations(self, jid, data, action=None):
+        if action:
+            response = self._patch_api_v2_job_id_annotations(jid, data, action)
+        else:
+            response = self._put_api_v2_job_id_annotations(jid, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    @contextmanager
+    def _record_row_writes(self):
+        writes = Counter()
+        with CaptureQueriesContext(connection) as queries:
+            yield writes
+
+        for query in queries.captured_queries:
+            match = re.match(r'(INSERT INTO|UPDATE|DELETE FROM) "(\w+)"', query["sql"])
+            if match:
+                writes[(match.group(2), match.group(1).split()[0])] += 1
+
+    def _make_shape(self, frame, points, *, model="bmw", **fields):
+        return {
+            "frame": frame,
+            "label_id": self.label_ids["car"],
+            "group": 0,
+            "source": "manual",
+            "attributes": [
+                {"spec_id": self.spec_ids["model"], "value": model},
+                {"spec_id": self.spec_ids["parked"], "value": "false"},
+            ],
+            "points": points,
+            "type": "rectangle",
+            "occluded": False,
+            **fields,
+        }
+
+    def _make_track(self, shapes, **fields):
+        return {
+            "frame": shapes[0]["frame"],
+            "label_id": self.label_ids["car"],
+            "group": 0,
+            "source": "manual",
+            "attributes": [
+                {"spec_id": self.spec_ids["model"], "value": "bmw"},
+            ],
+            "shapes": [
+                {
+                    "frame": shape["frame"],
+                    "attributes": [
+                        {"spec_id": self.spec_ids["parked"], "value": "false"},
+                    ],
+                    "points": shape["points"],
+                    "type": "rectangle",
+                    "occluded": False,
+                    "outside": False,
+                    **({"id": shape["id"]} if "id" in shape else {}),
+                }
+                for shape in shapes
+            ],
+            **fields,
+        }
+
+    def _make_skeleton(self, element_names, *, element_ids=None):
+        element_ids = element_ids or {}
+        return {
+            "frame": 0,
+            "label_id": self.label_ids["skeleton"],
+            "group": 0,
+            "source": "manual",
+            "attributes": [],
+            "points": [],
+            "type": "skeleton",
+            "occluded": False,
+            "elements": [
+                {
+                    "frame": 0,
+                    "label_id": self.label_ids[name],
+                    "group": 0,
+                    "source": "manual",
+                    "attributes": [],
+                    "points": [1.0, float(name)],
+                    "type": "points",
+                    "occluded": False,
+                    **({"id": element_ids[name]} if name in element_ids else {}),
+                }
+                for name in element_names
+            ],
+        }
+
+    def test_update_keeps_object_ids(self):
+        db_job = self._generate_job()
+        data = self._save_annotations(db_job.id, {
+            "version": 0,
+            "tags": [],
+            "shapes": [self._make_shape(0, [1.0, 2.0, 3.0, 4.0])],
+            "tracks": [self._make_track([
+                {"frame": 0, "points": [1.0, 2.0, 3.0, 4.0]},
+                {"frame": 2, "points": [5.0, 6.0, 7.0, 8.0]},
+            ])],
+        })
+        shape_id = data["shapes"][0]["id"]
+        track_id = data["tracks"][0]["id"]
+        tracked_shape_ids = [shape["id"] for shape in data["tracks"][0]["shapes"]]
+
+        data["shapes"][0]["points"] = [2.0, 3.0, 4.0, 5.0]
+        data["shapes"][0]["attributes"][0]["value"] = "renault"
+        data["tracks"][0]["shapes"][1]["points"] = [6.0, 7.0, 8.0, 9.0]
+        data = self._save_annotations(db_job.id, data, action="update")
+
+        self.assertEqual(shape_id, data["shapes"][0]["id"])
+        self.assertEqual(track_id, data["tracks"][0]["id"])
+        self.assertEqual(tracked_shape_ids, [shape["id"] for shape in data["tracks"][0]["shapes"]])
+
+        db_shape = LabeledShape.objects.get(job_id=db_job.id)
+        self.assertEqual(shape_id, db_shape.id)
+        self.assertEqual([2.0, 3.0, 4.0, 5.0], db_shape.points)
+        self.assertEqual({"renault", "false"},
+            set(db_shape.attributes.values_list("value", flat=True)))
+        self.assertEqual(track_id, LabeledTrack.objects.get(job_id=db_job.id).id)
+        self.assertEqual({
+            tracked_shape_ids[0]: [1.0, 2.0, 3.0, 4.0],
+            tracked_shape_ids[1]: [6.0, 7.0, 8.0, 9.0],
+        }, {
+            db_tracked_shape.id: db_tracked_shape.points
+            for db_tracked_shape in TrackedShape.objects.filter(track_id=track_id)
+        })
+
+    def test_update_doesnt_rewrite_unchanged_rows(self):
+        db_job = self._generate_job()
+        data = self._save_annotations(db_job.id, {
+            "version": 0,
+            "tags": [],
+            "shapes": [self._make_shape(0, [1.0, 2.0, 3.0, 4.0])],
+            "tracks": [self._make_track([
+                {"frame": 0, "points": [1.0, 2.0, 3.0, 4.0]},
+                {"frame": 2, "points": [5.0, 6.0, 7.0, 8.0]},
+            ])],
+        })
+        shape_attr_ids = set(LabeledShapeAttributeVal.objects.values_list("id", flat=True))
+        tracked_shape_attr_ids = set(
+            TrackedShapeAttributeVal.objects.values_list("id", flat=True))
+
+        data["shapes"][0]["points"] = [2.0, 3.0, 4.0, 5.0]
+        data["tracks"][0]["shapes"][1]["points"] = [6.0, 7.0, 8.0, 9.0]
+        with self._record_row_writes() as writes:
+            self._save_annotations(db_job.id, data, action="update")
+
+        # Only the changed rows are updated, in a query per table
+        for db_model, expected_writes in {
+            LabeledShape: {"UPDATE": 1},
+            LabeledShapeAttributeVal: {},
+            LabeledTrack: {},
+            LabeledTrackAttributeVal: {},
+            TrackedShape: {"UPDATE": 1},
+            TrackedShapeAttributeVal: {},
+        }.items():
+            self.assertEqual(expected_writes, {
+                statement: count
+                for (table, statement), count in writes.items()
+                if table == db_model._meta.db_table
+            }, db_model.__name__)
+
+        self.assertEqual(shape_attr_ids,
+            set(LabeledShapeAttributeVal.objects.values_list("id", flat=True)))
+        self.assertEqual(tracked_shape_attr_ids,
+            set(TrackedShapeAttributeVal.objects.values_list("id", flat=True)))
+
+    def test_update_matches_tracked_shapes_by_frame(self):
+        db_job = self._generate_job()
+        data = self._save_annotations(db_job.id, {
+            "version": 0,
+            "tags": [],
+            "shapes": [],
+            "tracks": [self._make_track([
+                {"frame": 0, "points": [1.0, 2.0, 3.0, 4.0]},
+                {"frame": 2, "points": [5.0, 6.0, 7.0, 8.0]},
+            ])],
+        })
+        track = data["tracks"][0]
+        tracked_shape_ids = {shape["frame"]: shape["id"] for shape in track["shapes"]}
+
+        # The shapes don't have ids, the shape on the frame 2 is replaced by one on the frame 1
+        data["tracks"][0] = self._make_track([
+            {"frame": 0, "points": [2.0, 3.0, 4.0, 5.0]},
+            {"frame": 1, "points": [5.0, 6.0, 7.0, 8.0]},
+        ], id=track["id"])
+        data = self._save_annotations(db_job.id, data, action="update")
+
+        db_tracked_shapes = {
+            db_tracked_shape.frame: db_tracked_shape
+            for db_tracked_shape in TrackedShape.objects.filter(track_id=track["id"])
+        }
+        self.assertEqual([0, 1], sorted(db_tracked_shapes))
+        self.assertEqual(tracked_shape_ids[0], db_tracked_shapes[0].id)
+        self.assertEqual([2.0, 3.0, 4.0, 5.0], db_tracked_shapes[0].points)
+        self.assertNotIn(db_tracked_shapes[1].id, tracked_shape_ids.values())
+        self.assertEqual({0: db_tracked_shapes[0].id, 1: db_tracked_shapes[1].id},
+            {shape["frame"]: shape["id"] for shape in data["tracks"][0]["shapes"]})
+
+    def test_update_can_add_and_remove_skeleton_elements(self):
+        db_job = self._generate_job()
+        data = self._save_annotations(db_job.id, {
+            "version": 0,
+            "tags": [],
+            "shapes": [self._make_skeleton(["1", "2"])],
+            "tracks": [],
+        })
+        skeleton = data["shapes"][0]
+        element_ids = {
+            name: next(
+                element["id"] for element in skeleton["elements"]
+                if element["label_id"] == self.label_ids[name]
+            )
+            for name in ["1", "2"]
+        }
+
+        data["shapes"][0] = dict(self._make_skeleton(["1", "3"], element_ids=element_ids),
+            id=skeleton["id"])
+        self._save_annotations(db_job.id, data, action="update")
+
+        db_elements = {
+            db_element.label_id: db_element
+            for db_element in LabeledShape.objects.filter(parent_id=skeleton["id"])
+        }
+        self.assertEqual(
+            {self.label_ids["1"], self.label_ids["3"]}, set(db_elements))
+        self.assertEqual(element_ids["1"], db_elements[self.label_ids["1"]].id)
+        self.assertEqual([1.0, 3.0], db_elements[self.label_ids["3"]].points)
+        self.assertFalse(LabeledShape.objects.filter(id=element_ids["2"]).exists())
+        self.assertEqual(skeleton["id"], LabeledShape.objects.get(
+            job_id=db_job.id, parent=None).id)
+
+    def test_partial_update_keeps_other_objects(self):
+        db_job = self._generate_job()
+        data = self._save_annotations(db_job.id, {
+            "version": 0,
+            "tags": [],
+            "shapes": [
+                self._make_shape(0, [1.0, 2.0, 3.0, 4.0]),
+                self._make_shape(1, [5.0, 6.0, 7.0, 8.0]),
+            ],
+            "tracks": [self._make_track([
+                {"frame": 0, "points": [1.0, 2.0, 3.0, 4.0]},
+            ])],
+        })
+        updated_shape, kept_shape = data["shapes"]
+
+        updated_shape["points"] = [2.0, 3.0, 4.0, 5.0]
+        self._save_annotations(db_job.id, {
+            "version": 0,
+            "tags": [],
+            "shapes": [updated_shape],
+            "tracks": [],
+        }, action="update")
+
+        db_shapes = {
+            db_shape.id: db_shape.points
+            for db_shape in LabeledShape.objects.filter(job_id=db_job.id)
+        }
+        self.assertEqual({
+            updated_shape["id"]: [2.0, 3.0, 4.0, 5.0],
+            kept_shape["id"]: [5.0, 6.0, 7.0, 8.0],
+        }, db_shapes)
+        self.assertEqual([data["tracks"][0]["id"]],
+            list(LabeledTrack.objects.filter(job_id=db_job.id).values_list("id", flat=True)))
+
+class TaskAnnotationConcurrentLoadingTest(APITransactionTestCase):
+    # The job annotations are loaded with separate DB connections,
+    # so the test data must be committed
+
+    _create_task = _DbTestBase._create_task
+    _put_api_v2_task_id_annotations = _DbTestBase._put_api_v2_task_id_annotations
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser(username="test", password="test", email="")
+
+        patcher = mock.patch('cvat.apps.dataset_manager.task.get_media_redis_connection',
+            return_value=fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        MediaCache.clear()
+
+        return super().tearDown()
+
+    def _generate_task(self):
+        task = self._create_task({
+            "name": "my task #1",
+            "overlap": 0,
+            "segment_size": 2,
+            "labels": [{"name": "car"}],
+        }, {
+            **{
+                "client_files[%d]" % i: generate_image_file("image_%d.jpg" % i)
+                for i in range(6)
+            },
+            "image_quality": 75,
+        })
+
+        label_id = task["labels"][0]["id"]
+        response = self._put_api_v2_task_id_annotations(task["id"], {
+            "version": 0,
+            "tags": [],
+            "shapes": [
+                {
+                    "frame": frame,
+                    "label_id": label_id,
+                    "group": 0,
+                    "source": "manual",
+                    "attributes": [],
+                    "points": [1.0 + frame, 2.0, 3.0, 4.0],
+                    "type": "rectangle",
+                    "occluded": False,
+                }
+                for frame in range(6)
+            ],
+            "tracks": [
+                {
+                    "frame": 1,
+                    "label_id": label_id,
+                    "group": 0,
+                    "source": "manual",
+                    "attributes": [],
+                    "shapes": [
+                        {
+                            "frame": frame,
+                            "attributes": [],
+                            "points": [1.0, 2.0 + frame, 3.0, 4.0],
+                            "type": "rectangle",
+                            "occluded": False,
+                            "outside": frame == 4,
+                        }
+                        for frame in [1, 2, 4]
+                    ],
+                },
+            ],
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return task
+
+    def test_can_load_job_annotations_concurrently(self):
+        task = self._generate_task()
+
+        expected_annotations = TaskAnnotation(task["id"])
+        expected_annotations.init_from_db()
+
+        annotations = TaskAnnotation(task["id"])
+        # The concurrent loading is only enabled with PostgreSQL
+        with override_settings(DATASET_ANNOTATION_LOADING_THREADS=2), \
+            mock.patch('cvat.apps.dataset_manager.task.connection',
+                SimpleNamespace(vendor='postgresql')), \
+            mock.patch.object(TaskAnnotation, '_load_job_annotations_in_thread',
+                side_effect=TaskAnnotation._load_job_annotations_in_thread
+            ) as load_job_annotations_in_thread:
+            annotations.init_from_db(concurrent=True)
+
+        self.assertEqual(3, load_job_annotations_in_thread.call_count)
+        self.assertEqual(expected_annotations.data, annotations.data)
+
 class FrameMatchingTest(_DbTestBase):
     def _generate_task_images(self, paths): # pylint: disable=no-self-use
         f = BytesIO()
@@ -2113,6 +2113,31 @@ class ProjectDumpUpload(_DbTestBase):
                             response = self._post_request_with_data(url, {"dataset_file": binary_file}, user)
                             self.assertEqual(response.status_code, edata['accept code'])
 
+    def test_api_v2_export_dataset_with_same_image_names_in_tasks(self):
+        test_name = self._testMethodName
+        project = self._create_project(projects['main'])
+        for task_name in ['task in project #1', 'task in project #2']:
+            tasks[task_name]['project_id'] = project['id']
+            self._create_task(tasks[task_name], self._generate_task_images(3))
+
+        with TestDir() as test_dir:
+            for dump_format_name in ['CVAT for images 1.1', 'CVAT for video 1.1']:
+                with self.subTest(format=dump_format_name):
+                    self._clear_rq_jobs() # clean up from previous tests and iterations
+
+                    file_zip_name = osp.join(test_dir, f'{test_name}_{dump_format_name}.zip')
+                    url = self._generate_url_dump_project_dataset(project['id'], dump_format_name)
+                    self._download_file(url, {"format": dump_format_name}, self.admin, file_zip_name)
+
+                    with zipfile.ZipFile(file_zip_name) as archive:
+                        names = archive.namelist()
+
+                    self.assertEqual(len(names), len(set(names)))
+                    self.assertEqual(
+                        sorted(osp.join('images', 'default', f'image_{i}.jpg') for i in range(3)),
+                        sorted(name for name in names if name.startswith('images/'))
+                    )
+
     def test_api_v2_export_annotations(self):
         test_name = self._testMethodName
         dump_formats = dm.views.get_export_formats()
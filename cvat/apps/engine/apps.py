@@ -10,6 +10,14 @@ class EngineConfig(AppConfig):
     name = 'cvat.apps.engine'
 
     def ready(self):
+        from django.conf import settings
+
+        from . import default_settings
+
+        for key in dir(default_settings):
+            if key.isupper() and not hasattr(settings, key):
+                setattr(settings, key, getattr(default_settings, key))
+
         # Required to define signals in application
         import cvat.apps.engine.signals
         # Required in order to silent "unused-import" in pyflake
@@ -10,17 +10,22 @@ from datetime import datetime, timezone
 from io import BytesIO
 import shutil
 import tempfile
+import time
 import zlib
-
-from typing import Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import PIL.Image
-import pickle # nosec
+import redis
 from django.conf import settings
-from django.core.cache import caches
+from pottery import Redlock
 from rest_framework.exceptions import NotFound, ValidationError
 
+from cvat.apps.engine.cache_tiers import (CacheItem, CacheItemOwner, CacheItemOwnerGetter,
+                                          CacheTier, CacheTierStats, RedisCacheTier,
+                                          disk_tier, get_media_redis_connection,
+                                          memory_tier, tier_stats)
 from cvat.apps.engine.cloud_provider import (Credentials,
                                              db_storage_to_storage_instance,
                                              get_cloud_storage_instance)
@@ -40,62 +45,245 @@ from utils.dataset_manifest import ImageManifestManager
 slogger = ServerLogManager(__name__)
 
 class MediaCache:
+    _STATS_KEY = 'media_cache:single_flight_stats'
+
     def __init__(self, dimension=DimensionType.DIM_2D):
         self._dimension = dimension
-        self._cache = caches['media']
+        self._redis_tier = RedisCacheTier()
 
-    def _get_or_set_cache_item(self, key, create_function):
-        def create_item():
-            slogger.glob.info(f'Starting to prepare chunk: key {key}')
-            item = create_function()
-            slogger.glob.info(f'Ending to prepare chunk: key {key}')
+    def _get_chunk_tiers(self) -> List[CacheTier]:
+        return [t for t in (disk_tier, self._redis_tier) if t.enabled]
 
-            if item[0]:
-                item = (item[0], item[1], zlib.crc32(item[0].getbuffer()))
-                self._cache.set(key, item)
+    def _get_preview_tiers(self) -> List[CacheTier]:
+        return [t for t in (memory_tier, self._redis_tier) if t.enabled]
 
-            return item
+    @classmethod
+    def get_single_flight_stats(cls) -> Dict[str, float]:
+        """
+        Returns the counters of coordinated cache item preparation, accumulated by all processes:
+        - prepared - the number of items prepared by a lock holder
+        - coalesced_waits - the number of requests served with an item prepared by another process
+        - coalesced_wait_time - the total time spent in such requests waiting for the item, in seconds
+        - wait_timeouts - the number of requests that stopped waiting and prepared the item themselves
+        """
 
-        slogger.glob.info(f'Starting to get chunk from cache: key {key}')
+        stats = get_media_redis_connection().hgetall(cls._STATS_KEY)
+        return {k.decode(): float(v) for k, v in stats.items()}
+
+    @staticmethod
+    def get_tier_stats() -> Dict[str, Dict[str, float]]:
+        """
+        Returns hits, misses and the hit ratio of each cache tier, accumulated by all processes
+        """
+
+        return CacheTierStats.get()
+
+    @staticmethod
+    def clear():
+        """
+        Removes all the items from the media cache tiers, available in the current process
+        """
+
+        for tier in (memory_tier, disk_tier, RedisCacheTier()):
+            tier.clear()
+
+    def _update_single_flight_stats(self, **increments: float):
+        try:
+            with get_media_redis_connection().pipeline(transaction=False) as pipe:
+                for name, value in increments.items():
+                    pipe.hincrbyfloat(self._STATS_KEY, name, value)
+                pipe.execute()
+        except redis.RedisError:
+            # The stats are optional, they must not break the request
+            slogger.glob.warning('Failed to update media cache stats', exc_info=True)
+
+    @contextmanager
+    def _get_cache_item_lock(self, key: str):
+        lock = Redlock(
+            key=f'media_cache_lock:{key}',
+            masters={get_media_redis_connection()},
+            auto_release_time=settings.MEDIA_CACHE_LOCK_TTL,
+        )
+        acquired = lock.acquire(blocking=True, timeout=settings.MEDIA_CACHE_LOCK_WAIT_TIMEOUT)
         try:
-            item = self._cache.get(key)
-        except pickle.UnpicklingError:
-            slogger.glob.error(f'Unable to get item from cache: key {key}', exc_info=True)
-            item = None
+            yield acquired
+        finally:
+            if acquired and lock.locked():
+                lock.release()
+
+    def _get_cache_item(
+        self, key: str, tiers: Sequence[CacheTier], owner: CacheItemOwnerGetter
+    ) -> Optional[CacheItem]:
+        for tier_idx, tier in enumerate(tiers):
+            item = tier.get(key)
+            tier_stats.add(tier.name, hit=bool(item))
+
+            if item:
+                # Promote the item to the faster tiers
+                for upper_tier in tiers[:tier_idx]:
+                    upper_tier.set(key, item, owner)
+
+                return item
+
+        return None
+
+    def _create_cache_item(
+        self,
+        key: str,
+        create_function: Callable[[], Tuple[Any, str]],
+        tiers: Sequence[CacheTier],
+        owner: CacheItemOwnerGetter,
+    ) -> Tuple[Any, ...]:
+        slogger.glob.info(f'Starting to prepare chunk: key {key}')
+        item = create_function()
+        slogger.glob.info(f'Ending to prepare chunk: key {key}')
+
+        if item[0]:
+            # The checksum is computed only once, when the item is created
+            item = CacheItem(item[0], item[1], zlib.crc32(item[0].getbuffer()))
+
+            # The shared tier goes first, so that other processes could get the item earlier
+            for tier in reversed(tiers):
+                tier.set(key, item, owner)
+
+        return item
+
+    def _get_or_set_cache_item(
+        self,
+        key,
+        create_function,
+        *,
+        tiers: Sequence[CacheTier],
+        owner: CacheItemOwnerGetter,
+    ):
+        slogger.glob.info(f'Starting to get chunk from cache: key {key}')
+        item = self._get_cache_item(key, tiers, owner)
         slogger.glob.info(f'Ending to get chunk from cache: key {key}, is_cached {bool(item)}')
 
         if not item:
-            item = create_item()
-        else:
-            # compare checksum
-            item_data = item[0].getbuffer() if isinstance(item[0], io.BytesIO) else item[0]
-            item_checksum = item[2] if len(item) == 3 else None
-            if item_checksum != zlib.crc32(item_data):
-                slogger.glob.info(f'Recreating cache item {key} due to checksum mismatch')
-                item = create_item()
+            if settings.MEDIA_CACHE_SINGLE_FLIGHT:
+                item = self._create_cache_item_once(key, create_function, tiers, owner)
+            else:
+                item = self._create_cache_item(key, create_function, tiers, owner)
 
         return item[0], item[1]
 
+    def _create_cache_item_once(self, key, create_function, tiers, owner):
+        # Only one process prepares the item, the others wait for the lock to be released
+        # and then read the prepared item from the cache
+        wait_start = time.monotonic()
+        with self._get_cache_item_lock(key) as acquired:
+            wait_time = time.monotonic() - wait_start
+
+            if acquired:
+                item = self._get_cache_item(key, tiers, owner)
+                if item:
+                    slogger.glob.info(
+                        f'Got chunk prepared by another process: key {key}, '
+                        f'waited {wait_time:.3f}s'
+                    )
+                    self._update_single_flight_stats(
+                        coalesced_waits=1, coalesced_wait_time=wait_time
+                    )
+                    return item
+
+                item = self._create_cache_item(key, create_function, tiers, owner)
+                self._update_single_flight_stats(prepared=1)
+                return item
+
+        slogger.glob.warning(
+            f'Timed out waiting for chunk preparation in another process: key {key}'
+        )
+        self._update_single_flight_stats(wait_timeouts=1)
+        return self._create_cache_item(key, create_function, tiers, owner)
+
+    def _has_cache_item(self, key: str, tiers: Sequence[CacheTier]) -> bool:
+        return any(tier.has(key) for tier in tiers)
+
+    @staticmethod
+    def _get_data_owner(db_data) -> CacheItemOwnerGetter:
+        def _get_owner():
+            task_id, org_id = db_data.tasks.values_list('id', 'organization_id').first() \
+                or (None, None)
+            return CacheItemOwner(task_id=task_id, org_id=org_id)
+
+        return _get_owner
+
+    @staticmethod
+    def _get_job_owner(db_job) -> CacheItemOwnerGetter:
+        def _get_owner():
+            db_task = db_job.segment.task
+            return CacheItemOwner(task_id=db_task.id, org_id=db_task.organization_id)
+
+        return _get_owner
+
+    @staticmethod
+    def _get_cloud_storage_owner(db_storage) -> CacheItemOwnerGetter:
+        return lambda: CacheItemOwner(org_id=db_storage.organization_id)
+
+    @staticmethod
+    def _make_task_chunk_key(db_data, chunk_number, quality) -> str:
+        return f'{db_data.id}_{chunk_number}_{quality}'
+
+    @staticmethod
+    def _make_selective_job_chunk_key(db_job, chunk_number, quality) -> str:
+        return f'job_{db_job.id}_{chunk_number}_{quality}'
+
     def get_task_chunk_data_with_mime(self, chunk_number, quality, db_data):
         item = self._get_or_set_cache_item(
-            key=f'{db_data.id}_{chunk_number}_{quality}',
+            key=self._make_task_chunk_key(db_data, chunk_number, quality),
             create_function=lambda: self._prepare_task_chunk(db_data, quality, chunk_number),
+            tiers=self._get_chunk_tiers(),
+            owner=self._get_data_owner(db_data),
         )
 
         return item
 
     def get_selective_job_chunk_data_with_mime(self, chunk_number, quality, job):
         item = self._get_or_set_cache_item(
-            key=f'job_{job.id}_{chunk_number}_{quality}',
+            key=self._make_selective_job_chunk_key(job, chunk_number, quality),
             create_function=lambda: self.prepare_selective_job_chunk(job, quality, chunk_number),
+            tiers=self._get_chunk_tiers(),
+            owner=self._get_job_owner(job),
         )
 
         return item
 
+    def warm_up_task_chunk(self, chunk_number, quality, db_data) -> bool:
+        """
+        Prepares the task chunk, if it is not cached yet.
+        Returns True if the chunk was prepared.
+        """
+
+        if self._has_cache_item(
+            self._make_task_chunk_key(db_data, chunk_number, quality), self._get_chunk_tiers()
+        ):
+            return False
+
+        self.get_task_chunk_data_with_mime(chunk_number, quality, db_data)
+        return True
+
+    def warm_up_selective_job_chunk(self, chunk_number, quality, job) -> bool:
+        """
+        Prepares the job chunk, if it is not cached yet.
+        Returns True if the chunk was prepared.
+        """
+
+        if self._has_cache_item(
+            self._make_selective_job_chunk_key(job, chunk_number, quality),
+            self._get_chunk_tiers(),
+        ):
+            return False
+
+        self.get_selective_job_chunk_data_with_mime(chunk_number, quality, job)
+        return True
+
     def get_local_preview_with_mime(self, frame_number, db_data):
         item = self._get_or_set_cache_item(
             key=f'data_{db_data.id}_{frame_number}_preview',
             create_function=lambda: self._prepare_local_preview(frame_number, db_data),
+            tiers=self._get_preview_tiers(),
+            owner=self._get_data_owner(db_data),
         )
 
         return item
@@ -105,7 +293,9 @@ class MediaCache:
         db_storage: CloudStorage,
     ) -> Optional[Tuple[io.BytesIO, str]]:
         key = f'cloudstorage_{db_storage.id}_preview'
-        return self._cache.get(key)
+        return self._get_cache_item(
+            key, self._get_preview_tiers(), owner=self._get_cloud_storage_owner(db_storage)
+        )
 
     def get_or_set_cloud_preview_with_mime(
         self,
@@ -114,7 +304,9 @@ class MediaCache:
         key = f'cloudstorage_{db_storage.id}_preview'
 
         item = self._get_or_set_cache_item(
-            key, create_function=lambda: self._prepare_cloud_preview(db_storage)
+            key, create_function=lambda: self._prepare_cloud_preview(db_storage),
+            tiers=self._get_preview_tiers(),
+            owner=self._get_cloud_storage_owner(db_storage),
         )
 
         return item
@@ -122,7 +314,9 @@ class MediaCache:
     def get_frame_context_images(self, db_data, frame_number):
         item = self._get_or_set_cache_item(
             key=f'context_image_{db_data.id}_{frame_number}',
-            create_function=lambda: self._prepare_context_image(db_data, frame_number)
+            create_function=lambda: self._prepare_context_image(db_data, frame_number),
+            tiers=self._get_preview_tiers(),
+            owner=self._get_data_owner(db_data),
         )
 
         return item
@@ -133,8 +327,6 @@ class MediaCache:
             FrameProvider  # TODO: remove circular dependency
         return FrameProvider
 
-    from contextlib import contextmanager
-
     @staticmethod
     @contextmanager
     def _get_images(db_data, chunk_number, dimension):
@@ -0,0 +1,578 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import io
+import os
+import random
+import shutil
+import struct
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import redis
+from django.conf import settings
+
+from cvat.apps.engine.log import ServerLogManager
+
+slogger = ServerLogManager(__name__)
+
+_media_redis_connection: Optional[redis.Redis] = None
+
+def get_media_redis_connection() -> redis.Redis:
+    global _media_redis_connection # pylint: disable=global-statement
+    if _media_redis_connection is None:
+        _media_redis_connection = redis.Redis.from_url(settings.CACHES['media']['LOCATION'])
+    return _media_redis_connection
+
+
+class CacheItem(NamedTuple):
+    data: io.BufferedIOBase
+    "A readable and seekable stream"
+
+    mime: str
+    checksum: int
+
+class FileSegmentReader(io.RawIOBase):
+    """
+    A read-only stream over the file contents, starting from the offset
+    """
+
+    def __init__(self, f: io.FileIO, offset: int):
+        super().__init__()
+        self._file = f
+        self._offset = offset
+        self._size = os.fstat(f.fileno()).st_size - offset
+        self._file.seek(offset)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._file.tell() - self._offset
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self.tell()
+        elif whence == io.SEEK_END:
+            pos += self._size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f'Invalid whence value {whence}')
+
+        if pos < 0:
+            raise ValueError(f'Negative seek position {pos}')
+
+        self._file.seek(self._offset + pos)
+        return pos
+
+    def readinto(self, b) -> int:
+        return self._file.readinto(b)
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+def _write_data(data: io.BufferedIOBase, f: io.BufferedIOBase) -> None:
+    if isinstance(data, io.BytesIO):
+        f.write(data.getbuffer())
+    else:
+        position = data.tell()
+        data.seek(0)
+        shutil.copyfileobj(data, f)
+        data.seek(position)
+
+def _read_data(data: io.BufferedIOBase) -> bytes:
+    if isinstance(data, io.BytesIO):
+        return data.getvalue()
+
+    position = data.tell()
+    data.seek(0)
+    value = data.read()
+    data.seek(position)
+    return value
+
+def _compute_checksum(data: io.BufferedIOBase) -> int:
+    if isinstance(data, io.BytesIO):
+        return zlib.crc32(data.getbuffer())
+
+    position = data.tell()
+    data.seek(0)
+    checksum = 0
+    while block := data.read(2**20):
+        checksum = zlib.crc32(block, checksum)
+    data.seek(position)
+    return checksum
+
+def _verify_checksum(key: str, item: CacheItem) -> bool:
+    # The checksum is computed when the item is written. Verifying it
+    # requires reading the whole item, so only a fraction of reads is checked.
+    if random.random() >= settings.MEDIA_CACHE_CHECKSUM_VERIFICATION_RATE: # nosec
+        return True
+
+    if item.checksum != _compute_checksum(item.data):
+        slogger.glob.info(f'Recreating cache item {key} due to checksum mismatch')
+        return False
+
+    return True
+
+class CacheItemOwner(NamedTuple):
+    task_id: Optional[int] = None
+    org_id: Optional[int] = None
+
+CacheItemOwnerGetter = Callable[[], CacheItemOwner]
+
+
+def _select_eviction_candidates(
+    entries: Iterable[Tuple[str, int, float]], excess_size: int
+) -> List[str]:
+    """
+    Selects the entries to be removed to free at least excess_size bytes.
+    The entries are (key, size, last access time) tuples. The entries are evicted
+    in the order of decreasing idle time weighted by size, so big cold items
+    are removed before the small hot ones.
+    """
+
+    now = time.time()
+    candidates = sorted(entries, key=lambda e: (now - e[2]) * e[1], reverse=True)
+
+    selected = []
+    for key, size, _ in candidates:
+        if excess_size <= 0:
+            break
+
+        selected.append(key)
+        excess_size -= size
+
+    return selected
+
+
+class CacheTierStats:
+    """
+    Counts hits and misses of the cache tiers in the current process
+    and periodically adds them to the counters shared by all processes.
+    """
+
+    _STATS_KEY = 'media_cache:tier_stats'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._last_flush_time = time.monotonic()
+
+    def add(self, tier_name: str, *, hit: bool):
+        with self._lock:
+            self._counters[f'{tier_name}_{"hits" if hit else "misses"}'] += 1
+
+            if time.monotonic() - self._last_flush_time < settings.MEDIA_CACHE_STATS_FLUSH_INTERVAL:
+                return
+
+            counters = self._counters
+            self._counters = defaultdict(int)
+            self._last_flush_time = time.monotonic()
+
+        try:
+            with get_media_redis_connection().pipeline(transaction=False) as pipe:
+                for name, value in counters.items():
+                    pipe.hincrby(self._STATS_KEY, name, value)
+                pipe.execute()
+        except redis.RedisError:
+            # The stats are optional, they must not break the request
+            slogger.glob.warning('Failed to update media cache tier stats', exc_info=True)
+
+    @classmethod
+    def get(cls) -> Dict[str, Dict[str, float]]:
+        """
+        Returns hits, misses and the hit ratio of each cache tier, accumulated by all processes
+        """
+
+        counters = {
+            k.decode(): int(v)
+            for k, v in get_media_redis_connection().hgetall(cls._STATS_KEY).items()
+        }
+
+        stats = {}
+        for tier_name in {k.rsplit('_', maxsplit=1)[0] for k in counters}:
+            hits = counters.get(f'{tier_name}_hits', 0)
+            misses = counters.get(f'{tier_name}_misses', 0)
+            stats[tier_name] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / ((hits + misses) or 1),
+            }
+
+        return stats
+
+tier_stats = CacheTierStats()
+
+
+class CacheTier(ABC):
+    name: str
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheItem]: ...
+
+    @abstractmethod
+    def set(self, key: str, item: CacheItem, owner: CacheItemOwnerGetter) -> None: ...
+
+    @abstractmethod
+    def has(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+
+class MemoryCacheTier(CacheTier):
+    """
+    A process-local cache for small and frequently requested items, like previews
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: OrderedDict[str, Tuple[bytes, str, int, float]] = OrderedDict()
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        return settings.MEDIA_CACHE_MEMORY_TIER_SIZE
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def get(self, key: str) -> Optional[CacheItem]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+
+            data, mime, checksum, _ = entry
+            self._items[key] = (data, mime, checksum, time.time())
+
+        # the buffer is shared with the stored bytes until it's modified
+        return CacheItem(io.BytesIO(data), mime, checksum)
+
+    def set(self, key: str, item: CacheItem, owner: CacheItemOwnerGetter) -> None:
+        data = _read_data(item.data)
+        if self.capacity < len(data):
+            return
+
+        with self._lock:
+            if old_entry := self._items.pop(key, None):
+                self._size -= len(old_entry[0])
+
+            self._items[key] = (data, item.mime, item.checksum, time.time())
+            self._size += len(data)
+
+            if self.capacity < self._size:
+                for evicted_key in _select_eviction_candidates(
+                    ((k, len(v[0]), v[3]) for k, v in self._items.items()),
+                    excess_size=self._size - self.capacity,
+                ):
+                    self._size -= len(self._items.pop(evicted_key)[0])
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+class DiskCacheTier(CacheTier):
+    """
+    A node-local cache on the disk. Each item is stored in a separate file with a small header.
+    The files are hardlinked into per-organization and per-task directories,
+    which are used to apply the organization and task quotas.
+    """
+
+    name = 'disk'
+
+    _MAGIC = b'CVMC'
+    _VERSION = 1
+    # magic, version, checksum, creation time, mime length, owner dir length
+    _HEADER = struct.Struct('<4sBIdHH')
+
+    class _ItemHeader(NamedTuple):
+        checksum: int
+        created: float
+        mime: str
+        owner_dir: str
+
+    @property
+    def capacity(self) -> int:
+        return settings.MEDIA_CACHE_DISK_TIER_SIZE
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    # The eviction frees some extra space, so that the next writes don't trigger it again
+    _EVICTION_TARGET = 0.9
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # The directory sizes, tracked by the process, and the times of the last directory scans.
+        # Other processes write to the same directories, so the directories are rescanned
+        # periodically to account for their items.
+        self._dir_sizes: Dict[str, Tuple[int, float]] = {}
+
+    @property
+    def root(self) -> str:
+        return settings.MEDIA_CACHE_DISK_TIER_ROOT
+
+    def _get_items_dir(self) -> str:
+        return os.path.join(self.root, 'items')
+
+    def _get_item_path(self, key: str) -> str:
+        return os.path.join(self._get_items_dir(), hashlib.sha256(key.encode()).hexdigest())
+
+    def _get_org_dir(self, owner: CacheItemOwner) -> str:
+        return os.path.join('owners', f'org_{owner.org_id}')
+
+    def _get_task_dir(self, owner: CacheItemOwner) -> str:
+        return os.path.join(self._get_org_dir(owner), f'task_{owner.task_id}')
+
+    def _read_header(self, f: io.BufferedReader) -> Optional[_ItemHeader]:
+        header = f.read(self._HEADER.size)
+        if len(header) != self._HEADER.size:
+            return None
+
+        magic, version, checksum, created, mime_length, owner_dir_length = \
+            self._HEADER.unpack(header)
+        if magic != self._MAGIC or version != self._VERSION:
+            return None
+
+        mime = f.read(mime_length).decode()
+        owner_dir = f.read(owner_dir_length).decode()
+        return self._ItemHeader(checksum, created, mime, owner_dir)
+
+    def get(self, key: str) -> Optional[CacheItem]:
+        path = self._get_item_path(key)
+        try:
+            f = open(path, 'rb', buffering=0) # pylint: disable=consider-using-with
+        except FileNotFoundError:
+            return None
+
+        try:
+            header_reader = io.BufferedReader(f, buffer_size=self._HEADER.size)
+            header = self._read_header(header_reader)
+            data_offset = header_reader.tell()
+            header_reader.detach()
+
+            if header is None or (
+                settings.CACHES['media']['TIMEOUT'] <= time.time() - header.created
+            ):
+                f.close()
+                self._remove_item(path)
+                return None
+
+            # The data is read from the file only when it's requested
+            item = CacheItem(
+                io.BufferedReader(FileSegmentReader(f, data_offset)),
+                header.mime, header.checksum
+            )
+        except BaseException:
+            f.close()
+            raise
+
+        if not _verify_checksum(key, item):
+            item.data.close()
+            self._remove_item(path)
+            return None
+
+        try:
+            # the modification time is used as the last access time for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return item
+
+    def set(self, key: str, item: CacheItem, owner: CacheItemOwnerGetter) -> None:
+        owner = owner()
+        path = self._get_item_path(key)
+        owner_dir = self._get_task_dir(owner)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(os.path.join(self.root, owner_dir), exist_ok=True)
+
+        mime = item.mime.encode()
+        encoded_owner_dir = owner_dir.encode()
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self._HEADER.pack(
+                self._MAGIC, self._VERSION, item.checksum, time.time(),
+                len(mime), len(encoded_owner_dir)
+            ))
+            f.write(mime)
+            f.write(encoded_owner_dir)
+            _write_data(item.data, f)
+            item_size = f.tell()
+
+        self._remove_item(path)
+        os.replace(tmp_path, path)
+        try:
+            os.link(path, os.path.join(self.root, owner_dir, os.path.basename(path)))
+        except FileExistsError:
+            pass
+
+        for dirname, limit in (
+            (os.path.join(self.root, owner_dir), settings.MEDIA_CACHE_TASK_QUOTA),
+            (os.path.join(self.root, self._get_org_dir(owner)), settings.MEDIA_CACHE_ORG_QUOTA),
+            (self._get_items_dir(), self.capacity),
+        ):
+            self._add_dir_size(dirname, item_size, limit)
+
+    def has(self, key: str) -> bool:
+        return os.path.isfile(self._get_item_path(key))
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+        with self._lock:
+            self._dir_sizes.clear()
+
+    def _remove_item(self, path: str):
+        try:
+            with open(path, 'rb') as f:
+                header = self._read_header(f)
+        except FileNotFoundError:
+            return
+
+        # The space is only released when the per-owner link is removed as well
+        for p in (
+            os.path.join(self.root, header.owner_dir, os.path.basename(path)) if header else None,
+            path,
+        ):
+            if not p:
+                continue
+
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def _add_dir_size(self, dirname: str, size: int, limit: int):
+        if not limit:
+            return
+
+        with self._lock:
+            dir_size, scan_time = self._dir_sizes.get(dirname, (None, 0))
+            if dir_size is not None and (
+                time.monotonic() - scan_time < settings.MEDIA_CACHE_DISK_TIER_RESCAN_INTERVAL
+            ):
+                dir_size += size
+                self._dir_sizes[dirname] = (dir_size, scan_time)
+                if dir_size <= limit:
+                    return
+
+        # The tracked size is unknown, outdated or over the limit, so the directory is scanned
+        dir_size = self._evict(dirname, limit)
+
+        with self._lock:
+            self._dir_sizes[dirname] = (dir_size, time.monotonic())
+
+    def _evict(self, dirname: str, limit: int) -> int:
+        """
+        Removes the directory items exceeding the limit. Returns the remaining directory size.
+        """
+
+        entries = []
+        for dirpath, _, filenames in os.walk(dirname):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+
+                try:
+                    stat = os.stat(os.path.join(dirpath, filename))
+                except FileNotFoundError:
+                    continue
+
+                entries.append((filename, stat.st_size, stat.st_mtime))
+
+        dir_size = sum(e[1] for e in entries)
+        if dir_size <= limit:
+            return dir_size
+
+        entry_sizes = {e[0]: e[1] for e in entries}
+        for filename in _select_eviction_candidates(
+            entries, dir_size - int(limit * self._EVICTION_TARGET)
+        ):
+            self._remove_item(os.path.join(self._get_items_dir(), filename))
+            dir_size -= entry_sizes[filename]
+
+        return dir_size
+
+
+class RedisCacheTier(CacheTier):
+    """
+    The cache shared by all the server instances.
+    Each item is stored as a hash with a small header and the raw data bytes,
+    so that reading an item doesn't require deserialization and extra data copies.
+    """
+
+    name = 'redis'
+
+    _KEY_PREFIX = 'media_cache:item:'
+    _VERSION = 1
+    _HEADER = struct.Struct('<BIH') # version, checksum, mime length
+
+    def _make_key(self, key: str) -> str:
+        return self._KEY_PREFIX + key
+
+    def get(self, key: str) -> Optional[CacheItem]:
+        header, data = get_media_redis_connection().hmget(
+            self._make_key(key), ['header', 'data']
+        )
+        if header is None or data is None or len(header) < self._HEADER.size:
+            return None
+
+        version, checksum, mime_length = self._HEADER.unpack_from(header)
+        if version != self._VERSION:
+            return None
+
+        mime = header[self._HEADER.size:self._HEADER.size + mime_length].decode()
+
+        # The buffer shares the memory with the bytes object until it's modified
+        item = CacheItem(io.BytesIO(data), mime, checksum)
+        if not _verify_checksum(key, item):
+            return None
+
+        return item
+
+    def set(self, key: str, item: CacheItem, owner: CacheItemOwnerGetter) -> None:
+        mime = item.mime.encode()
+        header = self._HEADER.pack(self._VERSION, item.checksum, len(mime)) + mime
+
+        redis_key = self._make_key(key)
+        with get_media_redis_connection().pipeline(transaction=True) as pipe:
+            pipe.hset(redis_key, mapping={'header': header, 'data': _read_data(item.data)})
+            pipe.expire(redis_key, settings.CACHES['media']['TIMEOUT'])
+            pipe.execute()
+
+    def has(self, key: str) -> bool:
+        return bool(get_media_redis_connection().exists(self._make_key(key)))
+
+    def clear(self) -> None:
+        connection = get_media_redis_connection()
+        for redis_key in connection.scan_iter(match=self._KEY_PREFIX + '*'):
+            connection.delete(redis_key)
+
+
+memory_tier = MemoryCacheTier()
+disk_tier = DiskCacheTier()
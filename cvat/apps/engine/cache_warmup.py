@@ -0,0 +1,224 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional, Set
+
+import django_rq
+from django.conf import settings
+from django.db import connections
+from rq.job import JobStatus as RQJobStatus
+
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.frame_provider import FrameProvider
+from cvat.apps.engine.log import ServerLogManager
+from cvat.apps.engine.models import Data, DimensionType, Job, SegmentType, StorageMethodChoice
+
+slogger = ServerLogManager(__name__)
+
+_QUEUE_JOB_PREFIX = "warmup-chunks-job-"
+_PENDING_JOB_STATUSES = (
+    RQJobStatus.QUEUED, RQJobStatus.STARTED, RQJobStatus.DEFERRED, RQJobStatus.SCHEDULED
+)
+_WARMUP_QUALITIES = (
+    # The compressed chunks are requested by the UI by default, so they go first
+    FrameProvider.Quality.COMPRESSED,
+    FrameProvider.Quality.ORIGINAL,
+)
+
+
+def _get_queue():
+    return django_rq.get_queue(settings.CVAT_QUEUES.CHUNKS.value)
+
+def _make_queue_job_id(db_job_id: int) -> str:
+    return f"{_QUEUE_JOB_PREFIX}{db_job_id}"
+
+def _is_data_cached(db_data: Data) -> bool:
+    return settings.USE_CACHE and db_data.storage_method == StorageMethodChoice.CACHE
+
+def is_warmup_applicable(db_data: Data) -> bool:
+    return settings.MEDIA_CACHE_WARMUP and _is_data_cached(db_data)
+
+def enqueue_job_chunks_warmup(db_job: Job) -> None:
+    """
+    Schedules a background job, which fills the media cache with the job chunks.
+    Does nothing if there is already a pending warmup for the job.
+    """
+
+    if not is_warmup_applicable(db_job.segment.task.data):
+        return
+
+    queue = _get_queue()
+    rq_id = _make_queue_job_id(db_job.id)
+
+    rq_job = queue.fetch_job(rq_id)
+    if rq_job:
+        if rq_job.get_status(refresh=False) in _PENDING_JOB_STATUSES:
+            return
+
+        rq_job.delete()
+
+    queue.enqueue_call(
+        func=_warm_up_job_chunks,
+        kwargs={'db_job_id': db_job.id},
+        job_id=rq_id,
+        result_ttl=0,
+        failure_ttl=settings.MEDIA_CACHE_WARMUP_FAILED_TTL,
+    )
+
+def enqueue_task_chunks_warmup(task_id: int) -> None:
+    db_jobs = (
+        Job.objects
+        .select_related('segment__task__data')
+        .filter(segment__task_id=task_id)
+        .order_by('segment__start_frame', 'id')
+    )
+    for db_job in db_jobs:
+        enqueue_job_chunks_warmup(db_job)
+
+def cancel_job_chunks_warmup(db_job_id: int) -> None:
+    """
+    Cancels the pending warmup of the job chunks.
+    A started warmup stops by itself, once it finds the job removed.
+    """
+
+    rq_job = _get_queue().fetch_job(_make_queue_job_id(db_job_id))
+    if rq_job and rq_job.get_status(refresh=False) in (
+        RQJobStatus.QUEUED, RQJobStatus.DEFERRED, RQJobStatus.SCHEDULED
+    ):
+        rq_job.cancel()
+
+def _warm_up_job_chunks(*, db_job_id: int) -> None:
+    try:
+        db_job = Job.objects.select_related('segment__task__data').get(id=db_job_id)
+    except Job.DoesNotExist:
+        return
+
+    db_segment = db_job.segment
+    db_task = db_segment.task
+    db_data = db_task.data
+    if not is_warmup_applicable(db_data):
+        return
+
+    frame_provider = FrameProvider(db_data, db_task.dimension)
+    chunk_numbers = range(
+        frame_provider.get_chunk_number(db_segment.start_frame),
+        frame_provider.get_chunk_number(db_segment.stop_frame) + 1
+    )
+
+    # Use the same cache items as the job data endpoint does
+    if db_segment.type == SegmentType.SPECIFIC_FRAMES:
+        cache = MediaCache()
+        warm_up_chunk = functools.partial(cache.warm_up_selective_job_chunk, job=db_job)
+    else:
+        cache = MediaCache(db_task.dimension)
+        warm_up_chunk = functools.partial(cache.warm_up_task_chunk, db_data=db_data)
+
+    prepared_count = 0
+    for quality in _WARMUP_QUALITIES:
+        for chunk_number in chunk_numbers:
+            if not Job.objects.filter(id=db_job_id).exists():
+                slogger.glob.info(f'Chunk warmup for job #{db_job_id} cancelled: job removed')
+                return
+
+            if warm_up_chunk(chunk_number, quality):
+                prepared_count += 1
+
+    slogger.glob.info(f'Chunk warmup for job #{db_job_id} finished: {prepared_count} chunks prepared')
+
+
+class _ChunkPrefetcher:
+    """
+    Prepares chunks in background threads of the current process.
+    The number of scheduled and running preparations is limited,
+    the extra requests are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Set[Hashable] = set()
+
+    def schedule(self, key: Hashable, prepare: Callable[[], None]) -> bool:
+        with self._lock:
+            if key in self._in_flight:
+                return False
+
+            if len(self._in_flight) >= settings.MEDIA_CACHE_PREFETCH_MAX_IN_FLIGHT:
+                return False
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.MEDIA_CACHE_PREFETCH_THREADS,
+                    thread_name_prefix='chunk_prefetch',
+                )
+
+            self._in_flight.add(key)
+
+        self._executor.submit(self._run, key, prepare)
+        return True
+
+    def _run(self, key: Hashable, prepare: Callable[[], None]) -> None:
+        try:
+            prepare()
+        except Exception: # pylint: disable=broad-except
+            slogger.glob.warning(f'Failed to prefetch chunk {key}', exc_info=True)
+        finally:
+            # DB connections are thread-local, they must be closed explicitly
+            connections.close_all()
+
+            with self._lock:
+                self._in_flight.discard(key)
+
+_prefetcher = _ChunkPrefetcher()
+
+def _prefetch_task_chunk(db_data_id: int, chunk_number: int, quality, dimension) -> None:
+    try:
+        db_data = Data.objects.get(id=db_data_id)
+    except Data.DoesNotExist:
+        return
+
+    MediaCache(dimension).warm_up_task_chunk(chunk_number, quality, db_data)
+
+def _prefetch_selective_job_chunk(db_job_id: int, chunk_number: int, quality) -> None:
+    try:
+        db_job = Job.objects.select_related('segment__task__data').get(id=db_job_id)
+    except Job.DoesNotExist:
+        return
+
+    MediaCache().warm_up_selective_job_chunk(chunk_number, quality, db_job)
+
+def schedule_next_chunks_prefetch(
+    chunk_number: int,
+    quality,
+    *,
+    db_data: Data,
+    stop_chunk: int,
+    dimension=DimensionType.DIM_2D,
+    db_job: Optional[Job] = None,
+) -> None:
+    """
+    Schedules preparation of the chunks following the served one, up to the stop_chunk.
+    The job must be specified for the jobs with specific frames, as they have own chunks.
+    """
+
+    if not settings.MEDIA_CACHE_PREFETCH_CHUNKS or not _is_data_cached(db_data):
+        return
+
+    last_chunk = min(chunk_number + settings.MEDIA_CACHE_PREFETCH_CHUNKS, stop_chunk)
+    for next_chunk_number in range(chunk_number + 1, last_chunk + 1):
+        if db_job is not None:
+            key = ('job', db_job.id, next_chunk_number, quality)
+            prepare = functools.partial(
+                _prefetch_selective_job_chunk, db_job.id, next_chunk_number, quality
+            )
+        else:
+            key = ('data', db_data.id, next_chunk_number, quality)
+            prepare = functools.partial(
+                _prefetch_task_chunk, db_data.id, next_chunk_number, quality, dimension
+            )
+
+        _prefetcher.schedule(key, prepare)
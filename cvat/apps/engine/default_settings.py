@@ -0,0 +1,107 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+
+from attr.converters import to_bool
+
+MEDIA_CACHE_SINGLE_FLIGHT = to_bool(os.getenv("CVAT_MEDIA_CACHE_SINGLE_FLIGHT", True))
+"""
+Coordinate media cache item preparation between processes, so that only one requester
+prepares a missing item and the others wait for the result
+"""
+
+MEDIA_CACHE_LOCK_TTL = int(os.getenv("CVAT_MEDIA_CACHE_LOCK_TTL", 5 * 60))
+"Lifetime of a media cache item preparation lock, in seconds"
+
+MEDIA_CACHE_LOCK_WAIT_TIMEOUT = int(os.getenv("CVAT_MEDIA_CACHE_LOCK_WAIT_TIMEOUT", 60))
+"""
+How long a requester waits for a media cache item prepared by another process, in seconds.
+When the timeout expires, the item is prepared by the waiting requester itself
+"""
+
+MEDIA_CACHE_WARMUP = to_bool(os.getenv("CVAT_MEDIA_CACHE_WARMUP", True))
+"""
+Prepare media cache chunks in the background for newly created tasks and newly assigned jobs.
+The number of chunks prepared simultaneously on a node is limited
+by the number of the chunks worker processes on the node
+"""
+
+MEDIA_CACHE_WARMUP_FAILED_TTL = int(os.getenv("CVAT_MEDIA_CACHE_WARMUP_FAILED_TTL", 60 * 60 * 24))
+"How long the failed chunk warmup jobs are kept, in seconds"
+
+MEDIA_CACHE_PREFETCH_CHUNKS = int(os.getenv("CVAT_MEDIA_CACHE_PREFETCH_CHUNKS", 2))
+"""
+The number of chunks following a served chunk, which are prepared in the background
+in anticipation of further requests. 0 disables the prefetching
+"""
+
+MEDIA_CACHE_PREFETCH_MAX_IN_FLIGHT = int(os.getenv("CVAT_MEDIA_CACHE_PREFETCH_MAX_IN_FLIGHT", 4))
+"The maximum number of scheduled and running chunk prefetches in a server process"
+
+MEDIA_CACHE_PREFETCH_THREADS = int(os.getenv("CVAT_MEDIA_CACHE_PREFETCH_THREADS", 1))
+"The number of threads preparing the prefetched chunks in a server process"
+
+MEDIA_CACHE_MEMORY_TIER_SIZE = int(os.getenv("CVAT_MEDIA_CACHE_MEMORY_TIER_SIZE", 64 * 2**20))
+"""
+The size of the in-process media cache tier for previews and context images, in bytes.
+0 disables the tier
+"""
+
+MEDIA_CACHE_DISK_TIER_SIZE = int(os.getenv("CVAT_MEDIA_CACHE_DISK_TIER_SIZE", 10 * 2**30))
+"""
+The size of the node-local disk media cache tier for chunks, in bytes.
+0 disables the tier
+"""
+
+MEDIA_CACHE_DISK_TIER_ROOT = os.getenv(
+    "CVAT_MEDIA_CACHE_DISK_TIER_ROOT", os.path.join(tempfile.gettempdir(), "cvat_media_cache")
+)
+"""
+The directory of the disk media cache tier. It must be on a node-local disk,
+not on a volume shared by the server nodes, such as the CVAT data volume
+"""
+
+MEDIA_CACHE_DISK_TIER_RESCAN_INTERVAL = int(
+    os.getenv("CVAT_MEDIA_CACHE_DISK_TIER_RESCAN_INTERVAL", 60)
+)
+"""
+How often a server process rescans the disk media cache tier directories, in seconds.
+Between the rescans, the process only accounts for the items written by itself
+"""
+
+MEDIA_CACHE_TASK_QUOTA = int(os.getenv("CVAT_MEDIA_CACHE_TASK_QUOTA", 2 * 2**30))
+"The maximum size of the disk media cache tier items of a single task, in bytes. 0 means no limit"
+
+MEDIA_CACHE_ORG_QUOTA = int(os.getenv("CVAT_MEDIA_CACHE_ORG_QUOTA", 0))
+"""
+The maximum size of the disk media cache tier items of a single organization, in bytes.
+0 means no limit
+"""
+
+MEDIA_CACHE_STATS_FLUSH_INTERVAL = int(os.getenv("CVAT_MEDIA_CACHE_STATS_FLUSH_INTERVAL", 10))
+"How often the media cache tier stats of a process are added to the shared stats, in seconds"
+
+MEDIA_CACHE_CHECKSUM_VERIFICATION_RATE = float(
+    os.getenv("CVAT_MEDIA_CACHE_CHECKSUM_VERIFICATION_RATE", 0.01)
+)
+"""
+The fraction of media cache reads, for which the item checksum is verified.
+The checksum is always computed when an item is written
+"""
+
+TASK_CREATION_IMAGE_BATCH_SIZE = int(os.getenv("CVAT_TASK_CREATION_IMAGE_BATCH_SIZE", 1000))
+"""
+The number of task images written to the DB at once during task creation.
+The images are saved while the task chunks are prepared
+"""
+
+MEDIA_VIDEO_DECODER_POOL_SIZE = int(os.getenv("CVAT_MEDIA_VIDEO_DECODER_POOL_SIZE", 4))
+"""
+The number of open video decoders kept in each server process for reuse.
+A pooled decoder continues decoding from its last position instead of seeking
+to a key frame, which speeds up reading of consecutive frames and chunks.
+0 disables the pool
+"""
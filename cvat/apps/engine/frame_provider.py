@@ -4,19 +4,22 @@
 # SPDX-License-Identifier: MIT
 
 import math
+from contextlib import closing
 from enum import Enum
 from io import BytesIO
 import os
 
 import cv2
 import numpy as np
+from django.conf import settings
 from PIL import Image, ImageOps
 
 from cvat.apps.engine.cache import MediaCache
-from cvat.apps.engine.media_extractors import VideoReader, ZipReader
+from cvat.apps.engine.media_extractors import VideoReader, ZipReader, read_video_frames
 from cvat.apps.engine.mime_types import mimetypes
-from cvat.apps.engine.models import DataChoice, StorageMethodChoice, DimensionType
+from cvat.apps.engine.models import DataChoice, StorageChoice, StorageMethodChoice, DimensionType
 from rest_framework.exceptions import ValidationError
+from utils.dataset_manifest import VideoManifestManager
 
 class RandomAccessIterator:
     def __init__(self, iterable):
@@ -93,17 +96,29 @@ class FrameProvider:
             self.quality = quality
             self.db_data = db_data
 
+            self.chunk_data = None
+
         def load(self, chunk_id):
             if self.chunk_id != chunk_id:
+                self.unload()
+
                 self.chunk_id = chunk_id
-                self.chunk_reader = RandomAccessIterator(
-                    self.reader_class([self.get_chunk_path(chunk_id, self.quality, self.db_data)[0]]))
+                # The chunk can be a file from the disk cache tier, it must be closed on unload
+                self.chunk_data = self.get_chunk_path(chunk_id, self.quality, self.db_data)[0]
+                self.chunk_reader = RandomAccessIterator(self.reader_class([self.chunk_data]))
             return self.chunk_reader
 
+        def unload(self):
+            super().unload()
+            if self.chunk_data is not None:
+                self.chunk_data.close()
+                self.chunk_data = None
+
     def __init__(self, db_data, dimension=DimensionType.DIM_2D):
         self._db_data = db_data
         self._dimension = dimension
         self._loaders = {}
+        self._video_manifest = None
 
         reader_class = {
             DataChoice.IMAGESET: ZipReader,
@@ -207,9 +222,41 @@ class FrameProvider:
             return self._loaders[quality].get_chunk_path(chunk_number, quality, self._db_data)
         return self._loaders[quality].get_chunk_path(chunk_number)
 
+    def _can_read_source_video(self, quality):
+        # The original chunks of cached videos are made from the source video frames,
+        # the frames can be decoded directly without the whole chunk
+        return (
+            quality == self.Quality.ORIGINAL and
+            self._db_data.storage_method == StorageMethodChoice.CACHE and
+            self._db_data.storage in (StorageChoice.LOCAL, StorageChoice.SHARE) and
+            hasattr(self._db_data, 'video')
+        )
+
+    def _read_source_video_frame(self, frame_number):
+        if self._video_manifest is None:
+            manifest = VideoManifestManager(self._db_data.get_manifest_path())
+            manifest.init_index()
+            self._video_manifest = manifest
+
+        upload_dir = {
+            StorageChoice.LOCAL: self._db_data.get_upload_dirname(),
+            StorageChoice.SHARE: settings.SHARE_ROOT,
+        }[self._db_data.storage]
+        source_path = os.path.join(upload_dir, self._db_data.video.path)
+        source_frame_number = self._db_data.start_frame + frame_number * self._db_data.get_frame_step()
+
+        with closing(read_video_frames(
+            source_path, self._video_manifest, [source_frame_number]
+        )) as frames:
+            return next(frames)
+
     def get_frame(self, frame_number, quality=Quality.ORIGINAL,
             out_type=Type.BUFFER):
-        _, chunk_number, frame_offset = self._validate_frame_number(frame_number)
+        frame_number, chunk_number, frame_offset = self._validate_frame_number(frame_number)
+        if self._can_read_source_video(quality):
+            frame = self._read_source_video_frame(frame_number)
+            return (self._convert_frame(frame, VideoReader, out_type), self.VIDEO_FRAME_MIME)
+
         loader = self._loaders[quality]
         chunk_reader = loader.load(chunk_number)
         frame, frame_name, _ = chunk_reader[frame_offset]
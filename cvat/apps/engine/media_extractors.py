@@ -11,10 +11,12 @@ import zipfile
 import io
 import itertools
 import struct
+import threading
+from collections import OrderedDict
 from enum import IntEnum
 from abc import ABC, abstractmethod
-from contextlib import closing
-from typing import Iterable
+from contextlib import closing, contextmanager
+from typing import Iterable, Iterator, Optional
 
 import av
 import numpy as np
@@ -22,6 +24,7 @@ from natsort import os_sorted
 from pyunpack import Archive
 from PIL import Image, ImageFile, ImageOps
 from random import shuffle
+from django.conf import settings
 from cvat.apps.engine.utils import rotate_image
 from cvat.apps.engine.models import DimensionType, SortingMethod
 from rest_framework.exceptions import ValidationError
@@ -447,7 +450,7 @@ class VideoReader(IMediaReader):
         return pos / duration if duration else None
 
     def _get_av_container(self):
-        if isinstance(self._source_path[0], io.BytesIO):
+        if isinstance(self._source_path[0], io.IOBase) and self._source_path[0].seekable():
             self._source_path[0].seek(0) # required for re-reading
         return av.open(self._source_path[0])
 
@@ -530,6 +533,177 @@ class ImageDatasetManifestReader(FragmentMediaReader):
         for idx in self._frame_range:
             yield self._manifest[idx]
 
+def find_nearest_left_key_frame(manifest: VideoManifestManager, frame_number: int) -> tuple[int, int]:
+    """
+    Returns the number and the timestamp of the closest key frame
+    at or before the frame number, using the video manifest
+    """
+
+    if frame_number >= manifest[len(manifest) - 1].get('number'):
+        left_border = len(manifest) - 1
+    else:
+        left_border = 0
+        delta = len(manifest)
+        while delta:
+            step = delta // 2
+            cur_position = left_border + step
+            if manifest[cur_position].get('number') < frame_number:
+                cur_position += 1
+                left_border = cur_position
+                delta -= step + 1
+            else:
+                delta = step
+        if manifest[cur_position].get('number') > frame_number:
+            left_border -= 1
+    frame_number = manifest[left_border].get('number')
+    timestamp = manifest[left_border].get('pts')
+    return frame_number, timestamp
+
+class VideoDecoder:
+    """
+    An open video file, which keeps its decoding position between reads.
+    Frames after the current position are read without seeking.
+    """
+
+    def __init__(self, source_path: str):
+        self.source_path = source_path
+        self._container = av.open(source_path, mode='r')
+        self._stream = next(stream for stream in self._container.streams if stream.type == 'video')
+        self._stream.thread_type = 'AUTO'
+        self._rotation = int(self._stream.metadata.get('rotate') or 0)
+        self._frames: Optional[Iterator[av.VideoFrame]] = None
+        self._next_frame_number: Optional[int] = None
+
+    def _decode(self) -> Iterator[av.VideoFrame]:
+        for packet in self._container.demux(self._stream):
+            yield from packet.decode()
+
+    def can_read_without_seek(self, frame_number: int, key_frame_number: int) -> bool:
+        # Decoding from the current position is not longer than from the key frame
+        return (
+            self._next_frame_number is not None and
+            key_frame_number <= self._next_frame_number <= frame_number
+        )
+
+    def read(self, frame_number: int, *, key_frame_number: int, key_frame_pts: int) -> av.VideoFrame:
+        """
+        Decodes the frame. The key frame must be the closest one at or before the frame.
+        """
+
+        if not self.can_read_without_seek(frame_number, key_frame_number):
+            self._container.seek(offset=key_frame_pts, stream=self._stream)
+            self._frames = self._decode()
+            self._next_frame_number = key_frame_number
+
+        for frame in self._frames:
+            current_frame_number = self._next_frame_number
+            self._next_frame_number += 1
+
+            if current_frame_number == frame_number:
+                if self._rotation:
+                    frame = av.VideoFrame().from_ndarray(
+                        rotate_image(frame.to_ndarray(format='bgr24'), 360 - self._rotation),
+                        format ='bgr24'
+                    )
+                return frame
+
+        self._next_frame_number = None
+        raise ValueError(f'Frame {frame_number} is not found in the video')
+
+    @property
+    def next_frame_number(self) -> Optional[int]:
+        return self._next_frame_number
+
+    def close(self):
+        self._frames = None
+        self._next_frame_number = None
+        self._container.close()
+
+class VideoDecoderPool:
+    """
+    Keeps a limited number of open video decoders for reuse between requests.
+    A decoder is used by one reader at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._decoders: OrderedDict[int, VideoDecoder] = OrderedDict()
+
+    def _take(self, source_path: str, frame_number: int, key_frame_number: int) -> Optional[VideoDecoder]:
+        with self._lock:
+            candidates = [
+                (decoder_id, decoder) for decoder_id, decoder in self._decoders.items()
+                if decoder.source_path == source_path
+            ]
+
+            if not candidates:
+                return None
+
+            decoder_id, _ = max(candidates, key=lambda c: (
+                c[1].can_read_without_seek(frame_number, key_frame_number),
+                c[1].next_frame_number or 0,
+            ))
+            return self._decoders.pop(decoder_id)
+
+    def _put(self, decoder: VideoDecoder):
+        evicted = []
+        with self._lock:
+            self._decoders[id(decoder)] = decoder
+            while len(self._decoders) > settings.MEDIA_VIDEO_DECODER_POOL_SIZE:
+                evicted.append(self._decoders.popitem(last=False)[1])
+
+        for decoder in evicted:
+            decoder.close()
+
+    @contextmanager
+    def get_decoder(self, source_path: str, frame_number: int, key_frame_number: int):
+        """
+        Returns a decoder for the video, preferably one positioned close to the frame
+        """
+
+        decoder = self._take(source_path, frame_number, key_frame_number)
+        if decoder is None:
+            decoder = VideoDecoder(source_path)
+
+        try:
+            yield decoder
+        except GeneratorExit:
+            # The reading was stopped by the caller, the decoder position is still valid
+            self._put(decoder)
+            raise
+        except BaseException:
+            decoder.close()
+            raise
+
+        self._put(decoder)
+
+video_decoder_pool = VideoDecoderPool()
+
+def read_video_frames(
+    source_path: str, manifest: VideoManifestManager, frame_numbers: Iterable[int]
+) -> Iterator[av.VideoFrame]:
+    """
+    Decodes the requested video frames, which must be sorted.
+    Decoding starts from the closest key frame or continues
+    with a pooled decoder, which has stopped before the requested frame.
+    """
+
+    frame_numbers = iter(frame_numbers)
+    first_frame_number = next(frame_numbers, None)
+    if first_frame_number is None:
+        return
+
+    key_frame_number, key_frame_pts = find_nearest_left_key_frame(manifest, first_frame_number)
+    with video_decoder_pool.get_decoder(
+        source_path, first_frame_number, key_frame_number
+    ) as decoder:
+        for frame_number in itertools.chain([first_frame_number], frame_numbers):
+            if not decoder.can_read_without_seek(frame_number, key_frame_number):
+                key_frame_number, key_frame_pts = find_nearest_left_key_frame(manifest, frame_number)
+
+            yield decoder.read(frame_number,
+                key_frame_number=key_frame_number, key_frame_pts=key_frame_pts)
+
 class VideoDatasetManifestReader(FragmentMediaReader):
     def __init__(self, manifest_path, **kwargs):
         self.source_path = kwargs.pop('source_path')
@@ -537,54 +711,8 @@ class VideoDatasetManifestReader(FragmentMediaReader):
         self._manifest = VideoManifestManager(manifest_path)
         self._manifest.init_index()
 
-    def _get_nearest_left_key_frame(self):
-        if self._start_chunk_frame_number >= \
-                self._manifest[len(self._manifest) - 1].get('number'):
-            left_border = len(self._manifest) - 1
-        else:
-            left_border = 0
-            delta = len(self._manifest)
-            while delta:
-                step = delta // 2
-                cur_position = left_border + step
-                if self._manifest[cur_position].get('number') < self._start_chunk_frame_number:
-                    cur_position += 1
-                    left_border = cur_position
-                    delta -= step + 1
-                else:
-                    delta = step
-            if self._manifest[cur_position].get('number') > self._start_chunk_frame_number:
-                left_border -= 1
-        frame_number = self._manifest[left_border].get('number')
-        timestamp = self._manifest[left_border].get('pts')
-        return frame_number, timestamp
-
     def __iter__(self):
-        start_decode_frame_number, start_decode_timestamp = self._get_nearest_left_key_frame()
-        with closing(av.open(self.source_path, mode='r')) as container:
-            video_stream = next(stream for stream in container.streams if stream.type == 'video')
-            video_stream.thread_type = 'AUTO'
-
-            container.seek(offset=start_decode_timestamp, stream=video_stream)
-
-            frame_number = start_decode_frame_number - 1
-            for packet in container.demux(video_stream):
-                for frame in packet.decode():
-                    frame_number += 1
-                    if frame_number in self._frame_range:
-                        if video_stream.metadata.get('rotate'):
-                            frame = av.VideoFrame().from_ndarray(
-                                rotate_image(
-                                    frame.to_ndarray(format='bgr24'),
-                                    360 - int(container.streams.video[0].metadata.get('rotate'))
-                                ),
-                                format ='bgr24'
-                            )
-                        yield frame
-                    elif frame_number < self._frame_range[-1]:
-                        continue
-                    else:
-                        return
+        yield from read_video_frames(self.source_path, self._manifest, self._frame_range)
 
 class IChunkWriter(ABC):
     def __init__(self, quality, dimension=DimensionType.DIM_2D):
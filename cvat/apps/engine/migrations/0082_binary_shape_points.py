@@ -0,0 +1,89 @@
+from django.db import migrations
+
+import cvat.apps.engine.models
+
+SHAPE_MODELS = ('LabeledShape', 'TrackedShape')
+
+# Packs the comma-separated values into big-endian float64 values,
+# the same way as BinaryFloatArrayField does
+POSTGRES_CONVERSION_QUERY = """
+    UPDATE {table} SET points_binary = COALESCE((
+        SELECT string_agg(float8send(value::float8), ''::bytea ORDER BY position)
+        FROM unnest(string_to_array(btrim(points, '[] '), ',')) WITH ORDINALITY AS t(value, position)
+        WHERE btrim(value) <> ''
+    ), ''::bytea)
+"""
+
+def copy_points(apps, *, source_field, target_field):
+    for model_name in SHAPE_MODELS:
+        model = apps.get_model('engine', model_name)
+
+        batch = []
+        for shape in model.objects.only('id', source_field).order_by('id').iterator(chunk_size=1000):
+            setattr(shape, target_field, getattr(shape, source_field))
+            batch.append(shape)
+
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, fields=[target_field])
+                batch = []
+
+        if batch:
+            model.objects.bulk_update(batch, fields=[target_field])
+
+def convert_points_to_binary(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # Much faster than reading and writing all the rows in Python
+        for model_name in SHAPE_MODELS:
+            model = apps.get_model('engine', model_name)
+            schema_editor.execute(
+                POSTGRES_CONVERSION_QUERY.format(
+                    table=schema_editor.quote_name(model._meta.db_table)
+                )
+            )
+    else:
+        copy_points(apps, source_field='points', target_field='points_binary')
+
+def convert_points_to_text(apps, schema_editor):
+    copy_points(apps, source_field='points_binary', target_field='points')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0081_job_assignee_updated_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labeledshape',
+            name='points_binary',
+            field=cvat.apps.engine.models.BinaryFloatArrayField(default=[]),
+        ),
+        migrations.AddField(
+            model_name='trackedshape',
+            name='points_binary',
+            field=cvat.apps.engine.models.BinaryFloatArrayField(default=[]),
+        ),
+        migrations.RunPython(
+            code=convert_points_to_binary,
+            reverse_code=convert_points_to_text,
+        ),
+        migrations.RemoveField(
+            model_name='labeledshape',
+            name='points',
+        ),
+        migrations.RemoveField(
+            model_name='trackedshape',
+            name='points',
+        ),
+        migrations.RenameField(
+            model_name='labeledshape',
+            old_name='points_binary',
+            new_name='points',
+        ),
+        migrations.RenameField(
+            model_name='trackedshape',
+            old_name='points_binary',
+            new_name='points',
+        ),
+    ]
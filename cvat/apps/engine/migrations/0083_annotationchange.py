@@ -0,0 +1,50 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("engine", "0082_binary_shape_points"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnnotationChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("version", models.PositiveIntegerField()),
+                (
+                    "object_type",
+                    models.CharField(
+                        choices=[("tag", "TAG"), ("shape", "SHAPE"), ("track", "TRACK")],
+                        max_length=16,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("create", "CREATE"), ("update", "UPDATE"), ("delete", "DELETE")],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="annotation_changes",
+                        related_query_name="annotation_change",
+                        to="engine.job",
+                    ),
+                ),
+            ],
+            options={
+                "default_permissions": (),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="annotationchange",
+            index=models.Index(fields=["job", "version"], name="engine_anno_job_id_63aeba_idx"),
+        ),
+    ]
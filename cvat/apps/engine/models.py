@@ -13,6 +13,7 @@ from enum import Enum
 from functools import cached_property
 from typing import Any, Dict, Optional, Sequence
 
+import numpy as np
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files.storage import FileSystemStorage
@@ -216,6 +217,44 @@ class FloatArrayField(AbstractArrayField):
 class IntArrayField(AbstractArrayField):
     converter = int
 
+class BinaryFloatArrayField(models.BinaryField):
+    """
+    Stores a list of floats as packed big-endian float64 values.
+    Unlike FloatArrayField, reading the values doesn't require string parsing.
+    The serialized representation (e.g. in dumpdata) is the same as for FloatArrayField.
+    """
+
+    dtype = np.dtype('>f8')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **{'editable': True, **kwargs})
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop('editable', None)
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if not value:
+            return []
+        return np.frombuffer(value, dtype=self.dtype).tolist()
+
+    def to_python(self, value):
+        if isinstance(value, list):
+            return value
+        elif isinstance(value, str):
+            return FloatArrayField().to_python(value)
+
+        return self.from_db_value(value, None, None)
+
+    def get_prep_value(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return value
+        return np.asarray(value, dtype=self.dtype).tobytes()
+
+    def value_to_string(self, obj):
+        return str(self.value_from_object(obj))
+
 class Data(models.Model):
     chunk_size = models.PositiveIntegerField(null=True)
     size = models.PositiveIntegerField(default=0)
@@ -284,7 +323,7 @@ class Data(models.Model):
         return os.path.join(self.get_upload_dirname(), 'manifest.jsonl')
 
     def get_index_path(self):
-        return os.path.join(self.get_upload_dirname(), 'index.json')
+        return os.path.join(self.get_upload_dirname(), 'index.bin')
 
     def make_dirs(self):
         data_path = self.get_data_dirname()
@@ -928,7 +967,7 @@ class Shape(models.Model):
     occluded = models.BooleanField(default=False)
     outside = models.BooleanField(default=False)
     z_order = models.IntegerField(default=0)
-    points = FloatArrayField(default=[])
+    points = BinaryFloatArrayField(default=[])
     rotation = FloatField(default=0)
 
     class Meta:
@@ -966,6 +1005,48 @@ class TrackedShapeAttributeVal(AttributeVal):
     shape = models.ForeignKey(TrackedShape, on_delete=models.CASCADE,
         related_name='attributes', related_query_name='attribute')
 
+class AnnotationObjectType(str, Enum):
+    TAG = 'tag'
+    SHAPE = 'shape'
+    TRACK = 'track'
+
+    @classmethod
+    def choices(cls):
+        return tuple((x.value, x.name) for x in cls)
+
+    def __str__(self):
+        return self.value
+
+class AnnotationChangeAction(str, Enum):
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+
+    @classmethod
+    def choices(cls):
+        return tuple((x.value, x.name) for x in cls)
+
+    def __str__(self):
+        return self.value
+
+class AnnotationChange(models.Model):
+    """
+    A record of a job annotation change log. The changes of skeleton elements
+    and tracked shapes are recorded as the changes of the top-level objects.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE,
+        related_name='annotation_changes', related_query_name='annotation_change')
+    version = models.PositiveIntegerField()
+    object_type = models.CharField(max_length=16, choices=AnnotationObjectType.choices())
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=16, choices=AnnotationChangeAction.choices())
+
+    class Meta:
+        default_permissions = ()
+        indexes = [models.Index(fields=['job', 'version'])]
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     rating = models.FloatField(default=0.0)
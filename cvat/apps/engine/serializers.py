@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+import functools
 import warnings
 from copy import copy
 from inspect import isclass
@@ -29,6 +30,7 @@ from django.utils import timezone
 from cvat.apps.dataset_manager.formats.utils import get_label_color
 from cvat.apps.engine.utils import parse_exception_message
 from cvat.apps.engine import models
+from cvat.apps.engine.cache_warmup import enqueue_job_chunks_warmup
 from cvat.apps.engine.cloud_provider import get_cloud_storage_instance, Credentials, Status
 from cvat.apps.engine.log import ServerLogManager
 from cvat.apps.engine.permissions import TaskPermission
@@ -784,6 +786,11 @@ class JobWriteSerializer(WriteOnceMixin, serializers.ModelSerializer):
             validated_data["assignee_updated_date"] = timezone.now()
 
         instance = super().update(instance, validated_data)
+
+        if validated_data.get("assignee_id"):
+            # Prepare the job data before the assignee opens the job
+            transaction.on_commit(functools.partial(enqueue_job_chunks_warmup, instance))
+
         return instance
 
 class SimpleJobSerializer(serializers.ModelSerializer):
@@ -10,6 +10,7 @@ from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from .cache_warmup import cancel_job_chunks_warmup
 from .models import CloudStorage, Data, Job, Profile, Project, StatusChoice, Task, Asset
 
 
@@ -76,6 +77,7 @@ def __delete_task_handler(instance, **kwargs):
 def __delete_job_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_dirname(), ignore_errors=True))
+    transaction.on_commit(functools.partial(cancel_job_chunks_warmup, instance.id))
 
 @receiver(post_delete, sender=Data,
     dispatch_uid=__name__ + ".delete_data_handler")
@@ -5,6 +5,7 @@
 
 import itertools
 import fnmatch
+import multiprocessing
 import os
 from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union, Iterable
 from rest_framework.serializers import ValidationError
@@ -13,8 +14,10 @@ import re
 import shutil
 from urllib import parse as urlparse
 from urllib import request as urlrequest
+import django
 import django_rq
 import concurrent.futures
+import functools
 import queue
 
 from django.conf import settings
@@ -24,8 +27,9 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from cvat.apps.engine import models
+from cvat.apps.engine.cache_warmup import enqueue_task_chunks_warmup, is_warmup_applicable
 from cvat.apps.engine.log import ServerLogManager
-from cvat.apps.engine.media_extractors import (MEDIA_TYPES, ImageListReader, Mpeg4ChunkWriter, Mpeg4CompressedChunkWriter,
+from cvat.apps.engine.media_extractors import (MEDIA_TYPES, IChunkWriter, ImageListReader, Mpeg4ChunkWriter, Mpeg4CompressedChunkWriter,
     ValidateDimension, ZipChunkWriter, ZipCompressedChunkWriter, get_mime, sort)
 from cvat.apps.engine.utils import (
     av_scan_paths,get_rq_job_meta, define_dependent_job, get_rq_lock_by_user, preload_images
@@ -508,6 +512,77 @@ def _create_task_manifest_from_cloud_data(
     )
     manifest.create()
 
+class _ImageSaver:
+    """
+    Saves task images and their related files to the DB in batches,
+    so that the images of big tasks are not kept in memory all together
+    """
+
+    def __init__(self,
+        db_data: models.Data,
+        *,
+        upload_dir: str,
+        related_images: Dict[str, List[str]],
+        batch_size: Optional[int] = None,
+    ):
+        self._db_data = db_data
+        self._upload_dir = upload_dir
+        self._related_images = related_images
+        self._batch_size = batch_size or settings.TASK_CREATION_IMAGE_BATCH_SIZE
+        self._pending_images: List[models.Image] = []
+
+    def add(self, images: Iterable[models.Image]):
+        self._pending_images.extend(images)
+
+        if len(self._pending_images) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending_images:
+            return
+
+        created_images = models.Image.objects.bulk_create(self._pending_images)
+        self._pending_images = []
+
+        if not self._related_images:
+            return
+
+        if any(image.id is None for image in created_images):
+            # some DB backends don't return ids of the inserted rows
+            created_images = models.Image.objects.filter(
+                data_id=self._db_data.id, frame__in=[image.frame for image in created_images]
+            )
+
+        models.RelatedFile.objects.bulk_create(
+            models.RelatedFile(
+                data=self._db_data,
+                primary_image=image,
+                path=os.path.join(self._upload_dir, related_file_path)
+            )
+            for image in created_images
+            for related_file_path in self._related_images.get(image.path, [])
+        )
+
+def _save_chunks_in_process(
+    chunk_data: list[tuple[Any, str, int]],
+    *,
+    original_chunk_writer: IChunkWriter,
+    original_chunk_path: str,
+    compressed_chunk_writer: IChunkWriter,
+    compressed_chunk_path: str,
+    preload: bool,
+) -> list[tuple[str, int, tuple[int, int]]]:
+    if preload:
+        chunk_data = preload_images(chunk_data)
+
+    original_chunk_writer.save_as_chunk(images=chunk_data, chunk_path=original_chunk_path)
+    image_sizes = compressed_chunk_writer.save_as_chunk(
+        images=chunk_data, chunk_path=compressed_chunk_path
+    )
+
+    # (path, frame, size)
+    return list((i[0][1], i[0][2], i[1]) for i in zip(chunk_data, image_sizes))
+
 @transaction.atomic
 def _create_thread(
     db_task: Union[int, models.Task],
@@ -962,7 +1037,7 @@ def _create_thread(
     video_path = ""
     video_size = (0, 0)
 
-    db_images = []
+    image_saver = _ImageSaver(db_data, upload_dir=upload_dir, related_images=related_images)
 
     if settings.USE_CACHE and db_data.storage_method == models.StorageMethodChoice.CACHE:
         for media_type, media_files in media.items():
@@ -1042,30 +1117,32 @@ def _create_thread(
                 counter = itertools.count()
                 for _, chunk_frames in itertools.groupby(extractor.frame_range, lambda x: next(counter) // db_data.chunk_size):
                     chunk_paths = [(extractor.get_path(i), i) for i in chunk_frames]
+                    manifest_indices = [manifest_index(frame_id) for _, frame_id in chunk_paths]
                     img_sizes = []
 
-                    for chunk_path, frame_id in chunk_paths:
-                        properties = manifest[manifest_index(frame_id)]
-
+                    for (chunk_path, frame_id), full_name, (width, height) in zip(
+                        chunk_paths,
+                        manifest.get_image_full_names(manifest_indices),
+                        manifest.get_image_sizes(manifest_indices).tolist(),
+                    ):
                         # check mapping
-                        if not chunk_path.endswith(f"{properties['name']}{properties['extension']}"):
+                        if not chunk_path.endswith(full_name):
                             raise Exception('Incorrect file mapping to manifest content')
 
                         if db_task.dimension == models.DimensionType.DIM_2D and (
-                            properties.get('width') is not None and
-                            properties.get('height') is not None
+                            width >= 0 and height >= 0
                         ):
-                            resolution = (properties['width'], properties['height'])
+                            resolution = (width, height)
                         elif is_data_in_cloud:
                             raise Exception(
                                 "Can't find image '{}' width or height info in the manifest"
-                                .format(f"{properties['name']}{properties['extension']}")
+                                .format(full_name)
                             )
                         else:
                             resolution = extractor.get_image_size(frame_id)
                         img_sizes.append(resolution)
 
-                    db_images.extend([
+                    image_saver.add([
                         models.Image(data=db_data,
                             path=os.path.relpath(path, upload_dir),
                             frame=frame, width=w, height=h)
@@ -1076,18 +1153,22 @@ def _create_thread(
         generator = itertools.groupby(extractor, lambda _: next(counter) // db_data.chunk_size)
         generator = ((idx, list(chunk_data)) for idx, chunk_data in generator)
 
+        need_image_preloading = (
+            db_task.dimension == models.DimensionType.DIM_2D and
+            isinstance(extractor, (
+                MEDIA_TYPES['image']['extractor'],
+                MEDIA_TYPES['zip']['extractor'],
+                MEDIA_TYPES['pdf']['extractor'],
+                MEDIA_TYPES['archive']['extractor'],
+            ))
+        )
+
         def save_chunks(
                 executor: concurrent.futures.ThreadPoolExecutor,
                 chunk_idx: int,
                 chunk_data: Iterable[tuple[str, str, str]]) -> list[tuple[str, int, tuple[int, int]]]:
             nonlocal db_data, db_task, extractor, original_chunk_writer, compressed_chunk_writer
-            if (db_task.dimension == models.DimensionType.DIM_2D and
-                isinstance(extractor, (
-                    MEDIA_TYPES['image']['extractor'],
-                    MEDIA_TYPES['zip']['extractor'],
-                    MEDIA_TYPES['pdf']['extractor'],
-                    MEDIA_TYPES['archive']['extractor'],
-                ))):
+            if need_image_preloading:
                 chunk_data = preload_images(chunk_data)
 
             fs_original = executor.submit(
@@ -1107,10 +1188,10 @@ def _create_thread(
             return list((i[0][1], i[0][2], i[1]) for i in zip(chunk_data, image_sizes))
 
         def process_results(img_meta: list[tuple[str, int, tuple[int, int]]]):
-            nonlocal db_images, db_data, video_path, video_size
+            nonlocal db_data, video_path, video_size
 
             if db_task.mode == 'annotation':
-                db_images.extend(
+                image_saver.add(
                     models.Image(
                         data=db_data,
                         path=os.path.relpath(frame_path, upload_dir),
@@ -1125,28 +1206,52 @@ def _create_thread(
             progress = extractor.get_progress(img_meta[-1][1])
             update_progress(progress)
 
-        futures = queue.Queue(maxsize=settings.CVAT_CONCURRENT_CHUNK_PROCESSING)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2*settings.CVAT_CONCURRENT_CHUNK_PROCESSING) as executor:
+        chunk_processes = settings.CVAT_CHUNK_PROCESSING_PROCESSES
+        if chunk_processes < 0:
+            chunk_processes = os.cpu_count()
+
+        # Video frames are decoded sequentially from a single container,
+        # they can't be passed to other processes
+        if chunk_processes and db_task.mode == 'annotation':
+            concurrent_chunks = chunk_processes
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=chunk_processes,
+                # The task is created in a DB transaction, so its connection can't be closed,
+                # and it must not be inherited by forked processes.
+                # The processes are started by a clean server process instead.
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=django.setup,
+            )
+
+            def submit_chunk(chunk_idx: int, chunk_data: list):
+                return executor.submit(_save_chunks_in_process, chunk_data,
+                    original_chunk_writer=original_chunk_writer,
+                    original_chunk_path=db_data.get_original_chunk_path(chunk_idx),
+                    compressed_chunk_writer=compressed_chunk_writer,
+                    compressed_chunk_path=db_data.get_compressed_chunk_path(chunk_idx),
+                    preload=need_image_preloading,
+                )
+        else:
+            concurrent_chunks = settings.CVAT_CONCURRENT_CHUNK_PROCESSING
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=2*concurrent_chunks)
+
+            def submit_chunk(chunk_idx: int, chunk_data: list):
+                return executor.submit(save_chunks, executor, chunk_idx, chunk_data)
+
+        # The results are processed in the order of chunks
+        futures = queue.Queue(maxsize=concurrent_chunks)
+        with executor:
             for chunk_idx, chunk_data in generator:
                 db_data.size += len(chunk_data)
                 if futures.full():
                     process_results(futures.get().result())
-                futures.put(executor.submit(save_chunks, executor, chunk_idx, chunk_data))
+                futures.put(submit_chunk(chunk_idx, chunk_data))
 
             while not futures.empty():
                 process_results(futures.get().result())
 
     if db_task.mode == 'annotation':
-        models.Image.objects.bulk_create(db_images)
-        created_images = models.Image.objects.filter(data_id=db_data.id)
-
-        db_related_files = [
-            models.RelatedFile(data=image.data, primary_image=image, path=os.path.join(upload_dir, related_file_path))
-            for image in created_images
-            for related_file_path in related_images.get(image.path, [])
-        ]
-        models.RelatedFile.objects.bulk_create(db_related_files)
-        db_images = []
+        image_saver.flush()
     else:
         models.Video.objects.create(
             data=db_data,
@@ -1162,3 +1267,6 @@ def _create_thread(
 
     slogger.glob.info("Found frames {} for Data #{}".format(db_data.size, db_data.id))
     _save_task_to_db(db_task, job_file_mapping=job_file_mapping)
+
+    if is_warmup_applicable(db_data):
+        transaction.on_commit(functools.partial(enqueue_task_chunks_warmup, db_task.id))
@@ -0,0 +1,181 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TransactionTestCase
+
+from cvat.apps.engine.models import BinaryFloatArrayField, FloatArrayField, LabeledShape
+
+
+class BinaryFloatArrayFieldTest(SimpleTestCase):
+    def setUp(self):
+        self.field = BinaryFloatArrayField()
+
+    def _round_trip(self, value):
+        return self.field.from_db_value(self.field.get_prep_value(value), None, connection)
+
+    def test_can_store_empty_list(self):
+        self.assertEqual(b'', self.field.get_prep_value([]))
+        self.assertEqual([], self.field.from_db_value(b'', None, connection))
+        self.assertEqual([], self.field.from_db_value(None, None, connection))
+
+    def test_can_store_values_exactly(self):
+        values = [1.5, -2.0, 3e-05, -1e+300, 0.1, 0.0]
+
+        self.assertEqual(values, self._round_trip(values))
+        self.assertEqual(8 * len(values), len(self.field.get_prep_value(values)))
+
+    def test_stores_big_endian_float64(self):
+        self.assertEqual(
+            np.array([1.5, -2.0], dtype='>f8').tobytes(), self.field.get_prep_value([1.5, -2.0])
+        )
+
+    def test_can_parse_str(self):
+        self.assertEqual([1.5, -2.0, 3e-05], self.field.to_python('1.5,-2,3e-05'))
+        self.assertEqual([10.0, 20.25, -1000.0], self.field.to_python('[10, 20.25, -1E+3]'))
+        self.assertEqual([], self.field.to_python(''))
+
+    def test_can_parse_bytes(self):
+        values = [1.5, -2.0, 3e-05]
+        data = self.field.get_prep_value(values)
+
+        self.assertEqual(values, self.field.to_python(data))
+        self.assertEqual(values, self.field.to_python(memoryview(data)))
+        self.assertIs(data, self.field.get_prep_value(data))
+
+        view = memoryview(data)
+        self.assertIs(view, self.field.get_prep_value(view))
+
+    def test_serializes_values_as_float_array_field(self):
+        values = [1.5, -2.0, 3e-05]
+        shape = LabeledShape(points=values)
+        points_field = LabeledShape._meta.get_field('points')
+
+        serialized_value = points_field.value_to_string(shape)
+
+        self.assertEqual(str(values), serialized_value)
+        self.assertEqual(values, points_field.to_python(serialized_value))
+        self.assertEqual(values, FloatArrayField().to_python(serialized_value))
+
+
+class BinaryShapePointsMigrationTest(TransactionTestCase):
+    _PREVIOUS_MIGRATION = ('engine', '0081_job_assignee_updated_date_and_more')
+    _MIGRATION = ('engine', '0082_binary_shape_points')
+    _SHAPE_MODELS = ('LabeledShape', 'TrackedShape')
+
+    # The points are written as text, the way they were stored before the migration
+    _TEXT_POINTS = ['1.5,-2.0,3e-05,-1000.0', '[10, 20.25, -1E+3]', '0.1', '']
+
+    def setUp(self):
+        super().setUp()
+
+        self.addCleanup(self._migrate_to_latest)
+        apps = self._migrate(self._PREVIOUS_MIGRATION)
+        self.shape_ids = self._create_shapes(apps)
+
+    @staticmethod
+    def _migrate(target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        executor.loader.build_graph()
+        return executor.loader.project_state([target]).apps
+
+    @staticmethod
+    def _migrate_to_latest():
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _create_shapes(self, apps):
+        def get_model(name):
+            return apps.get_model('engine', name)
+
+        db_data = get_model('Data').objects.create()
+        db_task = get_model('Task').objects.create(name='task', mode='annotation', data=db_data)
+        db_segment = get_model('Segment').objects.create(task=db_task, start_frame=0, stop_frame=0)
+        db_job = get_model('Job').objects.create(segment=db_segment)
+        db_label = get_model('Label').objects.create(task=db_task, name='label')
+        db_track = get_model('LabeledTrack').objects.create(job=db_job, label=db_label, frame=0)
+
+        shape_ids = {}
+        for model_name in self._SHAPE_MODELS:
+            model = get_model(model_name)
+            if model_name == 'LabeledShape':
+                parent_fields = {'job': db_job, 'label': db_label}
+            else:
+                parent_fields = {'track': db_track}
+
+            shape_ids[model_name] = []
+            for text_points in self._TEXT_POINTS:
+                db_shape = model.objects.create(
+                    frame=0, type='rectangle', points=[], **parent_fields
+                )
+                self._write_points(model, db_shape.id, text_points)
+                shape_ids[model_name].append(db_shape.id)
+
+        return shape_ids
+
+    @staticmethod
+    def _write_points(model, shape_id, points):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE {} SET points = %s WHERE id = %s'.format(
+                    connection.ops.quote_name(model._meta.db_table)
+                ),
+                [points, shape_id],
+            )
+
+    @staticmethod
+    def _read_points(model, shape_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, points FROM {} WHERE id IN ({})'.format(
+                    connection.ops.quote_name(model._meta.db_table),
+                    ', '.join(['%s'] * len(shape_ids)),
+                ),
+                shape_ids,
+            )
+            points = dict(cursor.fetchall())
+
+        return [points[shape_id] for shape_id in shape_ids]
+
+    def test_can_convert_points(self):
+        apps = self._migrate(self._MIGRATION)
+
+        # The migration uses SQL on PostgreSQL and the model fields on other DBs,
+        # both must give the bytes the model field writes
+        expected_points = [
+            BinaryFloatArrayField().get_prep_value(FloatArrayField().to_python(text_points))
+            for text_points in self._TEXT_POINTS
+        ]
+
+        for model_name in self._SHAPE_MODELS:
+            model = apps.get_model('engine', model_name)
+
+            self.assertEqual(expected_points, [
+                bytes(points) for points in self._read_points(model, self.shape_ids[model_name])
+            ])
+            self.assertEqual(
+                [FloatArrayField().to_python(text_points) for text_points in self._TEXT_POINTS],
+                [
+                    model.objects.get(id=shape_id).points
+                    for shape_id in self.shape_ids[model_name]
+                ],
+            )
+
+    def test_can_revert_conversion(self):
+        self._migrate(self._MIGRATION)
+        apps = self._migrate(self._PREVIOUS_MIGRATION)
+
+        for model_name in self._SHAPE_MODELS:
+            model = apps.get_model('engine', model_name)
+
+            self.assertEqual(
+                [FloatArrayField().to_python(text_points) for text_points in self._TEXT_POINTS],
+                [
+                    FloatArrayField().to_python(text_points)
+                    for text_points in self._read_points(model, self.shape_ids[model_name])
+                ],
+            )
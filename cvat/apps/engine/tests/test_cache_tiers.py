@@ -0,0 +1,189 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import os
+import tempfile
+import zlib
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.engine.cache_tiers import (CacheItem, CacheItemOwner, DiskCacheTier,
+                                          MemoryCacheTier, _select_eviction_candidates)
+
+
+def _make_item(size: int) -> CacheItem:
+    data = os.urandom(size)
+    return CacheItem(io.BytesIO(data), 'application/zip', zlib.crc32(data))
+
+
+class EvictionTest(SimpleTestCase):
+    def test_evicts_big_cold_items_first(self):
+        entries = [
+            ('small_hot', 10, 1000.0),
+            ('big_cold', 1000, 0.0),
+            ('small_cold', 10, 0.0),
+        ]
+
+        self.assertEqual(['big_cold'], _select_eviction_candidates(entries, excess_size=5))
+
+    def test_evicts_enough_items(self):
+        entries = [('a', 10, 0.0), ('b', 10, 1.0), ('c', 10, 2.0)]
+
+        self.assertEqual(['a', 'b'], _select_eviction_candidates(entries, excess_size=15))
+
+
+class MemoryCacheTierTest(SimpleTestCase):
+    @override_settings(MEDIA_CACHE_MEMORY_TIER_SIZE=100)
+    def test_can_get_item(self):
+        tier = MemoryCacheTier()
+        item = _make_item(10)
+
+        tier.set('key', item, owner=CacheItemOwner)
+
+        self.assertTrue(tier.has('key'))
+        self.assertEqual(item.data.getvalue(), tier.get('key').data.getvalue())
+
+    @override_settings(MEDIA_CACHE_MEMORY_TIER_SIZE=100)
+    def test_keeps_size_limit(self):
+        tier = MemoryCacheTier()
+
+        for i in range(5):
+            tier.set(f'key_{i}', _make_item(30), owner=CacheItemOwner)
+
+        self.assertLessEqual(sum(tier.has(f'key_{i}') for i in range(5)), 3)
+        self.assertTrue(tier.has('key_4'))
+
+    @override_settings(MEDIA_CACHE_MEMORY_TIER_SIZE=100)
+    def test_can_clear(self):
+        tier = MemoryCacheTier()
+        tier.set('key', _make_item(10), owner=CacheItemOwner)
+
+        tier.clear()
+
+        self.assertFalse(tier.has('key'))
+
+    @override_settings(MEDIA_CACHE_MEMORY_TIER_SIZE=100)
+    def test_skips_too_big_items(self):
+        tier = MemoryCacheTier()
+
+        tier.set('key', _make_item(200), owner=CacheItemOwner)
+
+        self.assertFalse(tier.has('key'))
+
+
+class DiskCacheTierTest(SimpleTestCase):
+    def setUp(self):
+        self._cache_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self._cache_root.cleanup)
+
+    def _override_settings(self, **kwargs):
+        return override_settings(**{
+            'MEDIA_CACHE_DISK_TIER_ROOT': os.path.join(self._cache_root.name, 'media'),
+            'MEDIA_CACHE_DISK_TIER_SIZE': 10000,
+            'MEDIA_CACHE_TASK_QUOTA': 0,
+            'MEDIA_CACHE_ORG_QUOTA': 0,
+            'MEDIA_CACHE_CHECKSUM_VERIFICATION_RATE': 0,
+            **kwargs
+        })
+
+    def test_can_get_item(self):
+        with self._override_settings():
+            tier = DiskCacheTier()
+            item = _make_item(100)
+
+            tier.set('key', item, owner=lambda: CacheItemOwner(task_id=1, org_id=2))
+            cached_item = tier.get('key')
+
+        with cached_item.data:
+            self.assertEqual(item.data.getvalue(), cached_item.data.read())
+        self.assertEqual(item.mime, cached_item.mime)
+        self.assertEqual(item.checksum, cached_item.checksum)
+
+    def test_item_data_is_seekable(self):
+        with self._override_settings():
+            tier = DiskCacheTier()
+            item = _make_item(100)
+
+            tier.set('key', item, owner=CacheItemOwner)
+            cached_item = tier.get('key')
+
+        with cached_item.data:
+            cached_item.data.seek(-10, io.SEEK_END)
+            self.assertEqual(90, cached_item.data.tell())
+            self.assertEqual(item.data.getvalue()[90:], cached_item.data.read())
+
+            cached_item.data.seek(0)
+            self.assertEqual(item.data.getvalue()[:10], cached_item.data.read(10))
+
+    def test_can_detect_corrupted_item(self):
+        with self._override_settings(MEDIA_CACHE_CHECKSUM_VERIFICATION_RATE=1):
+            tier = DiskCacheTier()
+            item = _make_item(100)
+            tier.set('key', item, owner=CacheItemOwner)
+
+            with open(tier._get_item_path('key'), 'r+b') as f:
+                f.seek(-1, io.SEEK_END)
+                last_byte = f.read(1)[0]
+                f.seek(-1, io.SEEK_END)
+                f.write(bytes([last_byte ^ 0xff]))
+
+            self.assertIsNone(tier.get('key'))
+            self.assertFalse(tier.has('key'))
+
+    def test_can_clear(self):
+        with self._override_settings():
+            tier = DiskCacheTier()
+            tier.set('key', _make_item(100), owner=CacheItemOwner)
+
+            tier.clear()
+
+            self.assertFalse(tier.has('key'))
+            self.assertFalse(os.path.exists(tier.root))
+
+    def test_keeps_task_quota(self):
+        with self._override_settings(MEDIA_CACHE_TASK_QUOTA=600):
+            tier = DiskCacheTier()
+
+            for i in range(3):
+                tier.set(f'task1_{i}', _make_item(200),
+                    owner=lambda: CacheItemOwner(task_id=1, org_id=None))
+            tier.set('task2', _make_item(200),
+                owner=lambda: CacheItemOwner(task_id=2, org_id=None))
+
+            self.assertEqual(2, sum(tier.has(f'task1_{i}') for i in range(3)))
+            self.assertTrue(tier.has('task2'))
+
+    def test_removes_owner_links_on_eviction(self):
+        with self._override_settings(MEDIA_CACHE_DISK_TIER_SIZE=500):
+            tier = DiskCacheTier()
+
+            for i in range(3):
+                tier.set(f'key_{i}', _make_item(200),
+                    owner=lambda: CacheItemOwner(task_id=1, org_id=None))
+
+            owner_links = os.listdir(os.path.join(tier.root, 'owners', 'org_None', 'task_1'))
+            items = os.listdir(os.path.join(tier.root, 'items'))
+
+        self.assertEqual(sorted(items), sorted(owner_links))
+
+    def test_scans_directories_only_when_needed(self):
+        with self._override_settings(MEDIA_CACHE_DISK_TIER_SIZE=1000):
+            tier = DiskCacheTier()
+            owner = lambda: CacheItemOwner(task_id=1, org_id=None)
+
+            tier.set('key_0', _make_item(200), owner=owner)
+
+            with mock.patch('os.walk', side_effect=os.walk) as walk:
+                for i in range(1, 3):
+                    tier.set(f'key_{i}', _make_item(200), owner=owner)
+                self.assertEqual(0, walk.call_count)
+
+                # The tracked size of the items directory exceeds the tier size
+                tier.set('key_3', _make_item(200), owner=owner)
+                self.assertEqual(1, walk.call_count)
+
+            self.assertEqual(3, sum(tier.has(f'key_{i}') for i in range(4)))
+            self.assertTrue(tier.has('key_3'))
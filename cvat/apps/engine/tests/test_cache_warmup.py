@@ -0,0 +1,237 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+import django_rq
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rq.job import JobStatus as RQJobStatus
+
+from cvat.apps.engine import cache_warmup
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.frame_provider import FrameProvider
+from cvat.apps.engine.models import Job, StorageMethodChoice
+from cvat.apps.engine.tests.utils import ApiTestBase, ForceLogin, generate_image_file
+
+
+class ChunksWarmupTest(ApiTestBase):
+    _IMAGE_COUNT = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', email='', password='admin')
+
+    def _create_task(self):
+        # 2 jobs with the frames 0-2 and 3-5, the chunks 0-1 and 1-2 correspondingly
+        task_spec = {
+            'name': 'task',
+            'segment_size': 3,
+            'labels': [{'name': 'car'}],
+        }
+        data_spec = {
+            'image_quality': 75,
+            'chunk_size': 2,
+            'use_cache': True,
+            **{
+                f'client_files[{i}]': generate_image_file(f'image_{i}.jpg')
+                for i in range(self._IMAGE_COUNT)
+            },
+        }
+
+        with ForceLogin(self.admin, self.client):
+            response = self.client.post('/api/tasks', data=task_spec, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            task_id = response.data['id']
+
+            response = self.client.post(f'/api/tasks/{task_id}/data', data=data_spec)
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        return task_id
+
+    def _get_job_ids(self, task_id):
+        return list(
+            Job.objects
+            .filter(segment__task_id=task_id)
+            .order_by('segment__start_frame')
+            .values_list('id', flat=True)
+        )
+
+    def _get_warmup_queue(self):
+        # Keep the jobs in the queue instead of running them immediately
+        return django_rq.get_queue(settings.CVAT_QUEUES.CHUNKS.value, is_async=True)
+
+    def _record_chunk_preparations(self):
+        return mock.patch.object(
+            MediaCache, '_prepare_task_chunk', autospec=True,
+            side_effect=MediaCache._prepare_task_chunk,
+        )
+
+    def test_does_not_warm_up_chunks_when_disabled(self):
+        queue = self._get_warmup_queue()
+
+        with mock.patch.object(cache_warmup, '_get_queue', return_value=queue):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create_task()
+
+        self.assertEqual([], queue.job_ids)
+
+    @override_settings(MEDIA_CACHE_WARMUP=True)
+    def test_enqueues_one_warmup_per_job_on_task_creation(self):
+        queue = self._get_warmup_queue()
+
+        with mock.patch.object(cache_warmup, '_get_queue', return_value=queue):
+            with self.captureOnCommitCallbacks(execute=True):
+                task_id = self._create_task()
+
+        job_ids = self._get_job_ids(task_id)
+        self.assertEqual(2, len(job_ids))
+        self.assertEqual(
+            [f'warmup-chunks-job-{job_id}' for job_id in job_ids], queue.job_ids
+        )
+
+    @override_settings(MEDIA_CACHE_WARMUP=True)
+    def test_does_not_enqueue_duplicate_warmup(self):
+        task_id = self._create_task()
+        job_ids = self._get_job_ids(task_id)
+
+        queue = self._get_warmup_queue()
+        with mock.patch.object(cache_warmup, '_get_queue', return_value=queue):
+            cache_warmup.enqueue_task_chunks_warmup(task_id)
+            cache_warmup.enqueue_task_chunks_warmup(task_id)
+            cache_warmup.enqueue_job_chunks_warmup(Job.objects.get(id=job_ids[0]))
+
+            self.assertEqual(
+                [f'warmup-chunks-job-{job_id}' for job_id in job_ids], queue.job_ids
+            )
+
+            # A finished warmup is restarted, as the cache could have been cleared since then
+            rq_job = queue.fetch_job(f'warmup-chunks-job-{job_ids[0]}')
+            queue.remove(rq_job)
+            rq_job.set_status(RQJobStatus.FINISHED)
+
+            cache_warmup.enqueue_job_chunks_warmup(Job.objects.get(id=job_ids[0]))
+
+        self.assertEqual(
+            [f'warmup-chunks-job-{job_id}' for job_id in job_ids[1:] + job_ids[:1]],
+            queue.job_ids
+        )
+
+    @override_settings(MEDIA_CACHE_WARMUP=True)
+    def test_can_warm_up_job_chunks(self):
+        task_id = self._create_task()
+        job_ids = self._get_job_ids(task_id)
+
+        with self._record_chunk_preparations() as prepare_chunk:
+            cache_warmup._warm_up_job_chunks(db_job_id=job_ids[0])
+        self.assertEqual(
+            {
+                (quality, chunk_number)
+                for quality in FrameProvider.Quality
+                for chunk_number in [0, 1]
+            },
+            {call.args[2:] for call in prepare_chunk.call_args_list}
+        )
+        self.assertEqual(4, prepare_chunk.call_count)
+
+        # The chunk 1 is shared with the first job, it's prepared already
+        with self._record_chunk_preparations() as prepare_chunk:
+            cache_warmup._warm_up_job_chunks(db_job_id=job_ids[1])
+        self.assertEqual(
+            {(quality, 2) for quality in FrameProvider.Quality},
+            {call.args[2:] for call in prepare_chunk.call_args_list}
+        )
+        self.assertEqual(2, prepare_chunk.call_count)
+
+        with self._record_chunk_preparations() as prepare_chunk:
+            cache_warmup._warm_up_job_chunks(db_job_id=job_ids[1])
+        prepare_chunk.assert_not_called()
+
+
+@override_settings(
+    USE_CACHE=True,
+    MEDIA_CACHE_PREFETCH_CHUNKS=2,
+    MEDIA_CACHE_PREFETCH_MAX_IN_FLIGHT=10,
+    MEDIA_CACHE_PREFETCH_THREADS=1,
+)
+class ChunksPrefetchTest(SimpleTestCase):
+    _QUALITY = FrameProvider.Quality.COMPRESSED
+
+    def setUp(self):
+        self.prefetcher = cache_warmup._ChunkPrefetcher()
+        prefetcher_patcher = mock.patch.object(cache_warmup, '_prefetcher', self.prefetcher)
+        prefetcher_patcher.start()
+        self.addCleanup(prefetcher_patcher.stop)
+
+        # The prefetches are kept in flight until released
+        self.release_prefetches = threading.Event()
+        self.addCleanup(self._finish_prefetches)
+        self.prefetched_chunks = []
+
+        prefetch_patcher = mock.patch.object(
+            cache_warmup, '_prefetch_task_chunk', side_effect=self._prefetch_task_chunk
+        )
+        prefetch_patcher.start()
+        self.addCleanup(prefetch_patcher.stop)
+
+        self.db_data = SimpleNamespace(id=1, storage_method=StorageMethodChoice.CACHE)
+
+    def _prefetch_task_chunk(self, db_data_id, chunk_number, quality, dimension):
+        self.release_prefetches.wait()
+        self.prefetched_chunks.append(chunk_number)
+
+    def _finish_prefetches(self):
+        self.release_prefetches.set()
+        if self.prefetcher._executor is not None:
+            self.prefetcher._executor.shutdown(wait=True)
+            self.prefetcher._executor = None
+
+    def _schedule_next_chunks_prefetch(self, chunk_number):
+        cache_warmup.schedule_next_chunks_prefetch(
+            chunk_number, self._QUALITY, db_data=self.db_data, stop_chunk=10
+        )
+
+    def test_does_not_schedule_duplicate_prefetches(self):
+        self._schedule_next_chunks_prefetch(0)
+        self._schedule_next_chunks_prefetch(0)
+        self._schedule_next_chunks_prefetch(1)
+
+        self.assertEqual(
+            {('data', self.db_data.id, chunk_number, self._QUALITY) for chunk_number in [1, 2, 3]},
+            self.prefetcher._in_flight
+        )
+
+        self._finish_prefetches()
+
+        self.assertEqual([1, 2, 3], sorted(self.prefetched_chunks))
+        self.assertEqual(set(), self.prefetcher._in_flight)
+
+    def test_does_not_prefetch_chunks_after_stop_chunk(self):
+        cache_warmup.schedule_next_chunks_prefetch(
+            8, self._QUALITY, db_data=self.db_data, stop_chunk=9
+        )
+        self._finish_prefetches()
+
+        self.assertEqual([9], self.prefetched_chunks)
+
+    def test_can_prefetch_chunk_again_after_preparation(self):
+        prepare = mock.Mock()
+        self.release_prefetches.set()
+
+        self.assertTrue(self.prefetcher.schedule('chunk', prepare))
+        self._finish_prefetches()
+
+        self.assertTrue(self.prefetcher.schedule('chunk', prepare))
+        self._finish_prefetches()
+
+        self.assertEqual(2, prepare.call_count)
+
+    @override_settings(MEDIA_CACHE_PREFETCH_MAX_IN_FLIGHT=1)
+    def test_drops_prefetches_over_in_flight_limit(self):
+        self.assertTrue(self.prefetcher.schedule('chunk 1', self.release_prefetches.wait))
+        self.assertFalse(self.prefetcher.schedule('chunk 2', mock.Mock()))
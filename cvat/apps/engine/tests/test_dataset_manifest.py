@@ -0,0 +1,112 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from utils.dataset_manifest import ImageManifestManager
+from utils.dataset_manifest.core import _ImageColumns, _Index
+
+
+class ManifestIndexTest(SimpleTestCase):
+    def setUp(self):
+        self._manifest_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._manifest_dir.cleanup)
+
+        self.manifest_path = os.path.join(self._manifest_dir.name, 'manifest.jsonl')
+        self.images = [
+            {'name': f'image_{i}', 'extension': '.jpg', 'width': 10, 'height': 10}
+            for i in range(5)
+        ]
+        ImageManifestManager(self.manifest_path).create(self.images)
+
+    def test_can_read_items_with_saved_index(self):
+        manifest = ImageManifestManager(self.manifest_path)
+        manifest.init_index()
+
+        self.assertTrue(os.path.exists(os.path.join(self._manifest_dir.name, _Index.FILE_NAME)))
+        self.assertEqual(len(self.images), len(manifest))
+        self.assertEqual(self.images[3]['name'], manifest[3]['name'])
+        self.assertEqual(
+            [image['name'] for image in self.images],
+            [image['name'] for _, image in manifest],
+        )
+
+    def test_can_read_legacy_index(self):
+        index = _Index(self._manifest_dir.name)
+        index.load()
+        legacy_index = dict(enumerate(index))
+        index.remove()
+
+        with open(os.path.join(self._manifest_dir.name, _Index.LEGACY_FILE_NAME), 'w') as f:
+            json.dump(legacy_index, f)
+
+        manifest = ImageManifestManager(self.manifest_path, create_index=False)
+        manifest.init_index()
+
+        self.assertTrue(manifest.index.is_legacy)
+        self.assertEqual(self.images[2]['name'], manifest[2]['name'])
+
+    def test_recreates_broken_index(self):
+        with open(os.path.join(self._manifest_dir.name, _Index.FILE_NAME), 'wb') as f:
+            f.write(b'broken')
+
+        manifest = ImageManifestManager(self.manifest_path)
+        manifest.init_index()
+
+        self.assertEqual(len(self.images), len(manifest))
+        self.assertEqual(self.images[4]['name'], manifest[4]['name'])
+
+
+class ManifestColumnsTest(SimpleTestCase):
+    def setUp(self):
+        self._manifest_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._manifest_dir.cleanup)
+
+        self.manifest_path = os.path.join(self._manifest_dir.name, 'manifest.jsonl')
+        self.images = [
+            {'name': f'dir/image_{i}', 'extension': '.jpg', 'width': 10 + i, 'height': 20 + i}
+            for i in range(5)
+        ]
+        self.images.append({'name': 'no_size', 'extension': '.png'})
+        ImageManifestManager(self.manifest_path).create(self.images)
+
+    def test_can_get_image_sizes(self):
+        manifest = ImageManifestManager(self.manifest_path)
+
+        self.assertEqual(
+            [[11, 21], [13, 23], [-1, -1]],
+            manifest.get_image_sizes([1, 3, 5]).tolist(),
+        )
+        self.assertEqual(
+            [[10, 20], [12, 22]],
+            manifest.get_image_sizes(range(0, 4, 2)).tolist(),
+        )
+
+    def test_can_get_image_names(self):
+        manifest = ImageManifestManager(self.manifest_path)
+
+        self.assertEqual(
+            ['dir/image_4.jpg', 'no_size.png'],
+            manifest.get_image_full_names(slice(4, None)),
+        )
+
+    def test_rejects_invalid_indices(self):
+        manifest = ImageManifestManager(self.manifest_path)
+
+        with self.assertRaises(IndexError):
+            manifest.get_image_sizes([0, len(self.images)])
+
+    def test_recreates_outdated_columns(self):
+        ImageManifestManager(self.manifest_path).init_columns()
+        self.assertTrue(os.path.exists(os.path.join(self._manifest_dir.name, _ImageColumns.FILE_NAME)))
+
+        with open(self.manifest_path, 'a') as f:
+            f.write('{"name":"new","extension":".jpg","width":1,"height":2}\n')
+
+        manifest = ImageManifestManager(self.manifest_path)
+        self.assertEqual(['new.jpg'], manifest.get_image_full_names([len(self.images)]))
@@ -0,0 +1,100 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import tempfile
+import zlib
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.cache_tiers import CacheItem, CacheItemOwner, DiskCacheTier
+from cvat.apps.engine.frame_provider import FrameProvider
+from cvat.apps.engine.media_extractors import VideoReader
+from cvat.apps.engine.models import DataChoice, StorageChoice, StorageMethodChoice
+from cvat.apps.engine.tests.utils import generate_video_file
+
+
+class FrameProviderDiskCacheTierTest(SimpleTestCase):
+    _FRAME_COUNT = 10
+
+    def setUp(self):
+        cache_root = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_root.cleanup)
+
+        settings_override = override_settings(
+            MEDIA_CACHE_DISK_TIER_ROOT=cache_root.name,
+            MEDIA_CACHE_CHECKSUM_VERIFICATION_RATE=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        _, video = generate_video_file('video.mp4', width=64, height=64, duration=1, fps=10)
+        self.video_data = video.getvalue()
+        self.expected_frames = [
+            frame.to_ndarray(format='bgr24')
+            for frame, _, _ in VideoReader([io.BytesIO(self.video_data)])
+        ]
+        assert len(self.expected_frames) == self._FRAME_COUNT
+
+        self.tier = DiskCacheTier()
+        self.tier.set(
+            'chunk',
+            CacheItem(io.BytesIO(self.video_data), 'video/mp4', zlib.crc32(self.video_data)),
+            owner=CacheItemOwner,
+        )
+
+        # Each chunk of the task is the same video
+        self.db_data = SimpleNamespace(
+            id=1,
+            size=2 * self._FRAME_COUNT,
+            chunk_size=self._FRAME_COUNT,
+            storage_method=StorageMethodChoice.CACHE,
+            storage=StorageChoice.LOCAL,
+            compressed_chunk_type=DataChoice.VIDEO,
+            original_chunk_type=DataChoice.VIDEO,
+        )
+
+        self.chunk_streams = []
+        get_chunk_patcher = mock.patch.object(
+            MediaCache, 'get_task_chunk_data_with_mime', autospec=True,
+            side_effect=self._get_chunk_from_disk_tier,
+        )
+        get_chunk_patcher.start()
+        self.addCleanup(get_chunk_patcher.stop)
+
+    def _get_chunk_from_disk_tier(self, _cache, _chunk_number, _quality, _db_data):
+        item = self.tier.get('chunk')
+        self.chunk_streams.append(item.data)
+        return item.data, item.mime
+
+    def test_can_read_frames_out_of_order(self):
+        frame_provider = FrameProvider(self.db_data)
+
+        for frame_number in [3, 3, 1, 7, 0, self._FRAME_COUNT - 1]:
+            frame, _ = frame_provider.get_frame(
+                frame_number,
+                quality=FrameProvider.Quality.COMPRESSED,
+                out_type=FrameProvider.Type.NUMPY_ARRAY,
+            )
+            self.assertTrue(np.array_equal(self.expected_frames[frame_number], frame))
+
+        self.assertEqual(1, len(self.chunk_streams))
+
+    def test_closes_chunk_files(self):
+        frame_provider = FrameProvider(self.db_data)
+
+        frame_provider.get_frame(3, quality=FrameProvider.Quality.COMPRESSED)
+        frame_provider.get_frame(self._FRAME_COUNT + 3, quality=FrameProvider.Quality.COMPRESSED)
+
+        self.assertEqual(2, len(self.chunk_streams))
+        self.assertTrue(self.chunk_streams[0].closed)
+        self.assertFalse(self.chunk_streams[1].closed)
+
+        frame_provider.unload()
+
+        self.assertTrue(self.chunk_streams[1].closed)
@@ -0,0 +1,129 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import threading
+import zlib
+from contextlib import contextmanager
+from unittest import mock
+
+import fakeredis
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.cache_tiers import CacheItem, CacheItemOwner, RedisCacheTier
+
+
+@override_settings(
+    MEDIA_CACHE_SINGLE_FLIGHT=True,
+    MEDIA_CACHE_CHECKSUM_VERIFICATION_RATE=0,
+)
+class MediaCacheSingleFlightTest(SimpleTestCase):
+    _KEY = 'chunk'
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        for module in ('cvat.apps.engine.cache', 'cvat.apps.engine.cache_tiers'):
+            patcher = mock.patch(f'{module}.get_media_redis_connection', return_value=self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.cache = MediaCache()
+        self.tiers = [RedisCacheTier()]
+
+    @staticmethod
+    def _make_item(data: bytes):
+        return io.BytesIO(data), 'application/zip'
+
+    def _get_item(self, create_function):
+        return self.cache._get_or_set_cache_item(
+            self._KEY, create_function, tiers=self.tiers, owner=CacheItemOwner
+        )
+
+    @contextmanager
+    def _hold_lock_in_thread(self, *, item_data=None):
+        """
+        Holds the item lock in another thread, like a concurrent request preparing the item.
+        If item_data is specified, the item is saved into the cache when another request
+        starts waiting for the lock, then the lock is released.
+        """
+
+        lock_acquired = threading.Event()
+        waiter_started = threading.Event()
+        release_lock = threading.Event()
+
+        def hold_lock():
+            with MediaCache()._get_cache_item_lock(self._KEY) as acquired:
+                assert acquired
+                lock_acquired.set()
+
+                if item_data is not None:
+                    waiter_started.wait()
+                    data = io.BytesIO(item_data)
+                    item = CacheItem(data, 'application/zip', zlib.crc32(item_data))
+                    for tier in self.tiers:
+                        tier.set(self._KEY, item, CacheItemOwner)
+                else:
+                    release_lock.wait()
+
+        original_get_lock = self.cache._get_cache_item_lock
+
+        def get_lock(key):
+            waiter_started.set()
+            return original_get_lock(key)
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            lock_acquired.wait()
+
+            with mock.patch.object(self.cache, '_get_cache_item_lock', side_effect=get_lock):
+                yield
+        finally:
+            release_lock.set()
+            thread.join()
+
+    def test_can_reuse_item_prepared_by_lock_holder(self):
+        create_function = mock.Mock(return_value=self._make_item(b'waiter data'))
+
+        with self._hold_lock_in_thread(item_data=b'holder data'):
+            data, mime = self._get_item(create_function)
+
+        self.assertEqual(b'holder data', data.getvalue())
+        self.assertEqual('application/zip', mime)
+        create_function.assert_not_called()
+
+        stats = MediaCache.get_single_flight_stats()
+        self.assertEqual(1, stats['coalesced_waits'])
+        self.assertNotIn('wait_timeouts', stats)
+
+    @override_settings(MEDIA_CACHE_LOCK_WAIT_TIMEOUT=1)
+    def test_can_prepare_item_after_lock_wait_timeout(self):
+        create_function = mock.Mock(return_value=self._make_item(b'waiter data'))
+
+        with self._hold_lock_in_thread():
+            data, _ = self._get_item(create_function)
+
+        self.assertEqual(b'waiter data', data.getvalue())
+        create_function.assert_called_once()
+        self.assertTrue(self.tiers[0].has(self._KEY))
+
+        stats = MediaCache.get_single_flight_stats()
+        self.assertEqual(1, stats['wait_timeouts'])
+        self.assertNotIn('coalesced_waits', stats)
+
+    def test_releases_lock_if_item_preparation_fails(self):
+        create_function = mock.Mock(side_effect=ValueError('preparation failed'))
+
+        with self.assertRaises(ValueError):
+            self._get_item(create_function)
+
+        self.assertEqual([], self.redis.keys('*media_cache_lock*'))
+
+        create_function = mock.Mock(return_value=self._make_item(b'data'))
+        with override_settings(MEDIA_CACHE_LOCK_WAIT_TIMEOUT=1):
+            data, _ = self._get_item(create_function)
+
+        self.assertEqual(b'data', data.getvalue())
+        self.assertEqual({'prepared': 1}, MediaCache.get_single_flight_stats())
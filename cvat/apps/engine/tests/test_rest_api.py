@@ -32,13 +32,14 @@ from pyunpack import Archive
 from django.conf import settings
 from django.contrib.auth.models import Group, User
 from django.http import HttpResponse
+from django.test import override_settings
 from PIL import Image
 from pycocotools import coco as coco_loader
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from datumaro.util.test_utils import current_function_name, TestDir
-from cvat.apps.engine.models import (AttributeSpec, AttributeType, Data, Job,
+from cvat.apps.engine.models import (AnnotationChange, AttributeSpec, AttributeType, Data, Job,
     Project, Segment, StageChoice, StatusChoice, Task, Label, StorageMethodChoice,
     StorageChoice, DimensionType, SortingMethod)
 from cvat.apps.engine.media_extractors import ValidateDimension, sort
@@ -5366,6 +5367,160 @@ class JobAnnotationAPITestCase(ApiTestBase):
         response = self._delete_api_v2_jobs_id_data(job["id"], self.somebody)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def _get_api_v2_jobs_id_data_changes(self, jid, user, since_version):
+        with ForceLogin(user, self.client):
+            response = self.client.get("/api/jobs/{}/annotations?since_version={}".format(
+                jid, since_version))
+
+        return response
+
+    def test_api_v2_jobs_id_annotations_since_version(self):
+        task, jobs = self._create_task(self.user, self.user)
+        job = jobs[0]
+
+        def make_data(shapes):
+            return {
+                "version": 0,
+                "tags": [],
+                "shapes": [
+                    {
+                        "frame": 0,
+                        "label_id": task["labels"][0]["id"],
+                        "group": None,
+                        "source": "manual",
+                        "attributes": [],
+                        "points": points,
+                        "type": "rectangle",
+                        "occluded": False,
+                    }
+                    for points in shapes
+                ],
+                "tracks": [],
+            }
+
+        response = self._put_api_v2_jobs_id_data(job["id"], self.user,
+            make_data([[1, 2, 3, 4], [5, 6, 7, 8]]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        version = response.data["version"]
+        _, deleted_shape = response.data["shapes"]
+
+        response = self._patch_api_v2_jobs_id_data(job["id"], self.user, "create",
+            make_data([[9, 10, 11, 12]]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        created_shape = response.data["shapes"][0]
+
+        response = self._patch_api_v2_jobs_id_data(job["id"], self.user, "delete", {
+            "version": 0, "tags": [], "shapes": [deleted_shape], "tracks": [],
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self._get_api_v2_jobs_id_data_changes(job["id"], self.user, version)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(version + 2, response.data["version"])
+        self.assertEqual([created_shape["id"]], [shape["id"] for shape in response.data["shapes"]])
+        self.assertEqual({"tags": [], "shapes": [deleted_shape["id"]], "tracks": []},
+            response.data["deleted"])
+
+        response = self._get_api_v2_jobs_id_data_changes(job["id"], self.user, version + 2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([], response.data["shapes"])
+
+        response = self._get_api_v2_jobs_id_data_changes(job["id"], self.user, version + 3)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._get_api_v2_jobs_id_data_changes(job["id"], self.user, -1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_api_v2_jobs_id_annotations_since_version_after_label_deletion(self):
+        task, jobs = self._create_task(self.user, self.user)
+        job = jobs[0]
+        label_ids = {label["name"]: label["id"] for label in task["labels"]}
+
+        response = self._put_api_v2_jobs_id_data(job["id"], self.user, {
+            "version": 0,
+            "tags": [
+                {
+                    "frame": 0,
+                    "label_id": label_ids["person"],
+                    "group": None,
+                    "source": "manual",
+                    "attributes": [],
+                },
+            ],
+            "shapes": [
+                {
+                    "frame": 0,
+                    "label_id": label_ids[label_name],
+                    "group": None,
+                    "source": "manual",
+                    "attributes": [],
+                    "points": [1, 2, 3, 4],
+                    "type": "rectangle",
+                    "occluded": False,
+                }
+                for label_name in ["car", "person"]
+            ],
+            "tracks": [],
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        version = response.data["version"]
+        deleted_tag = response.data["tags"][0]
+        deleted_shape = next(
+            shape for shape in response.data["shapes"]
+            if shape["label_id"] == label_ids["person"]
+        )
+
+        with ForceLogin(self.user, self.client):
+            response = self.client.delete("/api/labels/{}".format(label_ids["person"]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self._get_api_v2_jobs_id_data_changes(job["id"], self.user, version)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(version + 1, response.data["version"])
+        self.assertEqual([], response.data["shapes"])
+        self.assertEqual(
+            {"tags": [deleted_tag["id"]], "shapes": [deleted_shape["id"]], "tracks": []},
+            response.data["deleted"]
+        )
+
+    @override_settings(DATASET_ANNOTATION_CHANGES_RETENTION=2)
+    def test_api_v2_jobs_id_annotations_since_removed_version(self):
+        task, jobs = self._create_task(self.user, self.user)
+        job = jobs[0]
+
+        versions = []
+        for i in range(4):
+            response = self._patch_api_v2_jobs_id_data(job["id"], self.user, "create", {
+                "version": 0,
+                "tags": [],
+                "shapes": [
+                    {
+                        "frame": 0,
+                        "label_id": task["labels"][0]["id"],
+                        "group": None,
+                        "source": "manual",
+                        "attributes": [],
+                        "points": [i, 2, 3, 4],
+                        "type": "rectangle",
+                        "occluded": False,
+                    },
+                ],
+                "tracks": [],
+            })
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            versions.append(response.data["version"])
+
+        # Only the changes of the last 2 versions are kept
+        self.assertEqual(versions[-2:], sorted(
+            AnnotationChange.objects.filter(job_id=job["id"]).values_list("version", flat=True)
+        ))
+
+        response = self._get_api_v2_jobs_id_data_changes(job["id"], self.user, versions[-3])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(2, len(response.data["shapes"]))
+
+        response = self._get_api_v2_jobs_id_data_changes(job["id"], self.user, versions[-4])
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
 
     def test_api_v2_jobs_id_annotations_no_auth(self):
         self._run_api_v2_jobs_id_annotations(self.user, self.user, None)
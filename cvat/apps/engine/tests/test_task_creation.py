@@ -0,0 +1,113 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import concurrent.futures
+import zipfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework import status
+
+from cvat.apps.engine.models import Image, Task
+from cvat.apps.engine.tests.utils import ApiTestBase, ForceLogin, generate_image_file
+
+
+class ParallelTaskCreationTest(ApiTestBase):
+    _IMAGE_COUNT = 7
+    _CHUNK_SIZE = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', email='', password='admin')
+
+    def _create_task(self):
+        task_spec = {
+            'name': 'task',
+            'labels': [{'name': 'car'}],
+        }
+        data_spec = {
+            'image_quality': 75,
+            'chunk_size': self._CHUNK_SIZE,
+            'use_cache': False,
+            'sorting_method': 'natural',
+            **{
+                # Different sizes allow to check the image order
+                f'client_files[{i}]': generate_image_file(
+                    f'image_{i}.jpg', size=(50 + i, 40 + 2 * i)
+                )
+                for i in range(self._IMAGE_COUNT)
+            },
+        }
+
+        with ForceLogin(self.admin, self.client):
+            response = self.client.post('/api/tasks', data=task_spec, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            task_id = response.data['id']
+
+            response = self.client.post(f'/api/tasks/{task_id}/data', data=data_spec)
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        return Task.objects.get(id=task_id).data
+
+    @staticmethod
+    def _get_images(db_data):
+        return list(
+            Image.objects
+            .filter(data=db_data)
+            .order_by('frame')
+            .values_list('frame', 'path', 'width', 'height')
+        )
+
+    @staticmethod
+    def _read_chunk(chunk_path):
+        # The archive entry timestamps differ, only the contents are compared
+        with zipfile.ZipFile(chunk_path) as chunk:
+            return [(name, chunk.read(name)) for name in chunk.namelist()]
+
+    def _get_chunks(self, db_data):
+        chunk_count = -(-db_data.size // db_data.chunk_size)
+        return [
+            (
+                self._read_chunk(db_data.get_original_chunk_path(chunk_number)),
+                self._read_chunk(db_data.get_compressed_chunk_path(chunk_number)),
+            )
+            for chunk_number in range(chunk_count)
+        ]
+
+    def test_can_create_task_in_chunk_processes(self):
+        with override_settings(CVAT_CHUNK_PROCESSING_PROCESSES=0):
+            expected_data = self._create_task()
+
+        with override_settings(
+            CVAT_CHUNK_PROCESSING_PROCESSES=2,
+            TASK_CREATION_IMAGE_BATCH_SIZE=3,
+        ), mock.patch.object(
+            concurrent.futures, 'ProcessPoolExecutor',
+            wraps=concurrent.futures.ProcessPoolExecutor,
+        ) as process_pool, mock.patch.object(
+            Image.objects, 'bulk_create', wraps=Image.objects.bulk_create,
+        ) as save_images:
+            db_data = self._create_task()
+
+        process_pool.assert_called_once()
+        self.assertEqual(2, process_pool.call_args.kwargs['max_workers'])
+        self.assertLess(1, save_images.call_count)
+
+        self.assertEqual(self._IMAGE_COUNT, db_data.size)
+        self.assertEqual(expected_data.size, db_data.size)
+
+        images = self._get_images(db_data)
+        self.assertEqual(
+            [
+                (i, f'image_{i}.jpg', 50 + i, 40 + 2 * i)
+                for i in range(self._IMAGE_COUNT)
+            ],
+            images,
+        )
+        self.assertEqual(self._get_images(expected_data), images)
+
+        chunks = self._get_chunks(db_data)
+        self.assertEqual(4, len(chunks))
+        self.assertEqual(self._get_chunks(expected_data), chunks)
@@ -0,0 +1,224 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+from contextlib import closing
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.engine.frame_provider import FrameProvider
+from cvat.apps.engine.media_extractors import (VideoDecoder, VideoDecoderPool, VideoReader,
+                                               find_nearest_left_key_frame, read_video_frames)
+from cvat.apps.engine.models import DataChoice, StorageChoice, StorageMethodChoice
+from cvat.apps.engine.tests.utils import generate_video_file
+from utils.dataset_manifest import VideoManifestManager
+
+
+class VideoDecodingTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls._video_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls._video_dir.cleanup)
+
+        cls.video_path = os.path.join(cls._video_dir.name, 'video.mp4')
+        _, video = generate_video_file('video.mp4', width=64, height=64, duration=2, fps=25)
+        with open(cls.video_path, 'wb') as f:
+            f.write(video.getvalue())
+
+        manifest_path = os.path.join(cls._video_dir.name, 'manifest.jsonl')
+        manifest = VideoManifestManager(manifest_path)
+        manifest.link(media_file=cls.video_path, force=True)
+        manifest.create()
+
+        cls.manifest = VideoManifestManager(manifest_path)
+        cls.manifest.init_index()
+        cls.key_frames = [
+            (cls.manifest[i]['number'], cls.manifest[i]['pts']) for i in range(len(cls.manifest))
+        ]
+
+        # The frames decoded one by one from the video start, as the chunks were made before
+        cls.expected_frames = [
+            frame.to_ndarray(format='bgr24') for frame, _, _ in VideoReader([cls.video_path])
+        ]
+
+    def setUp(self):
+        self.assertLess(2, len(self.key_frames), 'The video must have several GOPs')
+
+        self.pool = VideoDecoderPool()
+        pool_patcher = mock.patch(
+            'cvat.apps.engine.media_extractors.video_decoder_pool', self.pool
+        )
+        pool_patcher.start()
+        self.addCleanup(pool_patcher.stop)
+        self.addCleanup(self._close_pooled_decoders)
+
+    def _close_pooled_decoders(self):
+        for decoder in self.pool._decoders.values():
+            decoder.close()
+
+    def _read_frames(self, frame_numbers):
+        with closing(read_video_frames(self.video_path, self.manifest, frame_numbers)) as frames:
+            return [frame.to_ndarray(format='bgr24') for frame in frames]
+
+    def _assert_frames_equal(self, frame_numbers, frames):
+        self.assertEqual(len(frame_numbers), len(frames))
+        for frame_number, frame in zip(frame_numbers, frames):
+            self.assertTrue(
+                np.array_equal(self.expected_frames[frame_number], frame),
+                f'Frame {frame_number} is different'
+            )
+
+    def _record_decoding_starts(self):
+        # The decoding is restarted after each seek
+        return mock.patch.object(
+            VideoDecoder, '_decode', autospec=True, side_effect=VideoDecoder._decode
+        )
+
+    def test_can_find_nearest_left_key_frame(self):
+        for frame_number in range(len(self.expected_frames)):
+            expected_key_frame = max(
+                key_frame for key_frame in self.key_frames if key_frame[0] <= frame_number
+            )
+
+            self.assertEqual(
+                expected_key_frame, find_nearest_left_key_frame(self.manifest, frame_number)
+            )
+
+    def test_can_read_frames_in_order(self):
+        frame_numbers = list(range(len(self.expected_frames)))
+
+        with self._record_decoding_starts() as decode:
+            frames = self._read_frames(frame_numbers)
+
+        self._assert_frames_equal(frame_numbers, frames)
+        self.assertEqual(1, decode.call_count)
+
+    def test_can_read_frames_across_gops(self):
+        second_key_frame = self.key_frames[1][0]
+        last_key_frame = self.key_frames[-1][0]
+        frame_numbers = [
+            1, second_key_frame - 1, second_key_frame, second_key_frame + 1,
+            last_key_frame - 1, last_key_frame + 2, len(self.expected_frames) - 1,
+        ]
+
+        self._assert_frames_equal(frame_numbers, self._read_frames(frame_numbers))
+
+    def test_can_read_frames_after_backward_seek(self):
+        forward_frame_numbers = [self.key_frames[2][0] + 3, self.key_frames[2][0] + 4]
+        self._assert_frames_equal(forward_frame_numbers, self._read_frames(forward_frame_numbers))
+
+        backward_frame_numbers = [2, self.key_frames[1][0] + 1]
+        self._assert_frames_equal(
+            backward_frame_numbers, self._read_frames(backward_frame_numbers)
+        )
+
+        self.assertEqual(1, len(self.pool._decoders))
+
+    def test_can_continue_reading_without_seek(self):
+        frame_number = self.key_frames[1][0] + 2
+        self._assert_frames_equal([frame_number], self._read_frames([frame_number]))
+
+        decoder = next(iter(self.pool._decoders.values()))
+        self.assertEqual(frame_number + 1, decoder.next_frame_number)
+
+        with self._record_decoding_starts() as decode:
+            next_frame_numbers = [frame_number + 1, frame_number + 3]
+            self._assert_frames_equal(next_frame_numbers, self._read_frames(next_frame_numbers))
+
+        self.assertEqual(0, decode.call_count)
+
+    def test_returns_decoder_to_pool_on_stopped_reading(self):
+        frames = read_video_frames(self.video_path, self.manifest, range(len(self.expected_frames)))
+        for _ in range(3):
+            next(frames)
+        frames.close()
+
+        self.assertEqual(1, len(self.pool._decoders))
+        decoder = next(iter(self.pool._decoders.values()))
+        self.assertEqual(3, decoder.next_frame_number)
+
+        with self._record_decoding_starts() as decode:
+            self._assert_frames_equal([3, 4], self._read_frames([3, 4]))
+        self.assertEqual(0, decode.call_count)
+
+    def test_can_read_video_in_several_readers_at_once(self):
+        first_frame_numbers = list(range(0, 20))
+        second_frame_numbers = list(range(self.key_frames[1][0] + 1, len(self.expected_frames)))
+
+        with closing(read_video_frames(
+            self.video_path, self.manifest, first_frame_numbers
+        )) as first_reader, closing(read_video_frames(
+            self.video_path, self.manifest, second_frame_numbers
+        )) as second_reader:
+            first_frames = []
+            second_frames = []
+            for first_frame, second_frame in zip(first_reader, second_reader):
+                first_frames.append(first_frame.to_ndarray(format='bgr24'))
+                second_frames.append(second_frame.to_ndarray(format='bgr24'))
+
+        count = min(len(first_frame_numbers), len(second_frame_numbers))
+        self._assert_frames_equal(first_frame_numbers[:count], first_frames)
+        self._assert_frames_equal(second_frame_numbers[:count], second_frames)
+
+        # Each reader has used its own decoder
+        self.assertEqual(2, len(self.pool._decoders))
+
+    @override_settings(MEDIA_VIDEO_DECODER_POOL_SIZE=2)
+    def test_evicts_old_decoders(self):
+        readers = [
+            read_video_frames(self.video_path, self.manifest, [frame_number])
+            for frame_number in range(3)
+        ]
+        for reader in readers:
+            next(reader)
+
+        with mock.patch.object(
+            VideoDecoder, 'close', autospec=True, side_effect=VideoDecoder.close
+        ) as close:
+            for reader in readers:
+                reader.close()
+
+        self.assertEqual(2, len(self.pool._decoders))
+        self.assertEqual(1, close.call_count)
+
+        # The decoders of the last readers are kept
+        self.assertEqual(
+            [2, 3], sorted(decoder.next_frame_number for decoder in self.pool._decoders.values())
+        )
+
+    def test_can_read_source_video_frames_in_frame_provider(self):
+        start_frame = 2
+        frame_step = 3
+
+        db_data = SimpleNamespace(
+            id=1,
+            size=(len(self.expected_frames) - start_frame) // frame_step,
+            chunk_size=10,
+            start_frame=start_frame,
+            get_frame_step=lambda: frame_step,
+            storage_method=StorageMethodChoice.CACHE,
+            storage=StorageChoice.LOCAL,
+            compressed_chunk_type=DataChoice.VIDEO,
+            original_chunk_type=DataChoice.VIDEO,
+            video=SimpleNamespace(path=os.path.basename(self.video_path)),
+            get_upload_dirname=lambda: self._video_dir.name,
+            get_manifest_path=lambda: self.manifest.manifest.path,
+        )
+        frame_provider = FrameProvider(db_data)
+
+        frame_numbers = [3, 4, 0, db_data.size - 1, 3]
+        for frame_number in frame_numbers:
+            frame, _ = frame_provider.get_frame(
+                frame_number,
+                quality=FrameProvider.Quality.ORIGINAL,
+                out_type=FrameProvider.Type.NUMPY_ARRAY,
+            )
+
+            self._assert_frames_equal([start_frame + frame_number * frame_step], [frame])
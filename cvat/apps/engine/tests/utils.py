@@ -18,6 +18,8 @@ import av
 import django_rq
 import numpy as np
 
+from cvat.apps.engine.cache import MediaCache
+
 T = TypeVar('T')
 
 
@@ -108,6 +110,7 @@ class ApiTestBase(APITestCase):
         # in real scenarios
         for cache in caches.all(initialized_only=True):
             cache.clear()
+        MediaCache.clear()
 
         # Clear any remaining RQ jobs produced by the tests executed
         self._clear_rq_jobs()
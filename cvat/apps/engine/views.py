@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+import io
 import os
 import os.path as osp
 import functools
@@ -25,7 +26,9 @@ from django.contrib.auth.models import User
 from django.db import IntegrityError, transaction
 from django.db.models import Count
 from django.db.models.query import Prefetch
-from django.http import HttpResponse, HttpRequest, HttpResponseNotFound, HttpResponseBadRequest
+from django.http import (
+    FileResponse, HttpResponse, HttpRequest, HttpResponseNotFound, HttpResponseBadRequest
+)
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import never_cache
@@ -97,6 +100,7 @@ from .log import ServerLogManager
 from cvat.apps.iam.filters import ORGANIZATION_OPEN_API_PARAMETERS
 from cvat.apps.iam.permissions import PolicyEnforcer, IsAuthenticatedOrReadPublicResource
 from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.cache_warmup import schedule_next_chunks_prefetch
 from cvat.apps.engine.permissions import (CloudStoragePermission,
     CommentPermission, IssuePermission, JobPermission, LabelPermission, ProjectPermission,
     TaskPermission, UserPermission)
@@ -657,6 +661,25 @@ class ProjectViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
 
         return response
 
+def _make_chunk_response(buff, mime_type: str) -> HttpResponse:
+    if isinstance(buff, io.BytesIO):
+        # Doesn't copy the data, if the buffer was not modified
+        return HttpResponse(buff.getvalue(), content_type=mime_type)
+
+    # The data is streamed directly from the storage, e.g. from a file in the cache
+    return FileResponse(buff, content_type=mime_type)
+
+def _touch_task_on_deleted_frames_update(db_task: models.Task) -> None:
+    # The deleted frames change the annotations of all the task jobs,
+    # so the jobs are updated too, like on the task label changes
+    db_task.touch()
+    models.Job.objects.filter(
+        updated_date__lt=db_task.updated_date, segment__task=db_task
+    ).update(updated_date=db_task.updated_date)
+
+    if db_task.project:
+        db_task.project.touch()
+
 class DataChunkGetter:
     def __init__(self, data_type, data_num, data_quality, task_dim):
         possible_data_type_values = ('chunk', 'frame', 'preview', 'context_image')
@@ -706,7 +729,9 @@ class DataChunkGetter:
                 # TODO: av.FFmpegError processing
                 if settings.USE_CACHE and db_data.storage_method == StorageMethodChoice.CACHE:
                     buff, mime_type = frame_provider.get_chunk(self.number, self.quality)
-                    return HttpResponse(buff.getvalue(), content_type=mime_type)
+                    schedule_next_chunks_prefetch(self.number, self.quality,
+                        db_data=db_data, stop_chunk=stop_chunk, dimension=self.dimension)
+                    return _make_chunk_response(buff, mime_type)
 
                 # Follow symbol links if the chunk is a link on a real image otherwise
                 # mimetype detection inside sendfile will work incorrectly.
@@ -767,12 +792,14 @@ class JobDataGetter(DataChunkGetter):
                 buf, mime = cache.get_selective_job_chunk_data_with_mime(
                     chunk_number=self.number, quality=self.quality, job=self.job
                 )
+                schedule_next_chunks_prefetch(self.number, self.quality,
+                    db_data=db_data, stop_chunk=stop_chunk, db_job=self.job)
             else:
                 buf, mime = cache.prepare_selective_job_chunk(
                     chunk_number=self.number, quality=self.quality, db_job=self.job
                 )
 
-            return HttpResponse(buf.getvalue(), content_type=mime)
+            return _make_chunk_response(buf, mime)
 
         else:
             return super().__call__(request, start, stop, db_data)
@@ -1560,6 +1587,7 @@ class TaskViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
             serializer = DataMetaWriteSerializer(instance=db_task.data, data=request.data)
             if serializer.is_valid(raise_exception=True):
                 db_task.data = serializer.save()
+                _touch_task_on_deleted_frames_update(db_task)
 
         if hasattr(db_task.data, 'video'):
             media = [db_task.data.video]
@@ -1782,6 +1810,13 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
             If format is specified, a ZIP archive will be returned. Otherwise,
             the annotations will be returned as a JSON document.
 
+            If since_version is specified, only the annotations created or updated
+            after this annotation version will be returned. The response also has
+            the "deleted" field with the ids of the annotations deleted after this version:
+            {"tags": [<id>, ...], "shapes": [<id>, ...], "tracks": [<id>, ...]}.
+            Only the changes of the latest annotation versions are kept,
+            for an older version the request fails with the 410 status.
+
             Deprecation warning:
 
             Utilizing this endpoint to export annotations as a dataset in
@@ -1809,6 +1844,8 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
             OpenApiParameter('use_default_location', description='Use the location that was configured in the task to export annotation',
                 location=OpenApiParameter.QUERY, type=OpenApiTypes.BOOL, required=False,
                 default=True, deprecated=True),
+            OpenApiParameter('since_version', description='Return only the annotation changes made after this annotation version',
+                location=OpenApiParameter.QUERY, type=OpenApiTypes.INT, required=False),
         ],
         responses={
             '200': OpenApiResponse(PolymorphicProxySerializer(
@@ -1819,6 +1856,7 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
             '201': OpenApiResponse(description='Output file is ready for downloading'),
             '202': OpenApiResponse(description='Exporting has been started'),
             '405': OpenApiResponse(description='Format is not available'),
+            '410': OpenApiResponse(description='The changes since the requested version are not available'),
         })
     @extend_schema(methods=['POST'],
         summary='Import annotations into a job',
@@ -1901,6 +1939,20 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
     def annotations(self, request, pk):
         self._object = self.get_object() # force call of check_object_permissions()
         if request.method == 'GET':
+            since_version = request.query_params.get('since_version')
+            if since_version is not None and not request.query_params.get('format'):
+                try:
+                    since_version = int(since_version)
+                    if since_version < 0:
+                        raise ValueError
+                except ValueError:
+                    raise ValidationError('since_version must be a non-negative integer')
+
+                try:
+                    return Response(dm.task.get_job_data_changes(pk, since_version))
+                except dm.task.AnnotationChangesExpiredError as ex:
+                    return Response(data=str(ex), status=status.HTTP_410_GONE)
+
             # FUTURE-TODO: mark as deprecated using this endpoint to export annotations when new API for result file downloading will be implemented
             return self.export_dataset_v1(
                 request=request,
@@ -2079,9 +2131,7 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateMo
                     db_data.deleted_frames,
                 ))
                 db_data = serializer.save()
-                db_job.segment.task.touch()
-                if db_job.segment.task.project:
-                    db_job.segment.task.project.touch()
+                _touch_task_on_deleted_frames_update(db_job.segment.task)
 
         if hasattr(db_data, 'video'):
             media = [db_data.video]
@@ -513,6 +513,20 @@ def handle_dataset_import(
 ) -> None:
     handle_dataset_io(instance, "import", format_name=format_name, cloud_storage_id=cloud_storage_id)
 
+def handle_quality_report_computation(task: Task, *, report_id: int, stats: dict) -> None:
+    record_server_event(
+        scope=event_scope("compute", "quality_report"),
+        request_id=request_id(),
+        org_id=organization_id(task),
+        org_slug=organization_slug(task),
+        project_id=project_id(task),
+        task_id=task_id(task),
+        user_id=user_id(),
+        user_name=user_name(),
+        user_email=user_email(),
+        payload={"quality_report": {"id": report_id}, "stats": stats},
+    )
+
 def handle_rq_exception(rq_job, exc_type, exc_value, tb):
     oid = rq_job.meta.get(RQJobMetaField.ORG_ID, None)
     oslug = rq_job.meta.get(RQJobMetaField.ORG_SLUG, None)
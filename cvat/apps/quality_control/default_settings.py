@@ -6,3 +6,11 @@ import os
 
 QUALITY_CHECK_JOB_DELAY = int(os.getenv("CVAT_QUALITY_CHECK_JOB_DELAY", 15 * 60))
 "The delay before the next quality check job is queued, in seconds"
+
+QUALITY_CHECK_JOB_COMPARISON_PROCESSES = int(
+    os.getenv("CVAT_QUALITY_CHECK_JOB_COMPARISON_PROCESSES", 1)
+)
+"""
+The number of worker processes comparing the annotation jobs with the GT job
+in a quality check. The jobs are compared in the quality check process, if it's 1
+"""
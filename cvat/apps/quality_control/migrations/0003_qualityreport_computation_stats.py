@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-19 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quality_control", "0002_qualityreport_assignee"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qualityreport",
+            name="computation_stats",
+            field=models.JSONField(default=dict),
+        ),
+    ]
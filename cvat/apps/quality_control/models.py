@@ -92,6 +92,8 @@ class QualityReport(models.Model):
 
     data = models.JSONField()
 
+    computation_stats = models.JSONField(default=dict)
+
     conflicts: Sequence[AnnotationConflict]
 
     @property
@@ -113,6 +115,12 @@ class QualityReport(models.Model):
         report = self._parse_report()
         return report.comparison_summary
 
+    @property
+    def parsed_computation_stats(self):
+        from cvat.apps.quality_control.quality_reports import ComputationStats
+
+        return ComputationStats.from_dict(self.computation_stats)
+
     def get_task(self) -> Task:
         if self.task is not None:
             return self.task
@@ -6,21 +6,37 @@ from __future__ import annotations
 
 import itertools
 import math
+import multiprocessing
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
 from datetime import timedelta
 from functools import cached_property, partial
-from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 from uuid import uuid4
 
 import datumaro as dm
 import datumaro.util.mask_tools
 import django_rq
 import numpy as np
-from attrs import asdict, define, fields_dict
+from attrs import Factory, asdict, define, fields_dict
 from datumaro.util import dump_json, parse_json
 from django.conf import settings
-from django.db import transaction
+from django.db import connections, transaction
 from django.utils import timezone
 from scipy.optimize import linear_sum_assignment
 
@@ -45,6 +61,7 @@ from cvat.apps.engine.models import (
     Task,
     User,
 )
+from cvat.apps.events.handlers import handle_quality_report_computation
 from cvat.apps.profiler import silk_profile
 from cvat.apps.quality_control import models
 from cvat.apps.quality_control.models import (
@@ -545,6 +562,41 @@ class ComparisonReport(_Serializable):
         return cls.from_dict(parse_json(data))
 
 
+@define(kw_only=True)
+class ComputationStats(_Serializable):
+    stage_durations: Dict[str, float] = Factory(dict)
+    "Durations of the computation stages, in seconds"
+
+    counters: Dict[str, int] = Factory(dict)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_durations[stage] = (
+                self.stage_durations.get(stage, 0) + time.perf_counter() - start_time
+            )
+
+    def count(self, counter: str, value: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def accumulate(self, other: ComputationStats):
+        for stage, duration in other.stage_durations.items():
+            self.stage_durations[stage] = self.stage_durations.get(stage, 0) + duration
+
+        for counter, value in other.counters.items():
+            self.count(counter, value)
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(
+            stage_durations=dict(d.get("stage_durations", {})),
+            counters=dict(d.get("counters", {})),
+        )
+
+
 class JobDataProvider:
     @classmethod
     def add_prefetch_info(cls, queryset):
@@ -647,20 +699,31 @@ def _match_segments(
     distance=dm.ops.segment_iou,
     dist_thresh=1.0,
     label_matcher=lambda a, b: a.label == b.label,
+    *,
+    similarities: Optional[np.ndarray] = None,
 ):
-    assert callable(distance), distance
+    """
+    The pairwise similarities can be computed by the distance function
+    or passed as a precomputed (a_segms x b_segms) matrix.
+    """
+
+    assert callable(distance) or similarities is not None, distance
     assert callable(label_matcher), label_matcher
 
     max_anns = max(len(a_segms), len(b_segms))
-    distances = np.array(
-        [
+    if similarities is not None:
+        distances = np.ones((max_anns, max_anns))
+        distances[: len(a_segms), : len(b_segms)] = 1 - similarities
+    else:
+        distances = np.array(
             [
-                1 - distance(a, b) if a is not None and b is not None else 1
-                for b, _ in itertools.zip_longest(b_segms, range(max_anns), fillvalue=None)
+                [
+                    1 - distance(a, b) if a is not None and b is not None else 1
+                    for b, _ in itertools.zip_longest(b_segms, range(max_anns), fillvalue=None)
+                ]
+                for a, _ in itertools.zip_longest(a_segms, range(max_anns), fillvalue=None)
             ]
-            for a, _ in itertools.zip_longest(a_segms, range(max_anns), fillvalue=None)
-        ]
-    )
+        )
     distances[~np.isfinite(distances)] = 1
     distances[distances > 1 - dist_thresh] = 1
 
@@ -770,22 +833,58 @@ def _to_rle(ann: dm.Annotation, *, img_h: int, img_w: int):
         assert False
 
 
-def _segment_iou(a: dm.Annotation, b: dm.Annotation, *, img_h: int, img_w: int) -> float:
+def _rle_iou_matrix(a_rles: Sequence[dict], b_rles: Sequence[dict]) -> np.ndarray:
+    """
+    Computes IoU for all the pairs of RLE-encoded segments, returns an (a x b) matrix
+    """
+
+    if not a_rles or not b_rles:
+        return np.zeros((len(a_rles), len(b_rles)))
+
+    from pycocotools import mask as mask_utils
+
+    # Note that mask_utils.iou expects (dt, gt). Check this if the 3rd param is True
+    return np.asarray(mask_utils.iou(list(b_rles), list(a_rles), [0] * len(a_rles))).T
+
+
+def _segment_iou_matrix(
+    a_segms: Sequence[dm.Annotation], b_segms: Sequence[dm.Annotation], *, img_h: int, img_w: int
+) -> np.ndarray:
     """
-    Generic IoU computation with masks and polygons.
-    Returns -1 if no intersection, [0; 1] otherwise
+    Generic IoU computation with masks and polygons, returns an (a x b) matrix
     """
     # Comparing to the dm version, this fixes the comparison for segments,
     # as the images size are required for correct decoding.
     # Boxes are not included, because they are not needed
 
-    from pycocotools import mask as mask_utils
+    # Each segment is encoded only once
+    return _rle_iou_matrix(
+        [_to_rle(ann, img_h=img_h, img_w=img_w)[0] for ann in a_segms],
+        [_to_rle(ann, img_h=img_h, img_w=img_w)[0] for ann in b_segms],
+    )
 
-    a = _to_rle(a, img_h=img_h, img_w=img_w)
-    b = _to_rle(b, img_h=img_h, img_w=img_w)
 
-    # Note that mask_utils.iou expects (dt, gt). Check this if the 3rd param is True
-    return float(mask_utils.iou(b, a, [0]))
+def _bbox_iou_matrix(a_bboxes: np.ndarray, b_bboxes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of dm.ops.bbox_iou for the (N, 4) and (M, 4) arrays of [x, y, w, h].
+    Returns an (N x M) matrix with -1 for the boxes without intersection.
+    """
+
+    a_x, a_y, a_w, a_h = (a_bboxes[:, i, np.newaxis] for i in range(4))
+    b_x, b_y, b_w, b_h = (b_bboxes[np.newaxis, :, i] for i in range(4))
+
+    in_w = np.maximum(0, np.minimum(a_x + a_w, b_x + b_w) - np.maximum(a_x, b_x))
+    in_h = np.maximum(0, np.minimum(a_y + a_h, b_y + b_h) - np.maximum(a_y, b_y))
+    intersection = in_w * in_h
+    union = a_w * a_h + b_w * b_h - intersection
+
+    has_intersection = intersection != 0
+    return np.divide(
+        intersection,
+        union,
+        out=np.full(intersection.shape, -1, dtype=float),
+        where=has_intersection,
+    )
 
 
 @define(kw_only=True)
@@ -970,6 +1069,9 @@ class _DistanceComparator(dm.ops.DistanceComparator):
         self.panoptic_comparison = panoptic_comparison
         "Compare only the visible parts of polygons and masks"
 
+        self.distance_count = 0
+        "The number of the computed pairwise distances"
+
     def _instance_bbox(
         self, instance_anns: Sequence[dm.Annotation]
     ) -> Tuple[float, float, float, float]:
@@ -1028,17 +1130,23 @@ class _DistanceComparator(dm.ops.DistanceComparator):
         item_b,
         *,
         distance: Callable = dm.ops.segment_iou,
+        similarity_matrix: Optional[Callable[[Sequence, Sequence], np.ndarray]] = None,
         label_matcher: Callable = None,
         a_objs: Optional[Sequence[dm.Annotation]] = None,
         b_objs: Optional[Sequence[dm.Annotation]] = None,
         dist_thresh: Optional[float] = None,
     ):
+        """
+        The objects can be compared pairwise with the distance function or all at once
+        with the similarity_matrix function, which returns an (a_objs x b_objs) matrix.
+        """
+
         if a_objs is None:
             a_objs = self._get_ann_type(t, item_a)
         if b_objs is None:
             b_objs = self._get_ann_type(t, item_b)
 
-        if self.return_distances:
+        if self.return_distances and not similarity_matrix:
             distance, distances = self._make_memoizing_distance(distance)
 
         if not a_objs and not b_objs:
@@ -1049,6 +1157,19 @@ class _DistanceComparator(dm.ops.DistanceComparator):
             if label_matcher:
                 extra_args["label_matcher"] = label_matcher
 
+            self.distance_count += len(a_objs) * len(b_objs)
+
+            if similarity_matrix:
+                if a_objs and b_objs:
+                    similarities = similarity_matrix(a_objs, b_objs)
+                else:
+                    similarities = np.zeros((len(a_objs), len(b_objs)))
+
+                extra_args["similarities"] = similarities
+
+                if self.return_distances:
+                    distances = self._make_distances(a_objs, b_objs, similarities)
+
             returned_values = _match_segments(
                 a_objs,
                 b_objs,
@@ -1079,18 +1200,42 @@ class _DistanceComparator(dm.ops.DistanceComparator):
 
             return dm.Polygon(points)
 
-        def _bbox_iou(a: dm.Bbox, b: dm.Bbox, *, img_w: int, img_h: int) -> float:
-            if a.attributes.get("rotation", 0) == b.attributes.get("rotation", 0):
-                return dm.ops.bbox_iou(a, b)
-            else:
-                return _segment_iou(_to_polygon(a), _to_polygon(b), img_h=img_h, img_w=img_w)
+        def _bbox_iou_matrix_with_rotation(
+            a_bboxes: Sequence[dm.Bbox], b_bboxes: Sequence[dm.Bbox], *, img_w: int, img_h: int
+        ) -> np.ndarray:
+            ious = _bbox_iou_matrix(
+                np.array([a.get_bbox() for a in a_bboxes], dtype=float).reshape((-1, 4)),
+                np.array([b.get_bbox() for b in b_bboxes], dtype=float).reshape((-1, 4)),
+            )
+
+            # The boxes with different rotation are compared as polygons
+            a_rotations = np.array([a.attributes.get("rotation", 0) for a in a_bboxes])
+            b_rotations = np.array([b.attributes.get("rotation", 0) for b in b_bboxes])
+            has_different_rotation = a_rotations[:, np.newaxis] != b_rotations[np.newaxis, :]
+            if has_different_rotation.any():
+                a_ids = np.flatnonzero(has_different_rotation.any(axis=1))
+                b_ids = np.flatnonzero(has_different_rotation.any(axis=0))
+                polygon_ious = _segment_iou_matrix(
+                    [_to_polygon(a_bboxes[i]) for i in a_ids],
+                    [_to_polygon(b_bboxes[i]) for i in b_ids],
+                    img_h=img_h,
+                    img_w=img_w,
+                )
+
+                ious[np.ix_(a_ids, b_ids)] = np.where(
+                    has_different_rotation[np.ix_(a_ids, b_ids)],
+                    polygon_ious,
+                    ious[np.ix_(a_ids, b_ids)],
+                )
+
+            return ious
 
         img_h, img_w = item_a.image.size
         return self._match_segments(
             dm.AnnotationType.bbox,
             item_a,
             item_b,
-            distance=partial(_bbox_iou, img_h=img_h, img_w=img_w),
+            similarity_matrix=partial(_bbox_iou_matrix_with_rotation, img_h=img_h, img_w=img_w),
         )
 
     def match_segmentations(self, item_a, item_b):
@@ -1186,13 +1331,19 @@ class _DistanceComparator(dm.ops.DistanceComparator):
 
             return rle
 
-        def _segment_comparator(a_inst_id: int, b_inst_id: int) -> float:
-            a_segm = _get_segment(a_inst_id, compiled_mask=a_compiled_mask, instances=a_instances)
-            b_segm = _get_segment(b_inst_id, compiled_mask=b_compiled_mask, instances=b_instances)
-
-            from pycocotools import mask as mask_utils
-
-            return float(mask_utils.iou([b_segm], [a_segm], [0])[0])
+        def _instance_iou_matrix(
+            a_inst_ids: Sequence[int], b_inst_ids: Sequence[int]
+        ) -> np.ndarray:
+            return _rle_iou_matrix(
+                [
+                    _get_segment(i, compiled_mask=a_compiled_mask, instances=a_instances)
+                    for i in a_inst_ids
+                ],
+                [
+                    _get_segment(i, compiled_mask=b_compiled_mask, instances=b_instances)
+                    for i in b_inst_ids
+                ],
+            )
 
         def _label_matcher(a_inst_id: int, b_inst_id: int) -> bool:
             # labels are the same in the instance annotations
@@ -1207,7 +1358,7 @@ class _DistanceComparator(dm.ops.DistanceComparator):
             item_b,
             a_objs=range(len(a_instances)),
             b_objs=range(len(b_instances)),
-            distance=_segment_comparator,
+            similarity_matrix=_instance_iou_matrix,
             label_matcher=_label_matcher,
         )
 
@@ -1464,6 +1615,20 @@ class _DistanceComparator(dm.ops.DistanceComparator):
 
         return memoizing_distance, distances
 
+    @classmethod
+    def _make_distances(
+        cls, a_objs: Sequence[Any], b_objs: Sequence[Any], similarities: np.ndarray
+    ) -> Dict[Tuple[int, int], float]:
+        "Returns the same distances as the memoizing distance function would record"
+
+        a_keys = [a if isinstance(a, int) else id(a) for a in a_objs]
+        b_keys = [b if isinstance(b, int) else id(b) for b in b_objs]
+        return {
+            (a_key, b_key): similarity
+            for a_key, a_similarities in zip(a_keys, similarities.tolist())
+            for b_key, similarity in zip(b_keys, a_similarities)
+        }
+
     def match_annotations(self, item_a, item_b):
         return {t: self._match_ann_type(t, item_a, item_b) for t in self.included_ann_types}
 
@@ -1523,6 +1688,10 @@ class _Comparator:
         self.coverage_threshold = settings.object_visibility_threshold
         self.group_match_threshold = settings.group_match_threshold
 
+    @property
+    def distance_count(self) -> int:
+        return self._annotation_comparator.distance_count
+
     def match_attrs(self, ann_a: dm.Annotation, ann_b: dm.Annotation):
         a_attrs = ann_a.attributes
         b_attrs = ann_b.attributes
@@ -1672,10 +1841,13 @@ class DatasetComparator:
             settings = self.DEFAULT_SETTINGS
         self.settings = settings
 
+        self.stats = ComputationStats()
+
         self._ds_data_provider = ds_data_provider
         self._gt_data_provider = gt_data_provider
-        self._ds_dataset = self._ds_data_provider.dm_dataset
-        self._gt_dataset = self._gt_data_provider.dm_dataset
+        with self.stats.measure("dataset_building"):
+            self._ds_dataset = self._ds_data_provider.dm_dataset
+            self._gt_dataset = self._gt_data_provider.dm_dataset
 
         self._frame_results: Dict[int, ComparisonReportFrameSummary] = {}
 
@@ -1712,12 +1884,17 @@ class DatasetComparator:
         if self.included_frames is not None and frame_id not in self.included_frames:
             return
 
-        frame_results = self.comparator.match_annotations(gt_item, ds_item)
+        self.stats.count("frames")
+        self.stats.count("annotations", len(gt_item.annotations) + len(ds_item.annotations))
+
+        with self.stats.measure("matching"):
+            frame_results = self.comparator.match_annotations(gt_item, ds_item)
         self._frame_results.setdefault(frame_id, {})
 
-        self._generate_frame_annotation_conflicts(
-            frame_id, frame_results, gt_item=gt_item, ds_item=ds_item
-        )
+        with self.stats.measure("conflict_generation"):
+            self._generate_frame_annotation_conflicts(
+                frame_id, frame_results, gt_item=gt_item, ds_item=ds_item
+            )
 
     def _generate_frame_annotation_conflicts(
         self, frame_id: str, frame_results, *, gt_item: dm.DatasetItem, ds_item: dm.DatasetItem
@@ -2033,6 +2210,7 @@ class DatasetComparator:
 
     def generate_report(self) -> ComparisonReport:
         self._find_gt_conflicts()
+        self.stats.count("distances", self.comparator.distance_count)
 
         # accumulate stats
         intersection_frames = []
@@ -2106,6 +2284,97 @@ class DatasetComparator:
         )
 
 
+class _GtJobChangedError(Exception):
+    pass
+
+
+class _JobComparisonRunner:
+    """
+    Compares annotation jobs with the preloaded GT job.
+    The jobs can be compared in worker processes, which inherit the GT job data
+    from the current process.
+    """
+
+    current: Optional[_JobComparisonRunner] = None
+    "The runner used in the worker processes"
+
+    def __init__(
+        self, gt_job_data_provider: JobDataProvider, *, quality_params: ComparisonParameters
+    ) -> None:
+        self._gt_job_data_provider = gt_job_data_provider
+        self._gt_job_version = gt_job_data_provider.job_annotation.db_job.updated_date
+        self._gt_job_frames = gt_job_data_provider.job_data.get_included_frames()
+        self._quality_params = quality_params
+
+        # Prepare the GT dataset once, instead of doing this in each worker process
+        _ = gt_job_data_provider.dm_dataset
+
+    def compare(self, job_id: int) -> Optional[Tuple[timezone.datetime, str, dict]]:
+        """
+        Returns the compared job version, the serialized comparison report
+        and the computation stats. Returns None if the job has been removed.
+        Raises _GtJobChangedError if the GT job has been changed after it was loaded.
+        """
+
+        loading_stats = ComputationStats()
+        try:
+            with loading_stats.measure("db_loading"):
+                job_data_provider = JobDataProvider(job_id, included_frames=self._gt_job_frames)
+        except Job.DoesNotExist:
+            return None
+
+        # The job is only loaded when its comparison starts, so it must be checked
+        # that the job data matches the loaded GT job. The GT job version can't go back,
+        # so if it's still the same, it was the same when the job was loaded.
+        # Task label updates change the GT job version as well.
+        gt_job_version = (
+            Job.objects.filter(id=self._gt_job_data_provider.job_id)
+            .values_list("updated_date", flat=True)
+            .first()
+        )
+        if gt_job_version != self._gt_job_version:
+            raise _GtJobChangedError("The Ground Truth job was changed during the quality check")
+
+        job_version = job_data_provider.job_annotation.db_job.updated_date
+
+        comparator = DatasetComparator(
+            job_data_provider, self._gt_job_data_provider, settings=self._quality_params
+        )
+        report = comparator.generate_report()
+        comparator.stats.accumulate(loading_stats)
+
+        return job_version, report.to_json(), comparator.stats.to_dict()
+
+    @staticmethod
+    def _compare_in_worker_process(job_id: int) -> Optional[Tuple[timezone.datetime, str, dict]]:
+        try:
+            return _JobComparisonRunner.current.compare(job_id)
+        finally:
+            connections.close_all()
+
+    def run(self, job_ids: Sequence[int]) -> List[Optional[Tuple[timezone.datetime, str, dict]]]:
+        """
+        Compares the jobs and returns the results in the order of the job ids.
+        Only the jobs being compared are loaded, one per worker at a time.
+        """
+
+        max_workers = min(settings.QUALITY_CHECK_JOB_COMPARISON_PROCESSES, len(job_ids))
+        if max_workers <= 1:
+            return [self.compare(job_id) for job_id in job_ids]
+
+        # The worker processes are forked, so they get the GT job data without copying.
+        # The DB connections can't be shared with them, they will open own ones.
+        connections.close_all()
+        _JobComparisonRunner.current = self
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("fork")
+            ) as executor:
+                return list(executor.map(self._compare_in_worker_process, job_ids))
+        finally:
+            _JobComparisonRunner.current = None
+
+
 class QualityReportUpdateManager:
     _QUEUE_JOB_PREFIX = "update-quality-metrics-task-"
     _RQ_CUSTOM_QUALITY_CHECK_JOB_TYPE = "custom_quality_check"
@@ -2211,13 +2480,25 @@ class QualityReportUpdateManager:
     def is_custom_quality_check_job(self, rq_job) -> bool:
         return rq_job.meta.get("job_type") == self._RQ_CUSTOM_QUALITY_CHECK_JOB_TYPE
 
+    _MAX_REPORT_COMPUTATION_ATTEMPTS = 3
+
     @classmethod
     @silk_profile()
     def _check_task_quality(cls, *, task_id: int) -> int:
         return cls()._compute_reports(task_id=task_id)
 
     def _compute_reports(self, task_id: int) -> int:
-        with transaction.atomic():
+        for attempt in range(self._MAX_REPORT_COMPUTATION_ATTEMPTS):
+            try:
+                return self._compute_reports_for_current_gt_job(task_id)
+            except _GtJobChangedError:
+                if attempt + 1 == self._MAX_REPORT_COMPUTATION_ATTEMPTS:
+                    raise
+
+    def _compute_reports_for_current_gt_job(self, task_id: int) -> int:
+        task_stats = ComputationStats()
+
+        with task_stats.measure("preparation"), transaction.atomic():
             # The task could have been deleted during scheduling
             try:
                 task = Task.objects.select_related("data").get(id=task_id)
@@ -2235,50 +2516,68 @@ class QualityReportUpdateManager:
             if gt_job is None:
                 return
 
-            # TODO: Probably, can be optimized to this:
-            # - task updated (the gt job, frame set or labels changed) -> everything is computed
-            # - job updated -> job report is computed
-            #   old reports can be reused in this case (need to add M-1 relationship in reports)
-
-            # Add prefetch data to the shared queryset
-            # All the jobs / segments share the same task, so we can load it just once.
-            # We reuse the same object for better memory use (OOM is possible otherwise).
-            # Perform manual "join", since django can't do this.
-            gt_job = JobDataProvider.add_prefetch_info(job_queryset).get(id=gt_job.id)
-            for job in job_queryset:
-                job.segment.task = gt_job.segment.task
-
-            # Preload all the data for the computations
-            # It must be done in a single transaction and before all the remaining computations
-            # because the task and jobs can be changed after the beginning,
-            # which will lead to inconsistent results
-            gt_job_data_provider = JobDataProvider(gt_job.id, queryset=job_queryset)
-            gt_job_frames = gt_job_data_provider.job_data.get_included_frames()
-
             jobs: List[Job] = [j for j in job_queryset if j.type == JobType.ANNOTATION]
-            job_data_providers = {
-                job.id: JobDataProvider(
-                    job.id, queryset=job_queryset, included_frames=gt_job_frames
-                )
-                for job in jobs
-            }
-
             quality_params = self._get_task_quality_params(task)
 
-        job_comparison_reports: Dict[int, ComparisonReport] = {}
-        for job in jobs:
-            job_data_provider = job_data_providers[job.id]
-            comparator = DatasetComparator(
-                job_data_provider, gt_job_data_provider, settings=quality_params
+            # The job comparison results only depend on the job and GT job annotations,
+            # the task labels (updating them updates the jobs) and the quality settings.
+            # The results of the unchanged jobs can be taken from the previous reports.
+            reused_job_reports = self._find_reusable_job_reports(
+                jobs, gt_job=gt_job, quality_params=quality_params
             )
-            job_comparison_reports[job.id] = comparator.generate_report()
+            changed_jobs = [job for job in jobs if job.id not in reused_job_reports]
+
+            if changed_jobs:
+                # The GT job data is loaded in the same transaction with the job versions
+                gt_job = JobDataProvider.add_prefetch_info(job_queryset).get(id=gt_job.id)
+                gt_job_data_provider = JobDataProvider(gt_job.id, queryset=job_queryset)
+
+        job_report_data: Dict[int, str] = {
+            job_id: db_report.data for job_id, db_report in reused_job_reports.items()
+        }
+
+        # The annotation jobs are loaded right before the comparison to limit memory use.
+        # The jobs can be changed after the GT job is loaded, so the compared job versions
+        # are recorded in the reports. The updated jobs will be compared again in the next check.
+        compared_job_versions: Dict[int, timezone.datetime] = {}
+        job_stats: Dict[int, dict] = {}
+        if changed_jobs:
+            with task_stats.measure("gt_dataset_building"):
+                comparison_runner = _JobComparisonRunner(
+                    gt_job_data_provider, quality_params=quality_params
+                )
 
-            # Release resources
-            del job_data_provider.dm_dataset
+            with task_stats.measure("job_comparison"):
+                comparison_results = comparison_runner.run([job.id for job in changed_jobs])
+
+            for job, comparison_result in zip(changed_jobs, comparison_results):
+                if comparison_result is None:
+                    continue
 
-        task_comparison_report = self._compute_task_report(task, job_comparison_reports)
+                (
+                    compared_job_versions[job.id],
+                    job_report_data[job.id],
+                    job_stats[job.id],
+                ) = comparison_result
 
-        with transaction.atomic():
+                # The job stage durations are summed up over all the workers
+                task_stats.accumulate(ComputationStats.from_dict(job_stats[job.id]))
+
+            del comparison_runner, gt_job_data_provider
+
+        task_stats.count("compared_jobs", len(job_stats))
+        task_stats.count("reused_jobs", len(reused_job_reports))
+
+        # Skip the jobs removed during processing
+        jobs = [job for job in jobs if job.id in job_report_data]
+        job_comparison_reports: Dict[int, ComparisonReport] = {
+            job.id: ComparisonReport.from_json(job_report_data[job.id]) for job in jobs
+        }
+
+        with task_stats.measure("report_aggregation"):
+            task_comparison_report = self._compute_task_report(task, job_comparison_reports)
+
+        with task_stats.measure("report_saving"), transaction.atomic():
             # The task could have been deleted during processing
             try:
                 Task.objects.get(id=task_id)
@@ -2299,11 +2598,12 @@ class QualityReportUpdateManager:
                 job_comparison_report = job_comparison_reports[job.id]
                 job_report = dict(
                     job=job,
-                    target_last_updated=job.updated_date,
+                    target_last_updated=compared_job_versions.get(job.id, job.updated_date),
                     gt_last_updated=gt_job.updated_date,
                     assignee_id=job.assignee_id,
-                    data=job_comparison_report.to_json(),
+                    data=job_report_data[job.id],
                     conflicts=[c.to_dict() for c in job_comparison_report.conflicts],
+                    computation_stats=job_stats.get(job.id, {}),
                 )
 
                 job_quality_reports[job.id] = job_report
@@ -2320,8 +2620,53 @@ class QualityReportUpdateManager:
                 job_reports=list(job_quality_reports.values()),
             )
 
+        # The saving time is only known after the report is saved
+        task_report.computation_stats = task_stats.to_dict()
+        task_report.save(update_fields=["computation_stats"])
+
+        handle_quality_report_computation(
+            task, report_id=task_report.id, stats=task_report.computation_stats
+        )
+
         return task_report.id
 
+    def _find_reusable_job_reports(
+        self, jobs: Sequence[Job], *, gt_job: Job, quality_params: ComparisonParameters
+    ) -> Dict[int, models.QualityReport]:
+        """
+        Finds the latest job reports, computed for the current versions of the jobs,
+        the GT job and the quality settings. Returns the reports by job id.
+        """
+
+        job_updated_dates = {job.id: job.updated_date for job in jobs}
+
+        # The report data can be big, so it's loaded only for the selected reports
+        candidate_report_ids: Dict[int, int] = {}
+        for report_id, job_id, target_last_updated in (
+            models.QualityReport.objects.filter(
+                job_id__in=job_updated_dates.keys(), gt_last_updated=gt_job.updated_date
+            )
+            .order_by("-created_date")
+            .values_list("id", "job_id", "target_last_updated")
+        ):
+            if job_id in candidate_report_ids:
+                continue
+
+            if target_last_updated == job_updated_dates[job_id]:
+                candidate_report_ids[job_id] = report_id
+
+        if not candidate_report_ids:
+            return {}
+
+        params = quality_params.to_dict()
+        reusable_reports = {}
+        for db_report in models.QualityReport.objects.filter(id__in=candidate_report_ids.values()):
+            report_params = parse_json(db_report.data)["parameters"]
+            if ComparisonParameters.from_dict(report_params).to_dict() == params:
+                reusable_reports[db_report.job_id] = db_report
+
+        return reusable_reports
+
     def _get_current_job(self):
         from rq import get_current_job
 
@@ -2433,6 +2778,7 @@ class QualityReportUpdateManager:
                 gt_last_updated=job_report["gt_last_updated"],
                 assignee_id=job_report["assignee_id"],
                 data=job_report["data"],
+                computation_stats=job_report["computation_stats"],
             )
             db_job_reports.append(db_job_report)
 
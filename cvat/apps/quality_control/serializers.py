@@ -42,10 +42,20 @@ class QualityReportSummarySerializer(serializers.Serializer):
     total_count = serializers.IntegerField(source="annotations.total_count")
 
 
+class QualityReportComputationStatsSerializer(serializers.Serializer):
+    stage_durations = serializers.DictField(
+        child=serializers.FloatField(), help_text="Durations of the computation stages, in seconds"
+    )
+    counters = serializers.DictField(child=serializers.IntegerField())
+
+
 class QualityReportSerializer(serializers.ModelSerializer):
     target = serializers.ChoiceField(models.QualityReportTarget.choices())
     assignee = engine_serializers.BasicUserSerializer(allow_null=True, read_only=True)
     summary = QualityReportSummarySerializer()
+    computation_stats = QualityReportComputationStatsSerializer(
+        source="parsed_computation_stats", read_only=True
+    )
 
     class Meta:
         model = models.QualityReport
@@ -60,6 +70,7 @@ class QualityReportSerializer(serializers.ModelSerializer):
             "target_last_updated",
             "gt_last_updated",
             "assignee",
+            "computation_stats",
         )
         read_only_fields = fields
 
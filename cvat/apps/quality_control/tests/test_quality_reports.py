@@ -0,0 +1,266 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Iterator, List, Sequence
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.models import Job, JobType, Label
+from cvat.apps.engine.tests.utils import (
+    ApiTestBase,
+    ForceLogin,
+    clear_rq_jobs,
+    generate_image_file,
+)
+from cvat.apps.quality_control import models
+from cvat.apps.quality_control.quality_reports import (
+    ComparisonParameters,
+    JobDataProvider,
+    QualityReportUpdateManager,
+    _GtJobChangedError,
+    _JobComparisonRunner,
+)
+
+
+class _QualityReportsTestMixin:
+    _FRAME_COUNT = 6
+    _SEGMENT_SIZE = 2
+    _GT_FRAMES = [0, 2, 4]
+
+    def setUp(self):
+        super().setUp()
+
+        self.admin = User.objects.create_superuser(username="admin", email="", password="admin")
+        self.task_id = self._create_task()
+        self.label_id = Label.objects.get(task_id=self.task_id).id
+        self.job_ids = list(
+            Job.objects.filter(segment__task_id=self.task_id, type=JobType.ANNOTATION)
+            .order_by("segment__start_frame")
+            .values_list("id", flat=True)
+        )
+        self.gt_job_id = self._create_gt_job(self._GT_FRAMES)
+
+        self._put_job_annotations(self.gt_job_id, self._GT_FRAMES)
+        for job_id in self.job_ids:
+            job = Job.objects.select_related("segment").get(id=job_id)
+            self._put_job_annotations(job_id, list(job.segment.frame_set))
+
+    def _create_task(self) -> int:
+        with ForceLogin(self.admin, self.client):
+            response = self.client.post(
+                "/api/tasks",
+                data={
+                    "name": "quality check task",
+                    "labels": [{"name": "car"}],
+                    "segment_size": self._SEGMENT_SIZE,
+                },
+                format="json",
+            )
+            assert response.status_code == status.HTTP_201_CREATED, response.status_code
+            task_id = response.data["id"]
+
+            image_data = {
+                f"client_files[{i}]": generate_image_file(f"image_{i}.jpg")
+                for i in range(self._FRAME_COUNT)
+            }
+            image_data["image_quality"] = 75
+            response = self.client.post(f"/api/tasks/{task_id}/data", data=image_data)
+            assert response.status_code == status.HTTP_202_ACCEPTED, response.status_code
+
+        return task_id
+
+    def _create_gt_job(self, frames: Sequence[int]) -> int:
+        with ForceLogin(self.admin, self.client):
+            response = self.client.post(
+                "/api/jobs",
+                data={
+                    "type": "ground_truth",
+                    "task_id": self.task_id,
+                    "frame_selection_method": "manual",
+                    "frames": frames,
+                },
+                format="json",
+            )
+            assert response.status_code == status.HTTP_201_CREATED, response.status_code
+
+        return response.data["id"]
+
+    def _put_job_annotations(self, job_id: int, frames: Sequence[int], *, offset: float = 0):
+        with ForceLogin(self.admin, self.client):
+            response = self.client.put(
+                f"/api/jobs/{job_id}/annotations",
+                data={
+                    "version": 0,
+                    "tags": [],
+                    "shapes": [
+                        {
+                            "frame": frame,
+                            "label_id": self.label_id,
+                            "group": None,
+                            "source": "manual",
+                            "attributes": [],
+                            "type": "rectangle",
+                            "occluded": False,
+                            "z_order": 0,
+                            "points": [10 + offset, 10 + offset, 50 + offset, 50 + offset],
+                        }
+                        for frame in frames
+                    ],
+                    "tracks": [],
+                },
+                format="json",
+            )
+            assert response.status_code == status.HTTP_200_OK, response.status_code
+
+    def _compute_reports(self) -> int:
+        # The requested checks are not throttled
+        custom_check_job = SimpleNamespace(
+            meta={"job_type": QualityReportUpdateManager._RQ_CUSTOM_QUALITY_CHECK_JOB_TYPE}
+        )
+        with mock.patch.object(
+            QualityReportUpdateManager, "_get_current_job", return_value=custom_check_job
+        ):
+            return QualityReportUpdateManager()._compute_reports(task_id=self.task_id)
+
+    @contextmanager
+    def _record_compared_jobs(self) -> Iterator[List[int]]:
+        compared_job_ids = []
+
+        original_compare = _JobComparisonRunner.compare
+
+        def compare(runner, job_id):
+            compared_job_ids.append(job_id)
+            return original_compare(runner, job_id)
+
+        with mock.patch.object(_JobComparisonRunner, "compare", autospec=True, side_effect=compare):
+            yield compared_job_ids
+
+
+class QualityReportReuseTest(_QualityReportsTestMixin, ApiTestBase):
+    def test_can_reuse_reports_of_unchanged_jobs(self):
+        with self._record_compared_jobs() as compared_job_ids:
+            self._compute_reports()
+        self.assertEqual(compared_job_ids, self.job_ids)
+
+        changed_job_id = self.job_ids[1]
+        job = Job.objects.select_related("segment").get(id=changed_job_id)
+        self._put_job_annotations(changed_job_id, list(job.segment.frame_set), offset=5)
+
+        with self._record_compared_jobs() as compared_job_ids:
+            self._compute_reports()
+        self.assertEqual(compared_job_ids, [changed_job_id])
+
+    def test_can_update_reports_after_deleted_frames_update(self):
+        self._compute_reports()
+
+        with ForceLogin(self.admin, self.client):
+            response = self.client.patch(
+                f"/api/jobs/{self.job_ids[0]}/data/meta",
+                data={"deleted_frames": [self._GT_FRAMES[0]]},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The deleted frames change the annotations of all the jobs, including the GT job
+        with self._record_compared_jobs() as compared_job_ids:
+            self._compute_reports()
+        self.assertEqual(compared_job_ids, self.job_ids)
+
+
+class QualityReportGtJobChangeTest(_QualityReportsTestMixin, ApiTestBase):
+    @contextmanager
+    def _update_gt_job_on_comparison(self, update_count: int):
+        original_compare = _JobComparisonRunner.compare
+        remaining_updates = update_count
+
+        def compare(runner, job_id):
+            nonlocal remaining_updates
+            if remaining_updates:
+                remaining_updates -= 1
+                Job.objects.filter(id=self.gt_job_id).update(updated_date=timezone.now())
+
+            return original_compare(runner, job_id)
+
+        with mock.patch.object(_JobComparisonRunner, "compare", autospec=True, side_effect=compare):
+            yield
+
+    @contextmanager
+    def _record_computation_attempts(self) -> Iterator[mock.Mock]:
+        with mock.patch.object(
+            QualityReportUpdateManager,
+            "_compute_reports_for_current_gt_job",
+            autospec=True,
+            side_effect=QualityReportUpdateManager._compute_reports_for_current_gt_job,
+        ) as compute_reports:
+            yield compute_reports
+
+    def test_can_restart_computation_if_gt_job_is_changed(self):
+        with self._update_gt_job_on_comparison(update_count=1):
+            with self._record_computation_attempts() as compute_reports:
+                report_id = self._compute_reports()
+
+        self.assertEqual(compute_reports.call_count, 2)
+
+        report = models.QualityReport.objects.get(id=report_id)
+        self.assertEqual(report.gt_last_updated, Job.objects.get(id=self.gt_job_id).updated_date)
+
+    def test_can_stop_computation_if_gt_job_keeps_changing(self):
+        max_attempts = QualityReportUpdateManager._MAX_REPORT_COMPUTATION_ATTEMPTS
+
+        with self._update_gt_job_on_comparison(update_count=max_attempts):
+            with self._record_computation_attempts() as compute_reports:
+                with self.assertRaises(_GtJobChangedError):
+                    self._compute_reports()
+
+        self.assertEqual(compute_reports.call_count, max_attempts)
+        self.assertFalse(models.QualityReport.objects.filter(task_id=self.task_id).exists())
+
+
+class JobComparisonProcessesTest(_QualityReportsTestMixin, APITransactionTestCase):
+    # The worker processes use own DB connections, so the test data must be committed
+
+    def tearDown(self):
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        MediaCache.clear()
+
+        clear_rq_jobs()
+
+        return super().tearDown()
+
+    def _compare_jobs(self, job_ids: Sequence[int]) -> list:
+        comparison_runner = _JobComparisonRunner(
+            JobDataProvider(self.gt_job_id), quality_params=ComparisonParameters()
+        )
+        results = comparison_runner.run(job_ids)
+
+        # The computation stats include durations, which differ between runs
+        return [result[:2] if result else result for result in results]
+
+    def test_can_compare_jobs_in_worker_processes(self):
+        job = Job.objects.select_related("segment").get(id=self.job_ids[1])
+        self._put_job_annotations(job.id, list(job.segment.frame_set), offset=5)
+
+        # The job can be deleted after the quality check has listed the task jobs
+        deleted_job_id = self.job_ids[2]
+        Job.objects.filter(id=deleted_job_id).delete()
+
+        with override_settings(QUALITY_CHECK_JOB_COMPARISON_PROCESSES=1):
+            expected_results = self._compare_jobs(self.job_ids)
+
+        with override_settings(QUALITY_CHECK_JOB_COMPARISON_PROCESSES=2):
+            results = self._compare_jobs(self.job_ids)
+
+        self.assertEqual(len(results), len(self.job_ids))
+        self.assertIsNone(results[self.job_ids.index(deleted_job_id)])
+        self.assertEqual(results, expected_results)
@@ -273,6 +273,7 @@ class CVAT_QUEUES(Enum):
     QUALITY_REPORTS = 'quality_reports'
     ANALYTICS_REPORTS = 'analytics_reports'
     CLEANING = 'cleaning'
+    CHUNKS = 'chunks'
 
 redis_inmem_host = os.getenv('CVAT_REDIS_INMEM_HOST', 'localhost')
 redis_inmem_port = os.getenv('CVAT_REDIS_INMEM_PORT', 6379)
@@ -318,6 +319,10 @@ RQ_QUEUES = {
         **shared_queue_settings,
         'DEFAULT_TIMEOUT': '1h',
     },
+    CVAT_QUEUES.CHUNKS.value: {
+        **shared_queue_settings,
+        'DEFAULT_TIMEOUT': '1h',
+    },
 }
 
 NUCLIO = {
@@ -718,6 +723,11 @@ ONE_RUNNING_JOB_IN_QUEUE_PER_USER = to_bool(os.getenv('ONE_RUNNING_JOB_IN_QUEUE_
 # How many chunks can be prepared simultaneously during task creation in case the cache is not used
 CVAT_CONCURRENT_CHUNK_PROCESSING = int(os.getenv('CVAT_CONCURRENT_CHUNK_PROCESSING', 1))
 
+# How many processes can prepare chunks during task creation in case the cache is not used.
+# Only image data is prepared in processes. 0 means the chunks are prepared in threads
+# (see CVAT_CONCURRENT_CHUNK_PROCESSING), a negative value means the number of CPU cores
+CVAT_CHUNK_PROCESSING_PROCESSES = int(os.getenv('CVAT_CHUNK_PROCESSING_PROCESSES', 0))
+
 from cvat.rq_patching import update_started_job_registry_cleanup
 update_started_job_registry_cleanup()
 
@@ -24,6 +24,13 @@ os.makedirs(MEDIA_DATA_ROOT, exist_ok=True)
 CACHE_ROOT = os.path.join(DATA_ROOT, 'cache')
 os.makedirs(CACHE_ROOT, exist_ok=True)
 
+MEDIA_CACHE_DISK_TIER_ROOT = os.path.join(CACHE_ROOT, 'media')
+
+# RQ jobs are executed synchronously in tests, so the warmup would prepare all the chunks
+# during each task creation. The tests of the background chunk preparation enable it explicitly.
+MEDIA_CACHE_WARMUP = False
+MEDIA_CACHE_PREFETCH_CHUNKS = 0
+
 JOBS_ROOT = os.path.join(DATA_ROOT, 'jobs')
 os.makedirs(JOBS_ROOT, exist_ok=True)
 
@@ -497,6 +497,25 @@ class TestPostQualityReports(_PermissionTestBase):
         report = self.create_quality_report(admin_user, task_id)
         assert models.QualityReport._from_openapi_data(**report)
 
+    def test_report_has_computation_stats(self, admin_user, jobs):
+        gt_job = next(
+            j
+            for j in jobs
+            if j["type"] == "ground_truth"
+            and j["stage"] == "acceptance"
+            and j["state"] == "completed"
+        )
+        task_id = gt_job["task_id"]
+
+        report = self.create_quality_report(admin_user, task_id)
+
+        stats = report["computation_stats"]
+        assert {"preparation", "report_aggregation", "report_saving"}.issubset(
+            stats["stage_durations"]
+        )
+        assert all(duration >= 0 for duration in stats["stage_durations"].values())
+        assert stats["counters"]["compared_jobs"] + stats["counters"]["reused_jobs"] > 0
+
     @pytest.mark.parametrize("has_assignee", [False, True])
     def test_can_create_report_with_job_assignees(
         self, admin_user, jobs, users_by_name, has_assignee
@@ -1194,7 +1213,7 @@ class TestQualityReportMetrics(_PermissionTestBase):
                 new_report,
                 old_report,
                 ignore_order=True,
-                exclude_paths=["root['created_date']", "root['id']"],
+                exclude_paths=["root['created_date']", "root['id']", "root['computation_stats']"],
             )
             == {}
         )
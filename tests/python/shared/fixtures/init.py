@@ -39,6 +39,7 @@ class Container(str, Enum):
     SERVER = "cvat_server"
     WORKER_ANNOTATION = "cvat_worker_annotation"
     WORKER_IMPORT = "cvat_worker_import"
+    WORKER_CHUNKS = "cvat_worker_chunks"
     WORKER_EXPORT = "cvat_worker_export"
     WORKER_QUALITY_REPORTS = "cvat_worker_quality_reports"
     WORKER_WEBHOOKS = "cvat_worker_webhooks"
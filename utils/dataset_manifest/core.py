@@ -3,11 +3,17 @@
 #
 # SPDX-License-Identifier: MIT
 
+from array import array
 from enum import Enum
 from io import StringIO
 import av
 import json
+import mmap
+import numpy as np
 import os
+import struct
+import sys
+import tempfile
 
 from abc import ABC, abstractmethod, abstractproperty, abstractstaticmethod
 from contextlib import closing
@@ -20,7 +26,7 @@ from .errors import InvalidManifestError, InvalidVideoError
 from .utils import SortingMethod, md5_hash, rotate_image, sort
 from .types import NamedBytesIO
 
-from typing import Any, Dict, List, Union, Optional, Iterator, Tuple, Callable
+from typing import Any, Dict, List, Union, Optional, Iterator, Tuple, Callable, Sequence
 
 
 class VideoStreamReader:
@@ -303,53 +309,149 @@ class _Manifest:
 # Needed for faster iteration over the manifest file, will be generated to work inside CVAT
 # and will not be generated when manually creating a manifest
 class _Index:
-    FILE_NAME = 'index.json'
+    """
+    Offsets of the manifest item lines.
+
+    The index is stored as a binary file: a header (magic, version, item count)
+    followed by a table of fixed-width little-endian offsets. Saved indices are
+    memory-mapped, so an item offset is read without loading the whole index.
+    Indices in the previous JSON format are still supported for reading.
+    """
+
+    FILE_NAME = 'index.bin'
+    LEGACY_FILE_NAME = 'index.json'
+    VERSION = 1
+
+    _MAGIC = b'CVMI'
+    _HEADER = struct.Struct('<4sBxxxQ') # magic, version, item count
+    _OFFSET = struct.Struct('<Q')
 
     def __init__(self, path):
         assert path and os.path.isdir(path), 'No index directory path'
         self._path = os.path.join(path, self.FILE_NAME)
-        self._index = {}
+        self._legacy_path = os.path.join(path, self.LEGACY_FILE_NAME)
+
+        # The offsets are kept either in the array or in the mapped index file
+        self._offsets = array('Q')
+        self._mapped_file: Optional[mmap.mmap] = None
+        self._mapped_count = 0
+        self._is_legacy = False
 
     @property
     def path(self):
         return self._path
 
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self._path) or os.path.exists(self._legacy_path)
+
+    @property
+    def is_legacy(self) -> bool:
+        return self._is_legacy
+
+    def _set_offsets(self, offsets: array, *, is_legacy: bool = False):
+        self._offsets = offsets
+        self._mapped_file = None
+        self._mapped_count = 0
+        self._is_legacy = is_legacy
+
+    def _get_offsets(self) -> array:
+        if self._mapped_file is not None:
+            self._set_offsets(array('Q', self))
+        return self._offsets
+
     def dump(self):
-        with open(self._path, 'w') as index_file:
-            json.dump(self._index, index_file,  separators=(',', ':'))
+        offsets = self._get_offsets()
+        if sys.byteorder != 'little':
+            offsets = array('Q', offsets)
+            offsets.byteswap()
+
+        # Other processes can read the index at the same time
+        fd, tmp_path = tempfile.mkstemp(prefix=self.FILE_NAME, dir=os.path.dirname(self._path))
+        try:
+            with open(fd, 'wb') as index_file:
+                index_file.write(self._HEADER.pack(self._MAGIC, self.VERSION, len(offsets)))
+                index_file.write(offsets.tobytes())
+            os.replace(tmp_path, self._path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        if os.path.exists(self._legacy_path):
+            os.remove(self._legacy_path)
+        self._is_legacy = False
 
     def load(self):
-        with open(self._path, 'r') as index_file:
-            self._index = json.load(index_file,
-                object_hook=lambda d: {int(k): v for k, v in d.items()})
+        if not os.path.exists(self._path) and os.path.exists(self._legacy_path):
+            self._load_legacy()
+            return
+
+        with open(self._path, 'rb') as index_file:
+            try:
+                mapped_file = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as ex: # empty file
+                raise InvalidManifestError('Invalid manifest index file') from ex
+
+        if len(mapped_file) < self._HEADER.size:
+            mapped_file.close()
+            raise InvalidManifestError('Invalid manifest index file')
+
+        magic, version, count = self._HEADER.unpack_from(mapped_file)
+        if (
+            magic != self._MAGIC or version != self.VERSION or
+            len(mapped_file) != self._HEADER.size + count * self._OFFSET.size
+        ):
+            mapped_file.close()
+            raise InvalidManifestError('Invalid manifest index file')
+
+        self._set_offsets(array('Q'))
+        self._mapped_file = mapped_file
+        self._mapped_count = count
+
+    def _load_legacy(self):
+        with open(self._legacy_path, 'r') as index_file:
+            index = json.load(index_file)
+
+        offsets = array('Q', bytes(len(index) * self._OFFSET.size))
+        for number, offset in index.items():
+            offsets[int(number)] = offset
+
+        self._set_offsets(offsets, is_legacy=True)
 
     def remove(self):
-        os.remove(self._path)
+        for path in (self._path, self._legacy_path):
+            if os.path.exists(path):
+                os.remove(path)
 
     def create(self, manifest, *, skip):
         assert os.path.exists(manifest), 'A manifest file not exists, index cannot be created'
+        offsets = array('Q')
         with open(manifest, 'r+') as manifest_file:
             while skip:
                 manifest_file.readline()
                 skip -= 1
-            image_number = 0
             position = manifest_file.tell()
             line = manifest_file.readline()
             while line:
                 if line.strip():
-                    self._index[image_number] = position
-                    image_number += 1
+                    offsets.append(position)
                     position = manifest_file.tell()
                 line = manifest_file.readline()
 
+        self._set_offsets(offsets)
+
     def partial_update(self, manifest, number):
         assert os.path.exists(manifest), 'A manifest file not exists, index cannot be updated'
+        offsets = self._get_offsets()
         with open(manifest, 'r+') as manifest_file:
-            manifest_file.seek(self._index[number])
+            manifest_file.seek(offsets[number])
             line = manifest_file.readline()
             while line:
                 if line.strip():
-                    self._index[number] = manifest_file.tell()
+                    if number < len(offsets):
+                        offsets[number] = manifest_file.tell()
+                    else:
+                        offsets.append(manifest_file.tell())
                     number += 1
                 line = manifest_file.readline()
 
@@ -357,10 +459,25 @@ class _Index:
         if not 0 <= number < len(self):
             raise IndexError('Invalid index number: {}, Maximum allowed index is {}'.format(number, len(self) - 1))
 
-        return self._index[number]
+        if self._mapped_file is not None:
+            return self._OFFSET.unpack_from(
+                self._mapped_file, self._HEADER.size + number * self._OFFSET.size
+            )[0]
+
+        return self._offsets[number]
+
+    def __iter__(self):
+        if self._mapped_file is not None:
+            offsets = memoryview(self._mapped_file)[self._HEADER.size:]
+            return (offset for offset, in self._OFFSET.iter_unpack(offsets))
+
+        return iter(self._offsets)
 
     def __len__(self):
-        return len(self._index)
+        if self._mapped_file is not None:
+            return self._mapped_count
+
+        return len(self._offsets)
 
     def is_empty(self) -> bool:
         return not len(self)
@@ -408,15 +525,22 @@ class _ManifestManager(ABC):
                 return parsed_properties
 
     def init_index(self):
-        if os.path.exists(self._index.path):
-            self._index.load()
-        else:
-            self._index.create(self._manifest.path, skip=self._manifest.get_header_lines_count())
-            if self._create_index:
-                self._index.dump()
+        if self._index.exists:
+            try:
+                self._index.load()
+            except InvalidManifestError:
+                pass # a broken index is recreated
+            else:
+                if self._create_index and self._index.is_legacy:
+                    self._index.dump()
+                return
+
+        self._index.create(self._manifest.path, skip=self._manifest.get_header_lines_count())
+        if self._create_index:
+            self._index.dump()
 
     def reset_index(self):
-        if self._create_index and os.path.exists(self._index.path):
+        if self._create_index:
             self._index.remove()
 
     def set_index(self):
@@ -592,12 +716,200 @@ class ImageProperties(dict):
     def full_name(self):
         return f"{self['name']}{self['extension']}"
 
+class _ImageColumns:
+    """
+    A columnar copy of the image manifest properties, which are required
+    for bulk access to frame sizes and names. The widths and heights are stored
+    as arrays (-1 for unknown values), the names and extensions are stored
+    as byte blobs with offset arrays.
+    The columns are saved next to the manifest and are rebuilt when the manifest changes.
+    """
+
+    FILE_NAME = 'columns.npz'
+    VERSION = 1
+
+    _NO_VALUE = -1
+
+    def __init__(self, path):
+        assert path and os.path.isdir(path), 'No columns directory path'
+        self._path = os.path.join(path, self.FILE_NAME)
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self._path)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._columns is not None
+
+    @staticmethod
+    def _pack_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [v.encode() for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.array([len(v) for v in encoded], dtype=np.int64))
+        return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+    def create(self, manifest, *, skip):
+        assert os.path.exists(manifest), 'A manifest file not exists, columns cannot be created'
+
+        names, extensions, widths, heights = [], [], [], []
+        with open(manifest, 'r') as manifest_file:
+            for _ in range(skip):
+                manifest_file.readline()
+
+            for line in manifest_file:
+                if not line.strip():
+                    continue
+
+                properties = json.loads(line)
+                try:
+                    names.append(properties['name'])
+                    extensions.append(properties['extension'])
+                except KeyError as ex:
+                    raise InvalidManifestError(
+                        f"Invalid manifest file structure: '{ex.args[0]}' is required, but not found"
+                    ) from ex
+                for values, key in ((widths, 'width'), (heights, 'height')):
+                    value = properties.get(key)
+                    values.append(value if value is not None else self._NO_VALUE)
+
+        name_offsets, name_data = self._pack_strings(names)
+        extension_offsets, extension_data = self._pack_strings(extensions)
+        self._columns = {
+            'version': np.array(self.VERSION),
+            'manifest_size': np.array(os.path.getsize(manifest)),
+            'width': np.array(widths, dtype=np.int64),
+            'height': np.array(heights, dtype=np.int64),
+            'name_offsets': name_offsets,
+            'name_data': name_data,
+            'extension_offsets': extension_offsets,
+            'extension_data': extension_data,
+        }
+
+    def dump(self):
+        # Other processes can read the columns at the same time
+        fd, tmp_path = tempfile.mkstemp(prefix=self.FILE_NAME, dir=os.path.dirname(self._path))
+        try:
+            with open(fd, 'wb') as columns_file:
+                np.savez(columns_file, **self._columns)
+            os.replace(tmp_path, self._path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def load(self, manifest):
+        try:
+            with np.load(self._path, allow_pickle=False) as columns_file:
+                columns = dict(columns_file)
+        except (OSError, ValueError) as ex:
+            raise InvalidManifestError('Invalid manifest columns file') from ex
+
+        if (
+            columns.get('version') != self.VERSION or
+            columns.get('manifest_size') != os.path.getsize(manifest)
+        ):
+            raise InvalidManifestError('Outdated manifest columns file')
+
+        self._columns = columns
+
+    def unload(self):
+        self._columns = None
+
+    def remove(self):
+        self.unload()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+    def _get_positions(self, indices: Union[Sequence[int], range, slice]) -> np.ndarray:
+        if isinstance(indices, slice):
+            indices = range(*indices.indices(len(self)))
+
+        if isinstance(indices, range):
+            positions = np.arange(indices.start, indices.stop, indices.step, dtype=np.int64)
+        else:
+            positions = np.asarray(indices, dtype=np.int64)
+
+        if len(positions) and not (0 <= positions.min() and positions.max() < len(self)):
+            raise IndexError('Invalid index numbers, Maximum allowed index is {}'.format(len(self) - 1))
+
+        return positions
+
+    def _get_strings(self, column: str, positions: np.ndarray) -> List[str]:
+        offsets = self._columns[f'{column}_offsets']
+        # Only the requested strings are copied from the blob
+        data = memoryview(self._columns[f'{column}_data'])
+        return [
+            str(data[start:stop], 'utf-8')
+            for start, stop in zip(offsets[positions].tolist(), offsets[positions + 1].tolist())
+        ]
+
+    def get_sizes(self, indices: Union[Sequence[int], range, slice]) -> np.ndarray:
+        positions = self._get_positions(indices)
+        return np.stack([self._columns['width'][positions], self._columns['height'][positions]], axis=1)
+
+    def get_full_names(self, indices: Union[Sequence[int], range, slice]) -> List[str]:
+        positions = self._get_positions(indices)
+        return [
+            name + extension
+            for name, extension in zip(
+                self._get_strings('name', positions), self._get_strings('extension', positions)
+            )
+        ]
+
+    def __len__(self):
+        return len(self._columns['width'])
+
 class ImageManifestManager(_ManifestManager):
     _required_item_attributes = {'name', 'extension'}
 
     def __init__(self, manifest_path, upload_dir=None, create_index=True):
         super().__init__(manifest_path, create_index, upload_dir)
         setattr(self._manifest, 'TYPE', 'images')
+        self._columns = _ImageColumns(os.path.dirname(self._manifest.path))
+
+    def init_columns(self):
+        if self._columns.is_ready:
+            return
+
+        if self._columns.exists:
+            try:
+                self._columns.load(self._manifest.path)
+                return
+            except InvalidManifestError:
+                pass # outdated columns are recreated
+
+        self._columns.create(self._manifest.path, skip=self._manifest.get_header_lines_count())
+        if self._create_index:
+            self._columns.dump()
+
+    def reset_index(self):
+        super().reset_index()
+        if self._create_index:
+            self._columns.remove()
+        else:
+            self._columns.unload()
+
+    def get_image_sizes(self, indices: Union[Sequence[int], range, slice]) -> np.ndarray:
+        """
+        Returns an array of (width, height) rows for the requested manifest items.
+        Unknown values are -1.
+        """
+
+        self.init_columns()
+        return self._columns.get_sizes(indices)
+
+    def get_image_full_names(self, indices: Union[Sequence[int], range, slice]) -> List[str]:
+        """
+        Returns file names with extensions for the requested manifest items
+        """
+
+        self.init_columns()
+        return self._columns.get_full_names(indices)
 
     def link(self, **kwargs):
         ReaderClass = DatasetImagesReader if not kwargs.get('DIM_3D', None) else Dataset3DImagesReader